@@ -0,0 +1,449 @@
+"""
+analytics.py
+Where do students struggle? Per-answer telemetry events (answer, skip,
+timeout) are ingested into a columnar store: one flat binary file per
+column plus meta.json, read back memory-mapped. Text fields (player,
+difficulty, mode) are stored as small integer codes; the operators in
+the question are a bitmask (+ - * / % ** and parentheses).
+Reports group by operator, level, difficulty, player, mode or game mode
+(optionally filtered) and give answers, accuracy, skips/timeouts and
+latency percentiles. With NumPy a report over millions of rows is a few
+vectorized passes; without it the same code runs on array columns.
+Ingesting is incremental: files already read are remembered (also across
+telemetry rotation), so running it again only adds new events.
+Run:  python analytics.py ingest telemetry/events.jsonl*
+      python analytics.py report [--by operator] [--difficulty Hard] [--json]
+"""
+
+import argparse
+import array
+import glob
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+import time
+
+from paths import TELEMETRY_LOG
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DEFAULT_STORE = os.environ.get("MATH_ADVENTURE_ANALYTICS", "analytics")
+DEFAULT_LOG = TELEMETRY_LOG
+
+# column -> array typecode (the same letters are NumPy dtypes)
+COLUMNS = {
+    "ts": "d",
+    "level": "H",
+    "kind": "B",         # KINDS index
+    "correct": "B",
+    "ops": "B",          # OPS bits
+    "latency": "f",      # ms
+    "lat_bucket": "B",   # latency_bucket(latency)
+    "difficulty": "B",   # dictionary codes
+    "mode": "B",
+    "game_mode": "B",
+    "player": "I",
+}
+DICT_COLUMNS = ("difficulty", "mode", "game_mode", "player")
+# codes a dictionary column can hold ("B": 256)
+_DICT_SIZE = {c: 1 << (8 * array.array(COLUMNS[c]).itemsize) for c in DICT_COLUMNS}
+KINDS = ("answer", "skip", "timeout")
+OPS = (("+", 1), ("-", 2), ("*", 4), ("/", 8), ("%", 16), ("**", 32), ("()", 64))
+GROUPS = ("operator", "level", "difficulty", "player", "mode", "game_mode", "kind")
+
+# latency buckets: 8 per doubling from 10 ms (~9% wide), last one open
+BUCKETS = 160
+_BUCKET_BASE = 10.0
+BUCKET_BOUNDS = tuple(_BUCKET_BASE * 2 ** (i / 8) for i in range(BUCKETS))
+
+_OP_RE = re.compile(r"\*\*|[-+*/%(]")
+_OP_BITS = {"+": 1, "-": 2, "*": 4, "/": 8, "%": 16, "**": 32, "(": 64}
+
+
+def latency_bucket(ms):
+    if ms <= _BUCKET_BASE:
+        return 0
+    return min(BUCKETS - 1, math.ceil(8 * math.log2(ms / _BUCKET_BASE)))
+
+
+def op_mask(expression):
+    mask = 0
+    for token in _OP_RE.findall(expression):
+        mask |= _OP_BITS[token]
+    return mask
+
+
+def _file_id(path):
+    # a rotated log keeps its first line, so it is recognised under its new name
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.readline()).hexdigest()
+
+
+# ---------------- store ----------------
+class Store:
+    """Append-only columns in a folder; meta.json says how many rows are valid."""
+
+    def __init__(self, path):
+        self.path = path
+        self.meta = {"version": 1, "rows": 0, "dicts": {c: [] for c in DICT_COLUMNS}, "sources": {}}
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                self.meta = json.load(f)
+        self._codes = {c: {v: i for i, v in enumerate(self.meta["dicts"][c])} for c in DICT_COLUMNS}
+        self._cols = None
+        self.skipped = 0      # malformed lines seen by ingest()
+
+    @property
+    def rows(self):
+        return self.meta["rows"]
+
+    def code(self, column, value):
+        codes = self._codes[column]
+        i = codes.get(value)
+        if i is None:
+            if len(codes) >= _DICT_SIZE[column]:
+                raise OverflowError(f"{column} dictionary is full")
+            i = codes[value] = len(codes)
+            self.meta["dicts"][column].append(value)
+        return i
+
+    def codes(self, values):
+        """Codes of {column: value}, all or none: no dictionary grows for a row that doesn't fit."""
+        for column, value in values.items():
+            codes = self._codes[column]
+            if value not in codes and len(codes) >= _DICT_SIZE[column]:
+                raise OverflowError(f"{column} dictionary is full")
+        return tuple(self.code(column, value) for column, value in values.items())
+
+    def _col_path(self, name):
+        return os.path.join(self.path, name + ".bin")
+
+    def append(self, batch):
+        """batch: {column: array.array or ndarray}, all the same length."""
+        os.makedirs(self.path, exist_ok=True)
+        n = len(batch["ts"])
+        for name, typecode in COLUMNS.items():
+            col_path = self._col_path(name)
+            size = self.rows * array.array(typecode).itemsize
+            with open(col_path, "ab") as f:
+                # drop rows a crashed ingest wrote after the last meta.json
+                if f.tell() != size:
+                    f.truncate(size)
+                    f.seek(size)
+                data = batch[name]
+                if np is not None and isinstance(data, np.ndarray):
+                    f.write(data.astype(typecode, copy=False).tobytes())
+                else:
+                    data.tofile(f)
+        self.meta["rows"] += n
+        self._save_meta()
+        self._cols = None
+
+    def _save_meta(self):
+        tmp = os.path.join(self.path, "meta.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.meta, f)
+        os.replace(tmp, os.path.join(self.path, "meta.json"))
+
+    def columns(self):
+        """{name: column} memory-mapped (NumPy) or loaded into array.array."""
+        if self._cols is None:
+            cols = {}
+            n = self.rows
+            for name, typecode in COLUMNS.items():
+                if np is not None:
+                    if n:
+                        # plain ndarray view: same mapped pages, no memmap bookkeeping per operation
+                        mm = np.memmap(self._col_path(name), dtype=typecode, mode="r", shape=(n,))
+                        cols[name] = mm.view(np.ndarray)
+                    else:
+                        cols[name] = np.zeros(0, dtype=typecode)
+                else:
+                    a = array.array(typecode)
+                    if n:
+                        with open(self._col_path(name), "rb") as f:
+                            a.fromfile(f, n)
+                    cols[name] = a
+            self._cols = cols
+        return self._cols
+
+    # ---------------- ingest ----------------
+    def ingest(self, paths, batch_rows=100000):
+        """Add the turn events of JSONL files (only the part not read before)."""
+        sources = self.meta["sources"]
+        added = 0
+        for path in paths:
+            try:
+                ident = _file_id(path)
+            except OSError:
+                continue
+            offset = sources.get(ident, 0)
+            if offset > os.path.getsize(path):
+                offset = 0
+            with open(path, "rb") as f:
+                f.seek(offset)
+                batch = _Batch()
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break      # still being written
+                    offset += len(line)
+                    batch.add(self, line)
+                    if len(batch) >= batch_rows:
+                        added += self._flush(batch, sources, ident, offset)
+                        batch = _Batch()
+                added += self._flush(batch, sources, ident, offset)
+        return added
+
+    def _flush(self, batch, sources, ident, offset):
+        sources[ident] = offset
+        self.skipped += batch.skipped
+        if len(batch):
+            self.append(batch.cols)   # columns first, then meta.json with the offset
+        else:
+            os.makedirs(self.path, exist_ok=True)
+            self._save_meta()
+        return len(batch)
+
+
+class _Batch:
+    def __init__(self):
+        self.cols = {name: array.array(t) for name, t in COLUMNS.items()}
+        self.skipped = 0
+
+    def __len__(self):
+        return len(self.cols["ts"])
+
+    def add(self, store, line):
+        try:
+            e = json.loads(line)
+            if e.get("type") not in KINDS:
+                return      # recordings and other non-turn events
+            latency = float(e.get("latency_ms") or 0.0)
+            row = (float(e.get("ts", 0.0)),
+                   max(0, min(int(e.get("level", 0)), 65535)),
+                   KINDS.index(e["type"]),
+                   1 if e.get("correct") else 0,
+                   op_mask(e.get("expression", "")),
+                   latency,
+                   latency_bucket(latency))
+            # last: a row that fails above adds nothing to the dictionaries
+            row += store.codes({"difficulty": e.get("difficulty", ""), "mode": e.get("mode", ""),
+                                "game_mode": e.get("game_mode", "classic"), "player": e.get("player", "")})
+        except (ValueError, TypeError, AttributeError, KeyError, OverflowError, RecursionError):
+            # undecodable line, a field of the wrong type, or a full dictionary
+            self.skipped += 1
+            return
+        n = len(self)
+        try:
+            for name, value in zip(COLUMNS, row):
+                self.cols[name].append(value)
+        except OverflowError:
+            # a value out of its column's range: keep every column the same length
+            for a in self.cols.values():
+                del a[n:]
+            self.skipped += 1
+
+
+# ---------------- queries ----------------
+def _percentile(hist, q):
+    """Upper bound of the bucket holding the q-th value of a bucket histogram."""
+    total = sum(hist)
+    if not total:
+        return 0.0
+    seen = 0
+    for i, c in enumerate(hist):
+        seen += c
+        if seen >= q * total:
+            return BUCKET_BOUNDS[i]
+    return BUCKET_BOUNDS[-1]
+
+
+def _labels(store, by):
+    if by == "operator":
+        return [op for op, _ in OPS]
+    if by == "kind":
+        return list(KINDS)
+    if by in DICT_COLUMNS:
+        return list(store.meta["dicts"][by])
+    return None   # level: the value itself
+
+
+def _filter_mask(store, cols, where):
+    """NumPy bool mask (or None for all rows); where: {column: value}."""
+    mask = None
+    for column, value in where.items():
+        if column in DICT_COLUMNS:
+            code = store._codes[column].get(value)
+            m = cols[column] == (code if code is not None else -1)
+        elif column == "operator":
+            m = (cols["ops"] & dict(OPS)[value]) != 0
+        else:
+            m = cols[column] == value
+        mask = m if mask is None else mask & m
+    return mask
+
+
+def _summarize(label, n, answers, correct, skips, timeouts, lat_sum, hist):
+    answers, correct, lat_sum = int(answers), int(correct), float(lat_sum)
+    return {"key": label, "n": int(n), "answers": answers,
+            "accuracy": round(correct / answers, 4) if answers else 0.0,
+            "skips": int(skips), "timeouts": int(timeouts),
+            "latency_ms": {"mean": round(lat_sum / answers, 1) if answers else 0.0,
+                           "p50": round(_percentile(hist, 0.50), 1),
+                           "p90": round(_percentile(hist, 0.90), 1),
+                           "p99": round(_percentile(hist, 0.99), 1)}}
+
+
+def report(store, by="operator", where=None, min_n=1):
+    """Rows {key, n, answers, accuracy, skips, timeouts, latency_ms} per group.
+    Accuracy and latency count answered questions only."""
+    if by not in GROUPS:
+        raise ValueError(f"unknown group {by!r}")
+    cols = store.columns()
+    if np is None:
+        return _report_python(store, cols, by, where or {}, min_n)
+    mask = _filter_mask(store, cols, where or {})
+
+    def pick(name):
+        return cols[name] if mask is None else cols[name][mask]
+
+    kind = pick("kind")
+    answered = kind == 0
+    key = pick("ops" if by == "operator" else by).astype(np.intp)
+    k = int(key.max()) + 1 if len(key) else 0
+    # per key: rows of each kind, correct answers, latency sum and histogram
+    kinds = np.bincount(key * 3 + kind, minlength=k * 3).reshape(k, 3)
+    key_a = key[answered]
+    right = np.bincount(key_a, weights=pick("correct")[answered], minlength=k)
+    lat_sum = np.bincount(key_a, weights=pick("latency")[answered], minlength=k)
+    hist = np.bincount(key_a * BUCKETS + pick("lat_bucket")[answered],
+                       minlength=k * BUCKETS).reshape(k, BUCKETS)
+    labels = _labels(store, by)
+
+    if by == "operator":
+        # key is the operator bitmask: fold the masks that contain each operator
+        masks = np.arange(k)
+        groups = [(label, (masks & bit) != 0) for label, (_, bit) in zip(labels, OPS)]
+    else:
+        groups = [(labels[i] if labels is not None else int(i), i) for i in range(k)]
+    out = []
+    for label, sel in groups:
+        g_kinds = kinds[sel].reshape(-1, 3).sum(axis=0)
+        n = int(g_kinds.sum())
+        if n < min_n:
+            continue
+        out.append(_summarize(label, n, g_kinds[0], right[sel].sum(), g_kinds[1], g_kinds[2],
+                              float(lat_sum[sel].sum()), hist[sel].reshape(-1, BUCKETS).sum(axis=0).tolist()))
+    return out
+
+
+def _report_python(store, cols, by, where, min_n):
+    # same numbers as the NumPy path, one row at a time
+    checks = []
+    for column, value in where.items():
+        if column in DICT_COLUMNS:
+            checks.append((column, store._codes[column].get(value, -1), None))
+        elif column == "operator":
+            checks.append(("ops", None, dict(OPS)[value]))
+        else:
+            checks.append((column, value, None))
+    labels = _labels(store, by)
+    stats = {}
+    kinds, corrects, lats, buckets = cols["kind"], cols["correct"], cols["latency"], cols["lat_bucket"]
+    ops = cols["ops"]
+    key_col = cols[by] if by not in ("operator",) else None
+    for i in range(store.rows):
+        if any((cols[c][i] & bit) == 0 if bit else cols[c][i] != v for c, v, bit in checks):
+            continue
+        if key_col is not None:
+            keys = (key_col[i],)
+        else:
+            keys = [j for j, (_, bit) in enumerate(OPS) if ops[i] & bit]
+        for key in keys:
+            s = stats.get(key)
+            if s is None:
+                s = stats[key] = [0, 0, 0, 0, 0, 0.0, [0] * BUCKETS]
+            s[0] += 1
+            kind = kinds[i]
+            if kind == 0:
+                s[1] += 1
+                s[2] += corrects[i]
+                s[5] += lats[i]
+                s[6][buckets[i]] += 1
+            elif kind == 1:
+                s[3] += 1
+            else:
+                s[4] += 1
+    out = []
+    for key in sorted(stats):
+        s = stats[key]
+        if s[0] >= min_n:
+            out.append(_summarize(labels[key] if labels is not None else key, *s))
+    return out
+
+
+# ---------------- CLI ----------------
+def _print_table(by, rows, file):
+    print(f"by {by}", file=file)
+    print(f"  {'key':<14} {'n':>9} {'answers':>9} {'acc':>7} {'skip':>6} {'t/o':>6} "
+          f"{'mean':>7} {'p50':>7} {'p90':>7} {'p99':>7}", file=file)
+    for r in rows:
+        lat = r["latency_ms"]
+        print(f"  {str(r['key'])[:14]:<14} {r['n']:9,d} {r['answers']:9,d} {r['accuracy']:7.1%} "
+              f"{r['skips']:6d} {r['timeouts']:6d} {lat['mean']:7.0f} {lat['p50']:7.0f} "
+              f"{lat['p90']:7.0f} {lat['p99']:7.0f}", file=file)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Math Adventure answer analytics")
+    ap.add_argument("--store", default=DEFAULT_STORE, help=f"store folder (default {DEFAULT_STORE})")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    ing = sub.add_parser("ingest", help="add telemetry JSONL files to the store")
+    ing.add_argument("files", nargs="*", help=f"default: {DEFAULT_LOG} and its rotated files")
+    rep = sub.add_parser("report", help="accuracy and latency per group")
+    rep.add_argument("--by", choices=GROUPS, action="append",
+                     help="group (repeatable; default operator, level and difficulty)")
+    rep.add_argument("--operator", choices=[op for op, _ in OPS])
+    rep.add_argument("--level", type=int)
+    rep.add_argument("--difficulty")
+    rep.add_argument("--player")
+    rep.add_argument("--mode", help="learning or normal")
+    rep.add_argument("--game-mode", choices=("classic", "tournament", "endless"))
+    rep.add_argument("--min-n", type=int, default=1, help="hide groups with fewer rows")
+    rep.add_argument("--json", action="store_true")
+    args = ap.parse_args(argv)
+
+    store = Store(args.store)
+    if args.cmd == "ingest":
+        files = args.files or sorted(glob.glob(DEFAULT_LOG + "*"), reverse=True)
+        t0 = time.perf_counter()
+        added = store.ingest(files)
+        print(f"{added:,} events added ({store.rows:,} in store, {store.skipped:,} malformed lines skipped) "
+              f"in {time.perf_counter() - t0:.2f}s", file=sys.stderr)
+        return 0
+
+    where = {k: v for k, v in (("operator", args.operator), ("level", args.level),
+                               ("difficulty", args.difficulty), ("player", args.player),
+                               ("mode", args.mode), ("game_mode", args.game_mode)) if v is not None}
+    t0 = time.perf_counter()
+    result = {by: report(store, by, where, args.min_n) for by in args.by or ("operator", "level", "difficulty")}
+    elapsed = time.perf_counter() - t0
+    if args.json:
+        print(json.dumps({"rows": store.rows, "where": where, "ms": round(elapsed * 1000, 2), "groups": result}))
+    else:
+        print(f"{store.rows:,} events" + (f" where {where}" if where else "") +
+              f" ({elapsed * 1000:.1f} ms{'' if np is not None else ', no NumPy'})")
+        for by, rows in result.items():
+            _print_table(by, rows, sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
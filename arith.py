@@ -0,0 +1,275 @@
+"""
+arith.py
+Small, safe arithmetic engine used instead of eval():
+- parses + - * / % ** and parentheses into a tiny AST
+- folds constant sub-expressions
+- compiles the AST to nested closures evaluated over int / Fraction,
+  so "/" gives exact rational answers
+- templates with {0}, {1}, ... placeholders are compiled once and cached
+"""
+
+import re
+from decimal import Decimal
+from fractions import Fraction
+from functools import lru_cache
+
+# Guard against huge powers like 9**9**9 in untrusted text
+MAX_EXPONENT = 64
+
+_TOKEN_RE = re.compile(r"\s*(?:(\d+(?:\.\d+)?)|\{(\d+)\}|(\*\*|[-+*/%()]))")
+
+# Player answers: 12, -3, 3.5 or 7/2 (no exponents: Fraction("1e9999999") is slow)
+MAX_ANSWER_LEN = 32
+_ANSWER_RE = re.compile(r"[-+]?[0-9]+(?:\.[0-9]+|/[0-9]+)?")
+
+
+class ArithError(ValueError):
+    """Raised for text that is not a valid game expression."""
+
+
+# ---------------- tokenizer / parser ----------------
+def _tokenize(text):
+    pos = 0
+    tokens = []
+    text = text.rstrip()
+    while pos < len(text):
+        m = _TOKEN_RE.match(text, pos)
+        if not m:
+            raise ArithError(f"unexpected character at {pos}: {text[pos:pos+10]!r}")
+        num, var, op = m.groups()
+        if num is not None:
+            value = Fraction(num) if "." in num else int(num)
+            tokens.append(("num", value))
+        elif var is not None:
+            tokens.append(("var", int(var)))
+        else:
+            tokens.append(("op", op))
+        pos = m.end()
+    tokens.append(("end", None))
+    return tokens
+
+
+class _Parser:
+    """
+    Recursive descent with Python's precedence:
+      expr  := term (('+'|'-') term)*
+      term  := unary (('*'|'/'|'%') unary)*
+      unary := ('-'|'+') unary | power
+      power := atom ('**' unary)?
+      atom  := NUMBER | {n} | '(' expr ')'
+    AST nodes are tuples: ("num", v), ("var", i), ("neg", x), (op, l, r)
+    """
+
+    def __init__(self, text):
+        self.tokens = _tokenize(text)
+        self.i = 0
+
+    def peek(self):
+        return self.tokens[self.i]
+
+    def take(self):
+        tok = self.tokens[self.i]
+        self.i += 1
+        return tok
+
+    def accept(self, *ops):
+        kind, val = self.peek()
+        if kind == "op" and val in ops:
+            self.i += 1
+            return val
+        return None
+
+    def parse(self):
+        node = self.expr()
+        if self.peek()[0] != "end":
+            raise ArithError(f"unexpected token {self.peek()[1]!r}")
+        return node
+
+    def expr(self):
+        node = self.term()
+        while True:
+            op = self.accept("+", "-")
+            if op is None:
+                return node
+            node = (op, node, self.term())
+
+    def term(self):
+        node = self.unary()
+        while True:
+            op = self.accept("*", "/", "%")
+            if op is None:
+                return node
+            node = (op, node, self.unary())
+
+    def unary(self):
+        op = self.accept("-", "+")
+        if op == "-":
+            return ("neg", self.unary())
+        if op == "+":
+            return self.unary()
+        return self.power()
+
+    def power(self):
+        node = self.atom()
+        if self.accept("**"):
+            node = ("**", node, self.unary())
+        return node
+
+    def atom(self):
+        kind, val = self.take()
+        if kind in ("num", "var"):
+            return (kind, val)
+        if kind == "op" and val == "(":
+            node = self.expr()
+            if not self.accept(")"):
+                raise ArithError("missing ')'")
+            return node
+        raise ArithError(f"unexpected token {val!r}")
+
+
+def parse(text):
+    """Parse expression text into an AST tuple."""
+    return _Parser(text).parse()
+
+
+# ---------------- arithmetic over int / Fraction ----------------
+def normalize(value):
+    """Fractions with denominator 1 become plain ints."""
+    if isinstance(value, Fraction) and value.denominator == 1:
+        return value.numerator
+    return value
+
+
+def _div(a, b):
+    if b == 0:
+        raise ArithError("division by zero")
+    return normalize(Fraction(a) / b)
+
+
+def _mod(a, b):
+    if b == 0:
+        raise ArithError("modulo by zero")
+    return normalize(a % b)
+
+
+def _pow(a, b):
+    b = normalize(b)
+    if not isinstance(b, int):
+        raise ArithError("exponent must be an integer")
+    if abs(b) > MAX_EXPONENT:
+        raise ArithError("exponent too large")
+    if b < 0:
+        return _div(1, a ** -b)
+    return a ** b
+
+
+BINARY_OPS = {
+    "+": lambda a, b: a + b,
+    "-": lambda a, b: a - b,
+    "*": lambda a, b: a * b,
+    "/": _div,
+    "%": _mod,
+    "**": _pow,
+}
+
+
+def fold(node):
+    """Constant folding: collapse sub-trees that hold no placeholders."""
+    kind = node[0]
+    if kind in ("num", "var"):
+        return node
+    if kind == "neg":
+        inner = fold(node[1])
+        if inner[0] == "num":
+            return ("num", -inner[1])
+        return ("neg", inner)
+    left, right = fold(node[1]), fold(node[2])
+    if left[0] == "num" and right[0] == "num":
+        return ("num", BINARY_OPS[kind](left[1], right[1]))
+    return (kind, left, right)
+
+
+def _emit(node):
+    """Turn a folded AST into a closure taking the placeholder values."""
+    kind = node[0]
+    if kind == "num":
+        value = node[1]
+        return lambda args: value
+    if kind == "var":
+        idx = node[1]
+        return lambda args: args[idx]
+    if kind == "neg":
+        inner = _emit(node[1])
+        return lambda args: -inner(args)
+    fn = BINARY_OPS[kind]
+    left, right = _emit(node[1]), _emit(node[2])
+    # common shapes get a flatter closure
+    if node[1][0] == "var" and node[2][0] == "var":
+        i, j = node[1][1], node[2][1]
+        return lambda args: fn(args[i], args[j])
+    if node[2][0] == "num":
+        const = node[2][1]
+        return lambda args: fn(left(args), const)
+    return lambda args: fn(left(args), right(args))
+
+
+@lru_cache(maxsize=256)
+def compile_template(pattern):
+    """
+    Compile a pattern such as "({0} + {1}) * {2}" once.
+    Returns fn(*values) -> int | Fraction.
+    """
+    body = _emit(fold(parse(pattern)))
+    return lambda *args: normalize(body(args))
+
+
+def evaluate(text):
+    """Evaluate expression text exactly (int or Fraction), without eval()."""
+    node = fold(parse(text))
+    if node[0] != "num":
+        raise ArithError("expression has unfilled placeholders")
+    return normalize(node[1])
+
+
+# ---------------- answer parsing / checking ----------------
+def parse_answer(text):
+    """Player input -> int | Fraction, or None. Accepts 12, -3, 3.5, 7/2."""
+    text = text.strip()
+    if len(text) > MAX_ANSWER_LEN or not _ANSWER_RE.fullmatch(text):
+        return None
+    try:
+        return normalize(Fraction(text))
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def _terminates(value):
+    # a fraction has a finite decimal form iff its denominator is 2^a * 5^b
+    d = Fraction(value).denominator
+    for p in (2, 5):
+        while d % p == 0:
+            d //= p
+    return d == 1
+
+
+def check_answer(user_val, answer):
+    """
+    Exact check. Answers without a finite decimal form (e.g. 135/7) also
+    accept the value rounded to 2 decimals, which is what we display.
+    """
+    if user_val is None:
+        return False
+    if user_val == answer:
+        return True
+    return not _terminates(answer) and user_val == round(Fraction(answer), 2)
+
+
+def format_answer(answer):
+    """Display text for an answer: exact decimals, else 2 decimal places."""
+    if isinstance(answer, int):
+        return str(answer)
+    value = Fraction(answer)
+    if _terminates(value):
+        exact = Decimal(value.numerator) / Decimal(value.denominator)
+        return format(exact.normalize(), "f")
+    return f"{float(round(value, 2)):.2f}"
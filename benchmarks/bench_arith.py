@@ -0,0 +1,57 @@
+"""
+bench_arith.py
+Answer evaluation: eval() vs arith.evaluate (parse every time) vs the
+cached compiled templates the QuestionBank uses.
+Run from the project folder:  python benchmarks/bench_arith.py [-n 50000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from arith import compile_template, evaluate
+from questions import TEMPLATES
+
+
+def sample(n, seed=7):
+    """(template, operands, text) triples drawn across all templates."""
+    rng = random.Random(seed)
+    templates = [t for group in TEMPLATES.values() for t in group]
+    out = []
+    for _ in range(n):
+        t = rng.choice(templates)
+        args = (rng.randint(10, 200), rng.randint(2, 20), rng.randint(1, 12))
+        out.append((t, args, t.format(*args)))
+    return out
+
+
+def timed(fn, items):
+    t0 = time.perf_counter()
+    for item in items:
+        fn(item)
+    return len(items) / (time.perf_counter() - t0)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    ap.add_argument("-n", type=int, default=50000, help="expressions per run")
+    args = ap.parse_args(argv)
+
+    items = sample(args.n)
+    results = {
+        "eval()": timed(lambda it: eval(it[2]), items),
+        "arith.evaluate": timed(lambda it: evaluate(it[2]), items),
+        "compile_template (cached)": timed(lambda it: compile_template(it[0])(*it[1]), items),
+    }
+    base = results["eval()"]
+    print(f"n={args.n}")
+    for name, rate in results.items():
+        print(f"{name:28s} {rate:12,.0f} expr/s   x{rate / base:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
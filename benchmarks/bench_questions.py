@@ -0,0 +1,49 @@
+"""
+bench_questions.py
+Questions/sec: ai_generate_question vs QuestionBank (sync and background).
+Run from the project folder:  python benchmarks/bench_questions.py [-n 50000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from questions import NUMPY_AVAILABLE, QuestionBank, ai_generate_question
+
+LEVELS = (1, 2, 3, 4, 5)
+
+
+def rate(fn, n):
+    t0 = time.perf_counter()
+    for i in range(n):
+        fn(LEVELS[i % len(LEVELS)])
+    return n / (time.perf_counter() - t0)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    ap.add_argument("-n", type=int, default=50000, help="questions per run")
+    args = ap.parse_args(argv)
+
+    results = {"ai_generate_question": rate(ai_generate_question, args.n)}
+
+    bank = QuestionBank(background=False)
+    results["QuestionBank (sync)"] = rate(bank.next, args.n)
+
+    bank = QuestionBank(batch_size=4096, low_water=2048)
+    bank.prefetch(LEVELS)
+    time.sleep(0.2)  # let the first batches land
+    results["QuestionBank (background)"] = rate(bank.next, args.n)
+    bank.close()
+
+    base = results["ai_generate_question"]
+    print(f"numpy: {'yes' if NUMPY_AVAILABLE else 'no'}   n={args.n}")
+    for name, qps in results.items():
+        print(f"{name:28s} {qps:12,.0f} q/s   x{qps / base:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+bench_seats.py
+Memory of multi-seat mode (--seats N) versus one process per student.
+Each measurement runs in a fresh child process that opens the game, puts
+every window on its game screen (sprite decoded, questions drawn) and
+reports its resident set size:
+- 1 seat per process: what every student costs with separate processes
+- N seats in one process: total, and the extra cost of each seat
+Needs a display; without DISPLAY the children run under xvfb-run.
+Run from the project folder:  python benchmarks/bench_seats.py [--seats 4] [--json]
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def rss_kb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss   # peak, KB on Linux
+
+
+def child(seats):
+    """Open `seats` windows, play a question in each, print the RSS as JSON."""
+    import time
+    import tkinter as tk
+    tmp = tempfile.mkdtemp(prefix="bench-seats-")
+    os.environ["MATH_ADVENTURE_DB"] = os.path.join(tmp, "leaderboard.db")
+    os.environ["MATH_ADVENTURE_TELEMETRY"] = os.path.join(tmp, "events.jsonl")
+    os.environ["MATH_ADVENTURE_SAVE"] = os.path.join(tmp, "savegame.bin")
+    sys.path.insert(0, ROOT)
+    spec = importlib.util.spec_from_file_location("math_adventure", os.path.join(ROOT, "math advanture.py"))
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    root = tk.Tk()
+    if seats == 1:
+        apps = [mod.MathAdventureApp(root)]
+    else:
+        root.withdraw()
+        shared = mod.SharedResources(root, max_photos=len(mod.IMAGE_CANDIDATES))
+        apps = mod.open_seats(root, seats, shared)
+    for i, app in enumerate(apps):
+        app.entry_name.insert(0, f"seat{i + 1}")
+        app.start_game()
+    t_end = time.monotonic() + 1.0
+    while time.monotonic() < t_end:
+        root.update()
+        time.sleep(0.01)
+    print(json.dumps({"seats": seats, "rss_kb": rss_kb()}))
+    sys.stdout.flush()
+    os._exit(0)
+
+
+def measure(seats):
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", str(seats)]
+    if not os.environ.get("DISPLAY"):
+        cmd = [shutil.which("xvfb-run"), "-a"] + cmd
+    out = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])["rss_kb"]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Per-seat memory: --seats versus separate processes")
+    ap.add_argument("--seats", type=int, default=4)
+    ap.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args(argv)
+    if args.child:
+        return child(args.child)
+    if not os.environ.get("DISPLAY") and shutil.which("xvfb-run") is None:
+        print("seat benchmark skipped: no DISPLAY and xvfb-run not found", file=sys.stderr)
+        return 0
+
+    one = measure(1)
+    many = measure(args.seats)
+    report = {
+        "seats": args.seats,
+        "process_rss_kb": one,
+        "separate_processes_kb": one * args.seats,
+        "one_process_kb": many,
+        "per_extra_seat_kb": round((many - one) / max(1, args.seats - 1)),
+        "saved_kb": one * args.seats - many,
+    }
+    if args.json:
+        print(json.dumps(report))
+    else:
+        print(f"1 seat per process:      {one / 1024:8.1f} MB per student")
+        print(f"{args.seats} separate processes:    {one * args.seats / 1024:8.1f} MB")
+        print(f"{args.seats} seats in one process:  {many / 1024:8.1f} MB "
+              f"({report['per_extra_seat_kb'] / 1024:.1f} MB per extra seat)")
+        print(f"saved:                   {report['saved_kb'] / 1024:8.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+bench_startup.py
+Launch the game N times with --profile-startup and check that the median
+time-to-interactive stays under a budget (exit code 1 if it does not).
+Needs a display; without one it re-runs the launches under xvfb-run.
+--tui launches the terminal front end (tui.py) in a pseudo-terminal
+instead (no display needed) and also reports its memory.
+Run from the project folder:  python benchmarks/bench_startup.py [-n 5] [--budget-ms 1000] [--tui]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, "math advanture.py")
+TUI_SCRIPT = os.path.join(ROOT, "tui.py")
+
+
+def launch_cmd():
+    cmd = [sys.executable, SCRIPT, "--profile-startup", "json"]
+    if os.environ.get("DISPLAY"):
+        return cmd
+    xvfb = shutil.which("xvfb-run")
+    if xvfb is None:
+        sys.exit("no DISPLAY and xvfb-run not found; install Xvfb or run on a desktop")
+    return [xvfb, "-a"] + cmd
+
+
+def run_tui(cols=80, rows=24):
+    """One tui.py --profile-startup run in a pty; returns its JSON report."""
+    import fcntl
+    import pty
+    import struct
+    import termios
+    pid, fd = pty.fork()
+    if pid == 0:
+        os.chdir(ROOT)
+        os.environ.setdefault("TERM", "xterm")
+        os.execv(sys.executable, [sys.executable, TUI_SCRIPT, "--profile-startup", "json"])
+    fcntl.ioctl(fd, termios.TIOCSWINSZ, struct.pack("HHHH", rows, cols, 0, 0))
+    out = b""
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            chunk = os.read(fd, 65536)
+        except OSError:     # EIO: the child closed the terminal
+            break
+        if not chunk:
+            break
+        out += chunk
+    os.close(fd)
+    os.waitpid(pid, 0)
+    # the report follows the curses output on the same terminal
+    text = out.decode("utf-8", "replace")
+    return json.loads(text[text.rindex('{"phases_ms"'):].strip())
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    ap.add_argument("-n", type=int, default=5, help="number of launches")
+    ap.add_argument("--budget-ms", type=float, default=1000.0, help="time-to-interactive budget")
+    ap.add_argument("--tui", action="store_true", help="launch the terminal front end (tui.py)")
+    args = ap.parse_args(argv)
+
+    runs = []
+    if args.tui:
+        runs = [run_tui() for _ in range(args.n)]
+    else:
+        cmd = launch_cmd()
+        for _ in range(args.n):
+            out = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True, check=True).stdout
+            runs.append(json.loads(out.strip().splitlines()[-1]))
+
+    phases = runs[0]["phases_ms"].keys()
+    for name in phases:
+        print(f"{name:20s} {statistics.median(r['phases_ms'][name] for r in runs):8.1f} ms")
+    tti = statistics.median(r["time_to_interactive_ms"] for r in runs)
+    ok = tti <= args.budget_ms
+    print(f"{'time to interactive':20s} {tti:8.1f} ms  (budget {args.budget_ms:.0f} ms) {'OK' if ok else 'OVER BUDGET'}")
+    if args.tui:
+        print(f"{'memory (RSS)':20s} {statistics.median(r['rss_kb'] for r in runs) / 1024:8.1f} MB")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,340 @@
+"""
+run.py
+Benchmark suite: question generation, answer checking, game turns and
+Tk redraws, saved as JSON and compared against a baseline.
+- "logic" benchmarks need no display
+- "tk" benchmarks build the real game screen; without a DISPLAY they
+  are re-run in a child process under xvfb-run (skipped if missing)
+Run from the project folder:
+  python benchmarks/run.py run -o baseline.json
+  python benchmarks/run.py run -o current.json
+  python benchmarks/run.py compare baseline.json current.json [--threshold 0.10]
+compare exits with 1 when any benchmark got slower than the threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+BENCHES = {}   # name -> (group, setup); setup() returns (fn, ops per call)
+
+
+def bench(name, group="logic"):
+    def register(setup):
+        BENCHES[name] = (group, setup)
+        return setup
+    return register
+
+
+# ---------------- logic benchmarks ----------------
+LEVELS = (1, 2, 3, 4, 5)
+
+
+@bench("questions.ai_generate_question")
+def _ai_generate():
+    from questions import ai_generate_question
+
+    def fn():
+        for i in range(2000):
+            ai_generate_question(LEVELS[i % 5])
+    return fn, 2000
+
+
+@bench("questions.QuestionBank.next")
+def _bank_next():
+    from questions import QuestionBank
+    bank = QuestionBank(background=False, seed=1)
+
+    def fn():
+        for i in range(5000):
+            bank.next(LEVELS[i % 5])
+    return fn, 5000
+
+
+@bench("arith.evaluate")
+def _evaluate():
+    from arith import evaluate
+    from bench_arith import sample
+    texts = [t for _, _, t in sample(2000)]
+
+    def fn():
+        for t in texts:
+            evaluate(t)
+    return fn, len(texts)
+
+
+@bench("arith.compile_template")
+def _compiled():
+    from arith import compile_template
+    from bench_arith import sample
+    items = [(t, a) for t, a, _ in sample(2000)]
+
+    def fn():
+        for t, a in items:
+            compile_template(t)(*a)
+    return fn, len(items)
+
+
+@bench("submit.parse_and_check")
+def _parse_and_check():
+    # what submit_answer does with the typed text
+    from arith import check_answer, format_answer, parse_answer
+    from questions import QuestionBank
+    bank = QuestionBank(background=False, seed=2)
+    cases = []
+    for i in range(2000):
+        _, ans = bank.next(LEVELS[i % 5])
+        typed = format_answer(ans) if i % 3 else "12.5"
+        cases.append((typed, ans))
+
+    def fn():
+        for typed, ans in cases:
+            check_answer(parse_answer(typed), ans)
+    return fn, len(cases)
+
+
+@bench("game_core.turn")
+def _turn():
+    import random
+    from game_core import CLEARED, GameSession
+    from questions import QuestionBank
+    rng = random.Random(3)
+    session = GameSession(rng=rng, questions=QuestionBank(background=False, seed=3))
+    session.start("bench", "Normal")
+
+    def fn():
+        for _ in range(2000):
+            if session.over:
+                session.start("bench", "Normal")
+            session.new_question()
+            result = session.answer(session.current_answer if rng.random() < 0.8 else None)
+            if result.state == CLEARED:
+                session.advance_level()
+    return fn, 2000
+
+
+@bench("game_core.turn_endless")
+def _turn_endless():
+    # generated levels (hundreds deep) must cost the same per turn
+    from game_core import CLEARED, GameSession
+    from questions import QuestionBank
+    session = GameSession(questions=QuestionBank(background=False, seed=4))
+    session.start("bench", "Normal", learning_mode=True, seed=4, mode="endless")
+
+    def fn():
+        for _ in range(2000):
+            session.new_question()
+            if session.answer(session.current_answer).state == CLEARED:
+                session.advance_level()
+    return fn, 2000
+
+
+@bench("analytics.report")
+def _analytics_report():
+    # synthetic store: 200k answered questions, grouped by level
+    import array
+    import random
+    import analytics
+    rng = random.Random(5)
+    n = 200000
+    store = analytics.Store(tempfile.mkdtemp(prefix="bench-analytics-"))
+    batch = {name: array.array(t) for name, t in analytics.COLUMNS.items()}
+    for i in range(n):
+        latency = rng.lognormvariate(8, 0.5)
+        row = {"ts": i, "level": rng.randint(1, 25), "kind": rng.choice((0, 0, 0, 1, 2)),
+               "correct": rng.random() < 0.7, "ops": rng.randrange(128), "latency": latency,
+               "lat_bucket": analytics.latency_bucket(latency), "difficulty": rng.randrange(4),
+               "mode": rng.randrange(2), "game_mode": rng.randrange(3), "player": rng.randrange(500)}
+        for name, value in row.items():
+            batch[name].append(value)
+    store.append(batch)
+
+    def fn():
+        analytics.report(store, "level")
+    return fn, n
+
+
+# ---------------- Tk benchmarks ----------------
+_app = None
+
+
+def game_app():
+    """The real app on its game screen, with throwaway db/log files."""
+    global _app
+    if _app is None:
+        import importlib
+        import importlib.util
+        import tkinter as tk
+        tmp = tempfile.mkdtemp(prefix="bench-")
+        os.environ["MATH_ADVENTURE_DB"] = os.path.join(tmp, "leaderboard.db")
+        os.environ["MATH_ADVENTURE_TELEMETRY"] = os.path.join(tmp, "events.jsonl")
+        os.environ["MATH_ADVENTURE_SAVE"] = os.path.join(tmp, "savegame.bin")
+        if "paths" in sys.modules:
+            # read with the real locations by an earlier bench (analytics)
+            importlib.reload(sys.modules["paths"])
+        spec = importlib.util.spec_from_file_location("math_adventure", os.path.join(ROOT, "math advanture.py"))
+        mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(mod)
+        root = tk.Tk()
+        _app = mod.MathAdventureApp(root)
+        _app.session.start("bench", "Normal")
+        _app.show_game()
+        _app._spawn_monster()
+        root.update()
+    return _app
+
+
+@bench("tk.draw_hp_bars", group="tk")
+def _draw_hp_bars():
+    app = game_app()
+    s = app.session
+
+    def fn():
+        for i in range(200):
+            s.enemy_hp = i % (s.enemy_max_hp + 1)
+            s.player_hp = i % (s.max_player_hp + 1)
+            app._draw_hp_bars()
+            app.render_queue.flush()
+            app.root.update_idletasks()
+    return fn, 200
+
+
+@bench("tk.spawn_monster", group="tk")
+def _spawn_monster():
+    app = game_app()
+
+    def fn():
+        for level in range(1, 51):
+            s = app.session
+            s.level = 1 + level % 5
+            s.spec = s.rules.levels.spec(s.level)   # _spawn_monster draws spec's monster
+            app._spawn_monster()
+            app.root.update_idletasks()
+        app.sched.cancel_all()
+    return fn, 50
+
+
+# ---------------- runner ----------------
+def measure(setup, repeat):
+    fn, ops = setup()
+    fn()  # warm-up: imports, caches, first batches
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    per_op = [t / ops * 1e9 for t in times]
+    return {"ns_per_op": statistics.median(per_op), "ns_per_op_min": min(per_op),
+            "ops": ops, "repeat": repeat}
+
+
+def run_group(group, only, repeat):
+    results = {}
+    for name, (g, setup) in BENCHES.items():
+        if g != group or (only and only not in name):
+            continue
+        results[name] = dict(measure(setup, repeat), group=g)
+        print(f"{name:34s} {results[name]['ns_per_op']:12,.0f} ns/op", file=sys.stderr)
+    return results
+
+
+def run_tk_child(args):
+    """Run the tk group in a child under xvfb-run; returns its results."""
+    xvfb = shutil.which("xvfb-run")
+    if xvfb is None:
+        print("tk benchmarks skipped: no DISPLAY and xvfb-run not found", file=sys.stderr)
+        return {}
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "tk.json")
+        cmd = [xvfb, "-a", sys.executable, os.path.abspath(__file__), "run", "--group", "tk",
+               "--repeat", str(args.repeat), "-o", out]
+        if args.only:
+            cmd += ["--only", args.only]
+        subprocess.run(cmd, cwd=ROOT, check=True)
+        with open(out) as f:
+            return json.load(f)["results"]
+
+
+def cmd_run(args):
+    results = {}
+    if args.group in ("all", "logic"):
+        results.update(run_group("logic", args.only, args.repeat))
+    if args.group in ("all", "tk"):
+        if os.environ.get("DISPLAY"):
+            results.update(run_group("tk", args.only, args.repeat))
+        else:
+            results.update(run_tk_child(args))
+    try:
+        import numpy  # noqa: F401
+        has_numpy = True
+    except ImportError:
+        has_numpy = False
+    doc = {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "numpy": has_numpy, "time": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "results": results,
+    }
+    text = json.dumps(doc, indent=1)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+def cmd_compare(args):
+    with open(args.baseline) as f:
+        base = json.load(f)["results"]
+    with open(args.current) as f:
+        cur = json.load(f)["results"]
+    regressions = 0
+    print(f"{'benchmark':34s} {'baseline':>12s} {'current':>12s} {'change':>8s}")
+    for name in sorted(set(base) | set(cur)):
+        if name not in base or name not in cur:
+            print(f"{name:34s} {'(only in ' + ('baseline' if name in base else 'current') + ')':>34s}")
+            continue
+        b, c = base[name]["ns_per_op"], cur[name]["ns_per_op"]
+        change = c / b - 1.0
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif change < -args.threshold:
+            flag = "  faster"
+        print(f"{name:34s} {b:12,.0f} {c:12,.0f} {change:+8.1%}{flag}")
+    if regressions:
+        print(f"{regressions} benchmark(s) slower than {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Math Adventure benchmark suite")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("run", help="run benchmarks and write JSON results")
+    r.add_argument("-o", "--output", help="results file (default: stdout)")
+    r.add_argument("--group", choices=("all", "logic", "tk"), default="all")
+    r.add_argument("--only", help="run only benchmarks whose name contains this")
+    r.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark (median is kept)")
+    c = sub.add_parser("compare", help="compare two result files")
+    c.add_argument("baseline")
+    c.add_argument("current")
+    c.add_argument("--threshold", type=float, default=0.10,
+                   help="relative slowdown that counts as a regression (default 0.10)")
+    args = ap.parse_args(argv)
+    return cmd_run(args) if args.cmd == "run" else cmd_compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+"""
+soak.py
+Multi-hour soak of the real Tk game in compressed time.
+The scheduler gets a fake clock and frames are pumped by hand, so hours
+of learning-mode play (answers, misses, timeouts, restarts, trips to the
+menu) run in minutes. After a warm-up it samples:
+- Python heap (tracemalloc)
+- canvas items alive and canvas items ever created
+- scheduler tasks and Tk after() jobs pending
+and fails if any of them keeps growing.
+Needs a display; without DISPLAY it re-runs itself under xvfb-run
+(skipped if missing).
+Run:  python benchmarks/soak.py [--hours 3] [--json]
+"""
+
+import argparse
+import gc
+import importlib.util
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from arith import format_answer  # noqa: E402
+from game_core import LOST, QUESTION, WON  # noqa: E402
+
+FRAME_S = 1 / 30
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def build_app():
+    import tkinter as tk
+    tmp = tempfile.mkdtemp(prefix="soak-")
+    os.environ["MATH_ADVENTURE_DB"] = os.path.join(tmp, "leaderboard.db")
+    os.environ["MATH_ADVENTURE_TELEMETRY"] = os.path.join(tmp, "events.jsonl")
+    os.environ["MATH_ADVENTURE_SAVE"] = os.path.join(tmp, "savegame.bin")
+    spec = importlib.util.spec_from_file_location("math_adventure", os.path.join(ROOT, "math advanture.py"))
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    root = tk.Tk()
+    app = mod.MathAdventureApp(root)
+    clock = FakeClock()
+    app.sched.clock = clock
+    return app, clock
+
+
+class Soak:
+    def __init__(self, hours, seed):
+        self.app, self.clock = build_app()
+        self.end = self.clock.now + hours * 3600.0
+        self.rng = random.Random(seed)
+        self.turns = self.games = self.menus = 0
+
+    def pump(self, seconds):
+        """Advance game time frame by frame."""
+        app = self.app
+        for _ in range(max(1, int(seconds / FRAME_S))):
+            self.clock.now += FRAME_S
+            app.sched.step()
+            app.root.update_idletasks()
+
+    def start_from_menu(self):
+        app = self.app
+        app.show_menu()
+        app.entry_name.delete(0, "end")
+        app.entry_name.insert(0, "soak")
+        app.start_learning_mode()
+
+    def turn(self):
+        app, s, rng = self.app, self.app.session, self.rng
+        # wait for the next question (feedback delays, level transitions)
+        while s.state != QUESTION or app._timer_idle is not None:
+            if s.state in (WON, LOST):
+                self.games += 1
+                self.pump(1.0)
+                app._reset_game_state()
+            self.pump(0.1)
+        roll = rng.random()
+        if roll < 0.03:
+            # let it time out
+            self.pump(app.deadline.limit + 0.5)
+        elif roll < 0.04:
+            app.restart_game()
+            self.pump(0.2)
+            app.notifier.answer(True)
+        elif roll < 0.045:
+            app.back_to_menu()
+            self.pump(0.2)
+            app.notifier.answer(True)
+            self.menus += 1
+            self.pump(1.0)
+            self.start_from_menu()
+        else:
+            self.pump(rng.uniform(0.5, 3.0))
+            if s.state != QUESTION:
+                return
+            correct = rng.random() < 0.8
+            text = format_answer(s.current_answer) if correct else "-99999"
+            app.entry_answer.delete(0, "end")
+            app.entry_answer.insert(0, text)
+            app.submit_answer()
+            # let projectiles, knockback and flashes play out
+            self.pump(0.8)
+        self.turns += 1
+
+    def sample(self):
+        app = self.app
+        app.root.update()
+        gc.collect()
+        return {
+            "game_hours": round((self.clock.now - 1000.0) / 3600.0, 2),
+            "turns": self.turns,
+            "heap_kb": round(tracemalloc.get_traced_memory()[0] / 1024.0, 1),
+            "items": len(app.canvas.find_all()),
+            "items_created": app.canvas.created,
+            "tasks": app.sched.active(),
+            "tk_after": len(app.root.tk.splitlist(app.root.tk.call("after", "info"))),
+        }
+
+    def run(self, samples):
+        self.start_from_menu()
+        self.pump(1.0)
+        tracemalloc.start()
+        period = (self.end - self.clock.now) / samples
+        out = []
+        next_sample = self.clock.now
+        while self.clock.now < self.end:
+            self.turn()
+            if self.clock.now >= next_sample:
+                out.append(self.sample())
+                next_sample += period
+        out.append(self.sample())
+        tracemalloc.stop()
+        return out
+
+
+def check(samples, heap_slack_kb):
+    """Compare the second half of the run with the sample after warm-up."""
+    base = samples[len(samples) // 4]
+    later = samples[len(samples) // 4 + 1:]
+    problems = []
+    for key in ("items", "items_created", "tk_after"):
+        worst = max(s[key] for s in later)
+        if worst > base[key]:
+            problems.append(f"{key} grew from {base[key]} to {worst}")
+    # tasks vary with what is on screen; only a trend counts
+    half = len(samples) // 2
+    if min(s["tasks"] for s in samples[half:]) > max(s["tasks"] for s in samples[:half]):
+        problems.append("scheduler tasks keep growing")
+    heap = [s["heap_kb"] for s in later]
+    if heap and heap[-1] - base["heap_kb"] > heap_slack_kb:
+        problems.append(f"heap grew {heap[-1] - base['heap_kb']:.0f} KB")
+    return problems
+
+
+def run_under_xvfb(argv):
+    xvfb = shutil.which("xvfb-run")
+    if xvfb is None:
+        print("soak skipped: no DISPLAY and xvfb-run not found", file=sys.stderr)
+        return 0
+    return subprocess.call([xvfb, "-a", sys.executable, os.path.abspath(__file__)] + argv, cwd=ROOT)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    ap = argparse.ArgumentParser(description="Compressed-time soak test of the Tk game")
+    ap.add_argument("--hours", type=float, default=3.0, help="game time to simulate")
+    ap.add_argument("--samples", type=int, default=24)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--heap-slack-kb", type=float, default=256.0,
+                    help="heap growth allowed after warm-up (caches settling)")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args(argv)
+    if not os.environ.get("DISPLAY"):
+        return run_under_xvfb(argv)
+
+    soak = Soak(args.hours, args.seed)
+    samples = soak.run(args.samples)
+    problems = check(samples, args.heap_slack_kb)
+    if args.json:
+        print(json.dumps({"turns": soak.turns, "games": soak.games, "menus": soak.menus,
+                          "samples": samples, "problems": problems}))
+    else:
+        print(f"{soak.turns} turns, {soak.games} games, {soak.menus} trips to the menu")
+        print(f"{'hours':>6} {'turns':>7} {'heap KB':>9} {'items':>6} {'created':>8} {'tasks':>6} {'after':>6}")
+        for s in samples:
+            print(f"{s['game_hours']:6.2f} {s['turns']:7d} {s['heap_kb']:9.1f} {s['items']:6d} "
+                  f"{s['items_created']:8d} {s['tasks']:6d} {s['tk_after']:6d}")
+        for p in problems:
+            print(f"LEAK: {p}")
+        if not problems:
+            print("flat")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
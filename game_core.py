@@ -0,0 +1,374 @@
+"""
+game_core.py
+Headless game rules for Math Adventure (no Tk import):
+- Rules: tunable numbers (timers, HP curve, combo bonus, skill chances)
+- GameSession: one player's run as a small state machine
+- front-end helpers shared by the Tk game and tui.py: seeds, session
+  ids, the per-turn telemetry event and the end-of-game bookkeeping
+Monster skills and level specs live in levels.py.
+The GUI, simulator and tests all drive the same GameSession.
+"""
+
+import os
+import random
+import time
+
+from arith import check_answer, format_answer
+from levels import MODES, MONSTER_SKILLS, LevelTable, last_level  # noqa: F401 (MONSTER_SKILLS re-exported)
+from questions import QuestionBank
+
+MAX_LEVEL = 5
+
+# Difficulty timers (seconds per question)
+DIFFICULTY_TIMER = {
+    "Easy": 15,
+    "Normal": 10,
+    "Hard": 7,
+    "Nightmare": 4
+}
+
+# Session states
+QUESTION = "question"   # waiting for an answer
+RESOLVED = "resolved"   # turn done, next question pending
+CLEARED = "cleared"     # enemy down, advance_level pending
+LOST = "lost"
+WON = "won"
+
+
+class Rules:
+    """Balancing numbers. Defaults are the game as shipped."""
+
+    __slots__ = ("max_level", "max_player_hp", "difficulty_timer", "combo_step",
+                 "enemy_hp_base", "enemy_hp_step", "counter_chance", "shield_chance",
+                 "slow_chance", "slow_seconds", "boss_time_cut", "min_time",
+                 "score_per_level", "shield_score", "clear_bonus", "tournament_levels",
+                 "enemy_hp_round", "levels")
+
+    def __init__(self, **overrides):
+        self.max_level = MAX_LEVEL
+        self.max_player_hp = 5
+        self.difficulty_timer = dict(DIFFICULTY_TIMER)
+        self.combo_step = 3          # every 3 combo +1 damage
+        self.enemy_hp_base = 3       # enemy HP = base + (level-1) * step
+        self.enemy_hp_step = 2
+        self.counter_chance = 0.20   # Goblin (level 2)
+        self.shield_chance = 0.30    # Fluffy (level 3)
+        self.slow_chance = 0.25      # Golem (level 4)
+        self.slow_seconds = 2
+        self.boss_time_cut = 3       # Dark Demon (level 5)
+        self.min_time = 3
+        self.score_per_level = 10
+        self.shield_score = 2
+        self.clear_bonus = 20
+        self.tournament_levels = 25
+        self.enemy_hp_round = 2      # generated levels: extra HP per round of five
+        for key, value in overrides.items():
+            setattr(self, key, value)
+        self.levels = LevelTable(self)
+
+    def enemy_max_hp(self, level):
+        """HP curve of the hand-made levels (levels.LevelTable extends it)."""
+        return self.enemy_hp_base + (level - 1) * self.enemy_hp_step
+
+    def base_time(self, difficulty):
+        return self.difficulty_timer.get(difficulty, 10)
+
+
+DEFAULT_RULES = Rules()
+
+
+class TurnResult:
+    """What happened on one answer / skip / timeout."""
+
+    __slots__ = ("kind", "correct", "damage", "blocked", "countered", "hp_lost", "state")
+
+    def __init__(self, kind, correct=False, damage=0, blocked=False, countered=False,
+                 hp_lost=0, state=RESOLVED):
+        self.kind = kind            # "answer", "skip" or "timeout"
+        self.correct = correct
+        self.damage = damage        # damage dealt to the enemy
+        self.blocked = blocked      # Fluffy shield blocked the hit
+        self.countered = countered  # Goblin counterattack fired
+        self.hp_lost = hp_lost      # player HP actually lost this turn
+        self.state = state          # session state after the turn
+
+
+class GameSession:
+    """
+    One run: start() -> new_question() -> answer()/skip()/timeout() -> ...
+    After a turn, state says what comes next:
+      RESOLVED -> new_question()
+      CLEARED  -> advance_level() (then new_question() unless WON)
+      LOST / WON -> game over
+    start(seed=...) makes the run reproducible: the session RNG and the
+    question bank are reseeded, and every input is recorded with its time
+    (see recording() and replay.py).
+    """
+
+    __slots__ = ("rules", "rng", "questions", "player_name", "difficulty", "learning_mode",
+                 "mode", "last_level", "spec", "level", "player_hp", "enemy_hp", "score", "combo", "state",
+                 "current_question", "current_answer", "time_limit", "slowed",
+                 "seed", "inputs", "clock", "t0")
+
+    def __init__(self, rules=None, rng=None, questions=None, clock=time.monotonic):
+        self.rules = rules or DEFAULT_RULES
+        self.rng = rng or random.Random()
+        self.questions = questions or QuestionBank(background=False)
+        self.clock = clock
+        self.seed = None
+        self.inputs = None
+        self.t0 = 0.0
+        self.player_name = ""
+        self.difficulty = "Normal"
+        self.learning_mode = False
+        self.mode = "classic"
+        self.last_level = self.rules.max_level
+        self.level = 1
+        self.spec = self.rules.levels.spec(1)
+        self.player_hp = self.rules.max_player_hp
+        self.enemy_hp = self.spec.enemy_hp
+        self.score = 0
+        self.combo = 0
+        self.state = RESOLVED
+        self.current_question = ""
+        self.current_answer = None
+        self.time_limit = 0
+        self.slowed = False
+
+    # ---------------- setup ----------------
+    def start(self, player_name="", difficulty="Normal", learning_mode=False, seed=None, mode="classic"):
+        if mode not in MODES:
+            raise ValueError(f"unknown mode {mode!r}")
+        self.seed = seed
+        self.inputs = None
+        if seed is not None:
+            self.rng = random.Random(seed)
+            self.questions.reseed(seed)
+            self.inputs = []
+            self.t0 = self.clock()
+        self.player_name = player_name
+        self.difficulty = difficulty
+        self.learning_mode = learning_mode
+        self.mode = mode
+        self.last_level = last_level(mode, self.rules)
+        self.level = 1
+        self.score = 0
+        self.combo = 0
+        self._reset_level()
+
+    def _reset_level(self):
+        self.spec = self.rules.levels.spec(self.level)
+        self.player_hp = self.rules.max_player_hp
+        self.enemy_hp = self.spec.enemy_hp
+        self.state = RESOLVED
+
+    @property
+    def enemy_max_hp(self):
+        return self.spec.enemy_hp
+
+    @property
+    def max_player_hp(self):
+        return self.rules.max_player_hp
+
+    @property
+    def over(self):
+        return self.state in (LOST, WON)
+
+    @property
+    def board(self):
+        return board_mode(self.mode, self.learning_mode)
+
+    @property
+    def level_reached(self):
+        """Highest level played (level is one past the last after a win)."""
+        if self.last_level is None:
+            return self.level
+        return min(self.level, self.last_level)
+
+    # ---------------- recording ----------------
+    def _record(self, kind, value=None):
+        if self.inputs is not None:
+            ms = int((self.clock() - self.t0) * 1000)
+            self.inputs.append([ms, kind] if value is None else [ms, kind, str(value)])
+
+    def recording(self):
+        """Seed, settings, inputs and final state of a seeded run (a JSON-able dict)."""
+        return {
+            "v": 1,
+            "seed": self.seed,
+            "difficulty": self.difficulty,
+            "learning": self.learning_mode,
+            "mode": self.mode,
+            "bank": {"batch": self.questions.batch_size, "numpy": self.questions.use_numpy},
+            "inputs": self.inputs or [],
+            "final": self.final_state(),
+        }
+
+    def final_state(self):
+        return {"score": self.score, "player_hp": self.player_hp,
+                "level": self.level, "state": self.state}
+
+    # ---------------- questions ----------------
+    def new_question(self):
+        """Draw the next question; returns the time limit in seconds."""
+        spec = self.spec
+        self.current_question, self.current_answer = self.questions.next(spec.tier)
+        base_time = self.rules.base_time(self.difficulty)
+        # Golem slow, boss timer, ...
+        self.slowed = False
+        for hook in spec.time_hooks:
+            base_time = hook(self, base_time)
+        self.time_limit = base_time
+        self.state = QUESTION
+        return base_time
+
+    # ---------------- turns ----------------
+    def _hurt(self):
+        # penalty (no HP loss in learning mode)
+        if self.learning_mode:
+            return 0
+        self.player_hp -= 1
+        return 1
+
+    def _after_hurt(self):
+        if self.player_hp <= 0 and not self.learning_mode:
+            return LOST
+        return RESOLVED
+
+    def answer(self, value):
+        """Resolve an answer (int/Fraction, or None for unparsable input)."""
+        self._record("a", value)
+        r = self.rules
+        spec = self.spec
+        if not check_answer(value, self.current_answer):
+            self.combo = 0
+            hp_lost = self._hurt()
+            self.state = self._after_hurt()
+            return TurnResult("answer", hp_lost=hp_lost, state=self.state)
+
+        self.combo += 1
+        dmg = 1 + (self.combo // r.combo_step)
+        # Fluffy shield blocks the hit but still gives a little score
+        blocked = False
+        for hook in spec.block_hooks:
+            blocked = hook(self) or blocked
+        if blocked:
+            self.score += r.shield_score
+        else:
+            self.enemy_hp -= dmg
+        # Goblin counterattack
+        countered = False
+        for hook in spec.counter_hooks:
+            countered = hook(self) or countered
+        hp_lost = self._hurt() if countered else 0
+        self.score += r.score_per_level * self.level
+
+        if self.enemy_hp <= 0:
+            self.state = CLEARED
+        else:
+            self.state = self._after_hurt()
+        return TurnResult("answer", True, 0 if blocked else dmg, blocked, countered,
+                          hp_lost, self.state)
+
+    def skip(self):
+        self._record("s")
+        hp_lost = self._hurt()
+        self.state = self._after_hurt()
+        return TurnResult("skip", hp_lost=hp_lost, state=self.state)
+
+    def timeout(self):
+        self._record("t")
+        hp_lost = self._hurt()
+        self.state = self._after_hurt()
+        return TurnResult("timeout", hp_lost=hp_lost, state=self.state)
+
+    # ---------------- level flow ----------------
+    def advance_level(self):
+        """Award the clear bonus and move on; returns the bonus."""
+        bonus = self.rules.clear_bonus * self.level
+        self.score += bonus
+        self.level += 1
+        self.combo = 0
+        if self.last_level is not None and self.level > self.last_level:
+            self.state = WON
+        else:
+            # reset player HP to max for the new level
+            self._reset_level()
+        return bonus
+
+
+# ---------------- front-end helpers ----------------
+def board_mode(mode, learning_mode):
+    """Leaderboard mode of a run: "learning", "normal" (classic) or the mode."""
+    if learning_mode:
+        return "learning"
+    return "normal" if mode == "classic" else mode
+
+
+def new_seed(fixed=None):
+    """Seed for a new run; every run is seeded so it can be replayed (replay.py)."""
+    if fixed is not None:
+        return fixed
+    return random.SystemRandom().randrange(1 << 31)
+
+
+def new_session_id():
+    return os.urandom(16).hex()
+
+
+def turn_event(session, result, question, answer, player_input, latency_ms, session_id, client):
+    """Telemetry event for one answer / skip / timeout (analytics.py reads these)."""
+    s = session
+    effects = []
+    if result.blocked:
+        effects.append("shield")
+    if result.countered:
+        effects.append("counter")
+    if s.slowed:
+        effects.append("slow")
+    if "boss" in s.spec.skills:
+        effects.append("boss_timer")
+    return {
+        "type": result.kind,
+        "session": session_id,
+        "player": s.player_name,
+        "difficulty": s.difficulty,
+        "mode": "learning" if s.learning_mode else "normal",
+        "game_mode": s.mode,
+        "level": s.level,
+        "expression": question,
+        "answer": format_answer(answer),
+        "input": player_input,
+        "correct": result.correct,
+        "latency_ms": round(latency_ms, 1),
+        "time_limit": s.time_limit,
+        "combo": s.combo,
+        "damage": result.damage,
+        "hp_lost": result.hp_lost,
+        "effects": effects,
+        "player_hp": s.player_hp,
+        "enemy_hp": s.enemy_hp,
+        "score": s.score,
+        "client": client,
+    }
+
+
+def finish_game(session, won, leaderboard, telemetry, session_id):
+    """Log the recording and add the score; True if it is a new best for its board."""
+    s = session
+    # resumed runs have no seed: they can't be replayed
+    if s.seed is not None:
+        telemetry.emit(dict(s.recording(), type="recording", session=session_id))
+    try:
+        return leaderboard.add(s.player_name, s.score, s.difficulty, s.board,
+                               level=s.level_reached, won=won)
+    except Exception:
+        return False
+
+
+def best_score(leaderboard):
+    """(name, score) for the menu, served from the leaderboard's in-memory cache."""
+    try:
+        return leaderboard.best()
+    except Exception:
+        return ("-", 0)
@@ -0,0 +1,120 @@
+"""
+leaderboard.py
+Leaderboard store shared by several game instances.
+- SQLite database; every write is one transaction, so a crash or a
+  second instance never leaves a half-written file
+- scores are kept per difficulty and per mode ("normal" / "learning")
+- the top N of each (difficulty, mode) is cached in memory; the menu
+  reads the cache, and other instances' writes are picked up with a
+  cheap PRAGMA data_version check instead of re-reading scores
+- the old single-line highscore.txt is imported once
+WAL mode is used by default. On a network share pass wal=False: WAL
+needs shared memory that network filesystems do not provide, while the
+rollback journal relies only on file locks. The game reads this from
+MATH_ADVENTURE_DB_WAL=0.
+"""
+
+import os
+import sqlite3
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    difficulty TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    level INTEGER NOT NULL DEFAULT 0,
+    won INTEGER NOT NULL DEFAULT 0,
+    ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_board ON scores (difficulty, mode, score DESC);
+"""
+
+
+class Leaderboard:
+    def __init__(self, path, top_n=10, wal=True, legacy_file=None):
+        self.path = path
+        self.top_n = top_n
+        self.conn = sqlite3.connect(path, timeout=10.0, isolation_level=None)
+        self.conn.execute("PRAGMA busy_timeout = 10000")
+        # the journal mode is stored in the file: switch back explicitly
+        self.conn.execute("PRAGMA journal_mode = WAL" if wal else "PRAGMA journal_mode = DELETE")
+        self.conn.executescript(SCHEMA)
+        self._cache = {}
+        self._version = None
+        self.refresh()
+        if legacy_file:
+            self._import_legacy(legacy_file)
+
+    # ---------------- cache ----------------
+    def _data_version(self):
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def refresh(self, force=True):
+        """Reload the top-N cache (only if another connection wrote, unless force)."""
+        version = self._data_version()
+        if not force and version == self._version:
+            return
+        self._version = version
+        cache = {}
+        rows = self.conn.execute(
+            "SELECT difficulty, mode, name, score FROM ("
+            " SELECT difficulty, mode, name, score, ROW_NUMBER() OVER ("
+            "  PARTITION BY difficulty, mode ORDER BY score DESC, id) AS rn FROM scores"
+            ") WHERE rn <= ?", (self.top_n,))
+        for difficulty, mode, name, score in rows:
+            cache.setdefault((difficulty, mode), []).append((name, score))
+        for entries in cache.values():
+            entries.sort(key=lambda e: -e[1])
+        self._cache = cache
+
+    def top(self, difficulty, mode="normal"):
+        self.refresh(force=False)
+        return list(self._cache.get((difficulty, mode), []))
+
+    def best(self, difficulty=None, mode="normal"):
+        """(name, score) of the best entry; difficulty None = any difficulty."""
+        self.refresh(force=False)
+        best = ("-", 0)
+        for (diff, m), entries in self._cache.items():
+            if m != mode or (difficulty is not None and diff != difficulty):
+                continue
+            if entries and entries[0][1] > best[1]:
+                best = entries[0]
+        return best
+
+    # ---------------- writes ----------------
+    def add(self, name, score, difficulty, mode="normal", level=0, won=False):
+        """Record a finished game; returns True if it is a new best for its board."""
+        previous = self.best(difficulty, mode)[1]
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.execute(
+                "INSERT INTO scores (name, score, difficulty, mode, level, won, ts) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (name, int(score), difficulty, mode, int(level), int(bool(won)), time.time()))
+        # our own commit doesn't change data_version for this connection
+        entries = self._cache.setdefault((difficulty, mode), [])
+        entries.append((name, int(score)))
+        entries.sort(key=lambda e: -e[1])
+        del entries[self.top_n:]
+        return score > previous
+
+    def _import_legacy(self, legacy_file):
+        if not os.path.exists(legacy_file):
+            return
+        if self.conn.execute("SELECT 1 FROM scores LIMIT 1").fetchone():
+            return
+        try:
+            with open(legacy_file, "r") as f:
+                t = f.read().strip()
+            name, sc = t.split("|", 1) if "|" in t else ("-", t)
+            score = int(sc)
+        except (OSError, ValueError):
+            return
+        # the old file didn't record a difficulty; file it under Normal
+        self.add(name, score, "Normal", "normal")
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,141 @@
+"""
+levels.py
+Monster skills and levels as data, for game_core.GameSession:
+- SKILLS: skill name -> hooks (question time, shield block, counterattack)
+- MONSTER_SKILLS: the five hand-made monsters (Slime ... Dark Demon)
+- LevelTable: one LevelSpec per level (HP, question tier, skills and
+  their hook tuples), built on first use and cached. Levels past the
+  hand-made ones are generated in rounds of five that repeat the
+  monsters with more HP, harder questions and extra skills.
+- MODES: classic (the five levels), tournament, endless
+A session looks its spec up once per level; a turn only walks the spec's
+hook tuples, which are empty for monsters without that kind of skill.
+"""
+
+import random
+
+from questions import QUESTION_TIERS
+
+# classic ends after rules.max_level, tournament after
+# rules.tournament_levels, endless never ends (until HP runs out)
+MODES = ("classic", "tournament", "endless")
+
+
+# ---------------- skills ----------------
+# Hooks read their numbers from session.rules and roll session.rng, so a
+# seeded run replays the same way.
+def _slow(session, seconds):
+    # Golem: 25% chance the next question is 2s shorter
+    r = session.rules
+    if session.rng.random() < r.slow_chance:
+        session.slowed = True
+        seconds = max(r.min_time, seconds - r.slow_seconds)
+    return seconds
+
+
+def _boss_timer(session, seconds):
+    r = session.rules
+    return max(r.min_time, seconds - r.boss_time_cut)
+
+
+def _shield(session):
+    # Fluffy: blocks the hit but still gives a little score
+    return session.rng.random() < session.rules.shield_chance
+
+
+def _counter(session):
+    # Goblin: hits back when hit
+    return session.rng.random() < session.rules.counter_chance
+
+
+class Skill:
+    __slots__ = ("name", "text", "on_question", "blocks", "counters")
+
+    def __init__(self, name, text, on_question=None, blocks=None, counters=None):
+        self.name = name
+        self.text = text
+        self.on_question = on_question   # fn(session, seconds) -> seconds
+        self.blocks = blocks             # fn(session) -> True if the hit is blocked
+        self.counters = counters         # fn(session) -> True if the player is hit back
+
+
+SKILLS = {
+    "counter": Skill("counter", "Counterattack chance (20%) on hit", counters=_counter),
+    "shield": Skill("shield", "Shield (30% chance to block 1 damage)", blocks=_shield),
+    "slow": Skill("slow", "Slow (reduces your next question time by 2s)", on_question=_slow),
+    "boss": Skill("boss", "Boss: faster timer", on_question=_boss_timer),
+}
+
+# Skills a generated level may get on top of its monster's own
+EXTRA_SKILLS = ("counter", "shield", "slow")
+
+# Monster skill descriptions (used for flavor) and the skills they use
+MONSTER_SKILLS = {
+    1: {"name": "Slime", "skill": "No special skill", "skills": ()},
+    2: {"name": "Goblin", "skill": "Counterattack chance (20%) on hit", "skills": ("counter",)},
+    3: {"name": "Fluffy", "skill": "Shield (30% chance to block 1 damage)", "skills": ("shield",)},
+    4: {"name": "Golem", "skill": "Slow (reduces your next question time by 2s)", "skills": ("slow",)},
+    5: {"name": "Dark Demon", "skill": "Boss: double HP, faster timer", "skills": ("boss",)},
+}
+
+
+# ---------------- levels ----------------
+class LevelSpec:
+    __slots__ = ("level", "name", "skill", "skills", "enemy_hp", "tier", "sprite",
+                 "time_hooks", "block_hooks", "counter_hooks")
+
+    def __init__(self, level, name, skill, skills, enemy_hp, tier, sprite):
+        self.level = level
+        self.name = name
+        self.skill = skill           # description shown under the monster
+        self.skills = skills         # tuple of SKILLS keys
+        self.enemy_hp = enemy_hp
+        self.tier = tier             # question rules (questions.QUESTION_TIERS)
+        self.sprite = sprite         # which monster image to show (1..5)
+        hooks = [SKILLS[k] for k in skills]
+        self.time_hooks = tuple(s.on_question for s in hooks if s.on_question)
+        self.block_hooks = tuple(s.blocks for s in hooks if s.blocks)
+        self.counter_hooks = tuple(s.counters for s in hooks if s.counters)
+
+
+class LevelTable:
+    """LevelSpecs for one Rules object, generated on first use."""
+
+    def __init__(self, rules):
+        self.rules = rules
+        self._specs = {}
+
+    def spec(self, level):
+        try:
+            return self._specs[level]
+        except KeyError:
+            spec = self._specs[level] = self._build(level)
+            return spec
+
+    def _build(self, level):
+        r = self.rules
+        n = len(MONSTER_SKILLS)
+        rnd, pos = divmod(level - 1, n)
+        pos += 1
+        monster = MONSTER_SKILLS[pos]
+        if rnd == 0:
+            return LevelSpec(level, monster["name"], monster["skill"], monster["skills"],
+                             r.enemy_max_hp(level), min(level, QUESTION_TIERS), pos)
+        # round 1+: same monster, more HP, harder questions, up to two extra
+        # skills picked per level number (the same in every session)
+        skills = list(monster["skills"])
+        extra = [k for k in EXTRA_SKILLS if k not in skills]
+        skills += random.Random(level).sample(extra, min(rnd, 2, len(extra)))
+        text = "; ".join(SKILLS[k].text for k in skills) or monster["skill"]
+        return LevelSpec(level, f"{monster['name']} +{rnd}", text, tuple(skills),
+                         r.enemy_max_hp(pos) + rnd * r.enemy_hp_round,
+                         min(pos + rnd, QUESTION_TIERS), pos)
+
+
+def last_level(mode, rules):
+    """Level after which the run is won (None: endless)."""
+    if mode == "endless":
+        return None
+    if mode == "tournament":
+        return rules.tournament_levels
+    return rules.max_level
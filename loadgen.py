@@ -0,0 +1,187 @@
+"""
+loadgen.py
+Load generator for server.py: opens a few TCP connections, runs many
+game sessions over them, and reports answer latency (answer sent ->
+result received) and throughput.
+Simulated players read the question, "think" for a random time, then
+answer (correctly with probability --accuracy). Finished games restart
+until --duration is up.
+Run:  python server.py &  python loadgen.py --sessions 2000 --duration 30
+Exit code 1 if the p99 latency is over --max-p99-ms.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+from arith import ArithError, evaluate, format_answer
+from levels import MODES
+
+
+class Player:
+    __slots__ = ("sid", "sent_at", "think_handle")
+
+    def __init__(self, sid):
+        self.sid = sid
+        self.sent_at = None
+        self.think_handle = None
+
+
+class LoadClient:
+    """One TCP connection carrying a share of the sessions."""
+
+    def __init__(self, args, stats, sids, rng):
+        self.args = args
+        self.stats = stats
+        self.rng = rng
+        self.players = {sid: Player(sid) for sid in sids}
+        self.writer = None
+        self.stopping = False
+
+    def send(self, msg):
+        self.writer.write(json.dumps(msg, separators=(",", ":")).encode("utf-8") + b"\n")
+
+    def start_game(self, player):
+        self.send({"op": "start", "sid": player.sid, "name": player.sid,
+                   "difficulty": self.args.difficulty, "mode": self.args.mode,
+                   "seed": self.rng.randrange(1 << 30)})
+
+    def answer(self, player, q, text):
+        player.think_handle = None
+        if self.stopping:
+            return
+        player.sent_at = time.perf_counter()
+        self.send({"op": "answer", "sid": player.sid, "q": q, "text": text})
+
+    def on_question(self, player, msg):
+        try:
+            correct = format_answer(evaluate(msg["question"]))
+        except ArithError:
+            correct = "0"
+        text = correct if self.rng.random() < self.args.accuracy else "-1"
+        think = self.rng.uniform(self.args.think_min, self.args.think_max)
+        player.think_handle = asyncio.get_running_loop().call_later(
+            think, self.answer, player, msg["q"], text)
+
+    def on_message(self, msg):
+        player = self.players.get(msg.get("sid"))
+        ev = msg.get("ev")
+        if ev == "error" or player is None:
+            self.stats["errors"] += 1
+            return
+        if ev == "question":
+            self.on_question(player, msg)
+        elif ev == "result":
+            if msg["kind"] == "timeout":
+                self.stats["timeouts"] += 1
+                # too slow: drop the answer this player was about to send
+                if player.think_handle is not None:
+                    player.think_handle.cancel()
+                    player.think_handle = None
+            elif player.sent_at is not None:
+                self.stats["latency"].append(time.perf_counter() - player.sent_at)
+                player.sent_at = None
+        elif ev == "over":
+            self.stats["games"] += 1
+            if not self.stopping:
+                self.start_game(player)
+
+    async def run(self, deadline):
+        reader, self.writer = await asyncio.open_connection(self.args.host, self.args.port)
+        for player in self.players.values():
+            self.start_game(player)
+        await self.writer.drain()
+
+        async def pump():
+            while True:
+                line = await reader.readline()
+                if not line:
+                    return
+                self.on_message(json.loads(line))
+
+        reading = asyncio.ensure_future(pump())
+        try:
+            while time.monotonic() < deadline and not reading.done():
+                await asyncio.sleep(0.1)
+                await self.writer.drain()
+        finally:
+            self.stopping = True
+            for player in self.players.values():
+                if player.think_handle is not None:
+                    player.think_handle.cancel()
+                self.send({"op": "quit", "sid": player.sid})
+            await self.writer.drain()
+            reading.cancel()
+            self.writer.close()
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def run(args):
+    stats = {"latency": [], "timeouts": 0, "errors": 0, "games": 0}
+    rng = random.Random(args.seed)
+    sids = [f"p{i}" for i in range(args.sessions)]
+    clients = [LoadClient(args, stats, sids[i::args.connections], random.Random(rng.random()))
+               for i in range(args.connections)]
+    t0 = time.monotonic()
+    await asyncio.gather(*(c.run(t0 + args.duration) for c in clients))
+    elapsed = time.monotonic() - t0
+    lat = sorted(stats["latency"])
+    return {
+        "sessions": args.sessions,
+        "connections": args.connections,
+        "seconds": round(elapsed, 2),
+        "answers": len(lat),
+        "answers_per_s": round(len(lat) / elapsed, 1),
+        "timeouts": stats["timeouts"],
+        "errors": stats["errors"],
+        "games_finished": stats["games"],
+        "latency_ms": {name: round(percentile(lat, q) * 1000.0, 2)
+                       for name, q in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99), ("max", 1.0))},
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Load generator for server.py")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--sessions", type=int, default=1000)
+    ap.add_argument("--connections", type=int, default=20)
+    ap.add_argument("--duration", type=float, default=20.0, help="seconds")
+    ap.add_argument("--difficulty", default="Normal")
+    ap.add_argument("--mode", default="classic", choices=MODES)
+    ap.add_argument("--accuracy", type=float, default=0.8)
+    ap.add_argument("--think-min", type=float, default=0.5, help="seconds")
+    ap.add_argument("--think-max", type=float, default=3.0, help="seconds")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--max-p99-ms", type=float, default=None,
+                    help="fail (exit 1) if p99 answer latency is above this")
+    ap.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = ap.parse_args(argv)
+    args.connections = max(1, min(args.connections, args.sessions))
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report))
+    else:
+        print(f"{report['sessions']} sessions over {report['connections']} connections, "
+              f"{report['seconds']}s")
+        print(f"answers {report['answers']} ({report['answers_per_s']}/s), "
+              f"timeouts {report['timeouts']}, errors {report['errors']}, "
+              f"games finished {report['games_finished']}")
+        lat = report["latency_ms"]
+        print(f"latency ms: p50 {lat['p50']}  p95 {lat['p95']}  p99 {lat['p99']}  max {lat['max']}")
+    if args.max_p99_ms is not None and report["latency_ms"]["p99"] > args.max_p99_ms:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,28 +7,41 @@ Complete Math Adventure GUI with:
 - Dark/Light theme toggle
 - Learning mode (no HP loss)
 - Combo / streak system
-- Monster skills per level
+- Monster skills per level (levels.py)
+- Classic (5 levels), tournament and endless modes with generated levels
 - Difficulty modes (affect timer)
-- Highscore persistence (highscore.txt)
+- Leaderboard per difficulty/mode (leaderboard.db, SQLite; MATH_ADVENTURE_DB_WAL=0
+  on a network share)
+- Unfinished runs are saved (savegame.bin) and can be resumed from the menu
+- --seats N: N game windows in one process sharing sprites, question
+  generation, leaderboard and telemetry
+- tui.py: the same game in a terminal (curses), for machines without a display
 Requires only Python standard library. Pillow optional for image resizing
+Run with --profile-startup to print a launch time breakdown.
 """
 
-import tkinter as tk
-from tkinter import messagebox
-import random
-import os
-import math
 import time
+_START = time.perf_counter()
 
-# Try importing PIL for robust image resizing; optional
-try:
-    from PIL import Image, ImageTk
-    PIL_AVAILABLE = True
-except Exception:
-    PIL_AVAILABLE = False
-
-HIGHSCORE_FILE = "highscore.txt"
-MAX_LEVEL = 5
+import argparse
+import tkinter as tk
+import os
+import sys
+
+from arith import format_answer, parse_answer
+from notify import Notifier
+from paths import SAVE_FILE, TELEMETRY_LOG, open_leaderboard
+from perf import LagMonitor, PerfOverlay, QualityGovernor, StartupProfiler
+from game_core import (CLEARED, DIFFICULTY_TIMER, LOST, MAX_LEVEL, QUESTION, GameSession, best_score,
+                       finish_game, new_seed, new_session_id, turn_event)
+from levels import MODES
+from questions import QuestionBank, RefillWorker
+from render import Camera, CountingCanvas, HpBar, ItemPool, RenderQueue
+from scheduler import Deadline, FrameScheduler
+import snapshot
+from telemetry import TelemetryWriter
+import worksheets
+from sprites import SpriteCache
 
 # Candidate image filenames (include ones you uploaded)
 IMAGE_CANDIDATES = {
@@ -39,148 +52,118 @@ IMAGE_CANDIDATES = {
     5: ["finalboss.png", "e48733d8-6661-44ba-9618-413ba743f6a4.png", "/mnt/data/e48733d8-6661-44ba-9618-413ba743f6a4.png"]
 }
 
-# Difficulty timers (seconds per question)
-DIFFICULTY_TIMER = {
-    "Easy": 15,
-    "Normal": 10,
-    "Hard": 7,
-    "Nightmare": 4
+# Animation settings per quality level (QualityGovernor steps between them)
+QUALITY = {
+    QualityGovernor.HIGH: {"bob_ms": 160, "tween_step_ms": None, "stipple": True, "shake_px": 10},
+    QualityGovernor.MEDIUM: {"bob_ms": 240, "tween_step_ms": 66, "stipple": False, "shake_px": 8},
+    QualityGovernor.LOW: {"bob_ms": 400, "tween_step_ms": 125, "stipple": False, "shake_px": 6},
 }
 
-# Monster skill descriptions (used for flavor & simple effects)
-MONSTER_SKILLS = {
-    1: {"name": "Slime", "skill": "No special skill"},
-    2: {"name": "Goblin", "skill": "Counterattack chance (20%) on hit"},
-    3: {"name": "Fluffy", "skill": "Shield (30% chance to block 1 damage)"},
-    4: {"name": "Golem", "skill": "Slow (reduces your next question time by 2s)"},
-    5: {"name": "Dark Demon", "skill": "Boss: double HP, faster timer"}
-}
-# Debug cek apakah folder benar
-print(os.getcwd())
-print(os.path.exists("assets/slime.png"))
-
-# Utility: load first existing image from candidate list, optionally resize
-def load_image_try(candidates, size=None):
-    for p in candidates:
-        if os.path.exists(p):
-            try:
-                if PIL_AVAILABLE and size is not None:
-                    img = Image.open(p).convert("RGBA")
-                    img = img.resize(size, Image.LANCZOS)
-                    return ImageTk.PhotoImage(img)
-                else:
-                    # tkinter PhotoImage will fail for formats not supported; still try
-                    return tk.PhotoImage(file=p)
-            except Exception:
-                continue
-    return None
-
-# AI-like question generator
-def ai_generate_question(level):
+# Main App
+class SharedResources:
     """
-    Local 'AI' generator: creates varied questions depending on level.
-    Returns (question_text, answer_value)
+    The process-wide parts of the game: decoded sprites, the question
+    refill thread, the leaderboard cache and the telemetry writer.
+    A single window makes its own; --seats windows share one set.
     """
-    # Increase complexity with level
-    # Level 1-2: simple +/-
-    if level <= 2:
-        a = random.randint(1, 20 * level)
-        b = random.randint(1, 20 * level)
-        op = random.choice(["+", "-"])
-        q = f"{a} {op} {b}"
-        ans = eval(q)
-
-    # Level 3: mixed with multiplication and small parentheses
-    elif level == 3:
-        a = random.randint(2, 40)
-        b = random.randint(2, 30)
-        c = random.randint(1, 12)
-        op1 = random.choice(["+", "-", "*"])
-        op2 = random.choice(["+", "-", "*"])
-        q = f"({a} {op1} {b}) {op2} {c}"
-        ans = eval(q)
-
-    # Level 4: include division (clean) and modulo sometimes
-    elif level == 4:
-        op = random.choice(["+", "-", "*", "/"])
-        if op == "/":
-            # ensure integer division result
-            b = random.randint(2, 12)
-            result = random.randint(2, 12)
-            a = result * b
-            q = f"{a} / {b}"
-            ans = eval(q)
-        else:
-            a = random.randint(10, 120)
-            b = random.randint(2, 30)
-            q = f"{a} {op} {b}"
-            ans = eval(q)
-
-    # Level 5: boss complexity - nested operations, power, modulo, etc.
-    else:
-        pattern = random.choice([
-            lambda: f"({random.randint(20,150)} + {random.randint(5,80)}) * {random.randint(2,6)}",
-            lambda: f"{random.randint(4,18)}**2 - {random.randint(1,50)}",
-            lambda: f"({random.randint(30,200)} / {random.randint(2,20)}) + {random.randint(1,50)}",
-            lambda: f"({random.randint(20,120)} - {random.randint(1,60)}) * {random.randint(2,8)}",
-            lambda: f"({random.randint(50,200)} % {random.randint(2,20)}) + {random.randint(1,40)}"
-        ])
-        q = pattern()
-        try:
-            ans = eval(q)
-        except Exception:
-            # fallback to simpler expression
-            a = random.randint(20, 200); b = random.randint(2, 50)
-            q = f"{a} + {b}"
-            ans = eval(q)
 
-    # Normalize floats that are integers
-    if isinstance(ans, float) and ans.is_integer():
-        ans = int(ans)
+    def __init__(self, root, profiler=None, max_photos=3):
+        # Monster images are decoded on a worker thread, level 1 first;
+        # later levels are prefetched while the previous one is played
+        self.sprites = SpriteCache(root, IMAGE_CANDIDATES, size=(300, 280), max_photos=max_photos)
+        self.sprites.prefetch(1)
+        self.question_worker = RefillWorker()
+        if profiler:
+            profiler.mark("background jobs")
+
+        # leaderboard: top scores are cached, the menu never re-reads the file
+        self.leaderboard = open_leaderboard()
+        if profiler:
+            profiler.mark("leaderboard")
+
+        # per-answer event log, written by a background thread
+        self.telemetry = TelemetryWriter(TELEMETRY_LOG)
+
+    def close(self):
+        self.telemetry.close()
+        self.question_worker.close()
+        self.sprites.close()
 
-    return q, ans
 
-# Main App
 class MathAdventureApp:
-    def __init__(self, root):
+    def __init__(self, root, profiler=None, perf_log=None, seed=None, shared=None, save_file=SAVE_FILE):
         self.root = root
+        self.profiler = profiler or StartupProfiler()
+        self.perf_log = perf_log
+        self.fixed_seed = seed
         self.root.title("Math Adventure - Final")
         self.root.geometry("900x660")
         self.root.configure(bg="#111218")  # dark theme default
 
-        # Game variables
-        self.player_name = ""
-        self.level = 1
-        self.max_player_hp = 5
-        self.player_hp = self.max_player_hp
-        self.enemy_hp = 3
-        self.score = 0
-        self.combo = 0
-        self.learning_mode = False
+        # UI variables (game rules and state live in self.session)
         self.theme = "dark"  # or "light"
         self.difficulty = "Normal"
-        self.time_left = 0
-        self.timer_job = None
-        self.anim_job = None
-        self.projectile_job = None
-
-        # Load monster images (with fallback)
-        self.monster_imgs = {}
-        for lvl in range(1, MAX_LEVEL + 1):
-            cand = IMAGE_CANDIDATES.get(lvl, [])
-            img = load_image_try(cand, size=(300,280) if PIL_AVAILABLE else None)
-            self.monster_imgs[lvl] = img
-
-        # Build UI frames
+        self.deadline = Deadline(0)
+        self.last_latency_ms = 0.0
+        self._timer_idle = None
+        self.bob_dx = 6
+
+        # one frame clock drives every animation and the question timer;
+        # the lag monitor sees how late / how long every job runs
+        self.lag = LagMonitor()
+        self.sched = FrameScheduler(self.root, monitor=self.lag)
+        # animation quality follows measured frame cost (menu: low-power override)
+        self.quality = QualityGovernor(on_change=self._apply_quality)
+        self.fx = QUALITY[self.quality.level]
+        self.lag.frame_listeners.append(self.quality.frame)
+        self.perf_overlay = None
+        if perf_log:
+            self.lag.start_probe(self.root)
+            self.root.after(60000, self._dump_perf_log)
+        self.render_queue = RenderQueue(self.sched)
+
+        self.shared = shared or SharedResources(self.root, self.profiler)
+        self.sprites = self.shared.sprites
+        self.leaderboard = self.shared.leaderboard
+        self.telemetry = self.shared.telemetry
+        self.monster_img = None
+        self.session_id = ""
+
+        # Questions come from a prefetched bank (refilled in the background).
+        # Small batches: each run reseeds the bank, and replays regenerate them.
+        # The bank is per window (own seed); the refill thread is shared
+        self.questions = QuestionBank(batch_size=64, low_water=16, worker=self.shared.question_worker)
+        self.questions.prefetch(range(1, MAX_LEVEL + 1))
+        self.session = GameSession(questions=self.questions)
+
+        # unfinished run from last time (resume button on the menu);
+        # snapshots are written on every state change by a background thread
+        self.saved = snapshot.load(save_file)
+        self.saver = snapshot.SnapshotWriter(save_file)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.profiler.mark("snapshot")
+
+        # Build UI frames; game and over screens are built on first use
         self.frame_menu = tk.Frame(self.root, bg=self._bg())
-        self.frame_game = tk.Frame(self.root, bg=self._bg())
-        self.frame_over = tk.Frame(self.root, bg=self._bg())
+        self.frame_game = None
+        self.frame_over = None
 
         self._build_menu()
-        self._build_game()
-        self._build_over()
-
         self.show_menu()
+        self.profiler.mark("widget build")
+
+    def _frames(self):
+        return [f for f in (self.frame_menu, self.frame_game, self.frame_over) if f is not None]
+
+    def _ensure_game_frame(self):
+        if self.frame_game is None:
+            self.frame_game = tk.Frame(self.root, bg=self._bg())
+            self._build_game()
+
+    def _ensure_over_frame(self):
+        if self.frame_over is None:
+            self.frame_over = tk.Frame(self.root, bg=self._bg())
+            self._build_over()
 
     # ---------------- theme helper ----------------
     def _bg(self):
@@ -192,7 +175,7 @@ class MathAdventureApp:
     def toggle_theme(self):
         self.theme = "light" if self.theme == "dark" else "dark"
         # update backgrounds of frames
-        for f in (self.frame_menu, self.frame_game, self.frame_over):
+        for f in self._frames():
             f.configure(bg=self._bg())
         # rebuild or update existing widgets color
         self.show_menu()
@@ -214,6 +197,9 @@ class MathAdventureApp:
         tk.Label(name_frame, text="Nama:", fg=self._fg(), bg=self._bg()).pack(side=tk.LEFT, padx=(0,6))
         self.entry_name = tk.Entry(name_frame, font=("Arial", 14), width=28)
         self.entry_name.pack(side=tk.LEFT)
+        self.entry_name.bind("<Return>", lambda e: self.start_game())
+        self.lbl_menu_msg = tk.Label(f, text="", fg="#ff6b6b", bg=self._bg(), font=("Arial", 11))
+        self.lbl_menu_msg.pack()
 
         # difficulty selector
         diff_frame = tk.Frame(f, bg=self._bg())
@@ -223,23 +209,43 @@ class MathAdventureApp:
         diff_menu = tk.OptionMenu(diff_frame, self.diff_var, *DIFFICULTY_TIMER.keys())
         diff_menu.config(width=10)
         diff_menu.pack(side=tk.LEFT)
+        # classic = 5 levels; tournament and endless continue with generated levels
+        tk.Label(diff_frame, text="Mode:", fg=self._fg(), bg=self._bg()).pack(side=tk.LEFT, padx=(12,8))
+        self.mode_var = tk.StringVar(value="classic")
+        mode_menu = tk.OptionMenu(diff_frame, self.mode_var, *MODES)
+        mode_menu.config(width=10)
+        mode_menu.pack(side=tk.LEFT)
 
         # buttons
         btn_frame = tk.Frame(f, bg=self._bg())
         btn_frame.pack(pady=18)
-        tk.Button(btn_frame, text="▶ Start", font=("Arial", 14), width=18, bg="#4e8cff", fg="white", command=self.start_game).pack(pady=6)
+        self.btn_resume = tk.Button(btn_frame, text="", font=("Arial", 12), width=26, bg="#c27c0e", fg="white",
+                                    command=self.resume_game)
+        self.btn_start = tk.Button(btn_frame, text="▶ Start", font=("Arial", 14), width=18, bg="#4e8cff", fg="white", command=self.start_game)
+        self.btn_start.pack(pady=6)
         tk.Button(btn_frame, text="📘 Learning Mode", font=("Arial", 12), width=18, bg="#6aa84f", fg="white", command=self.start_learning_mode).pack(pady=6)
         tk.Button(btn_frame, text="🎨 Toggle Theme", font=("Arial", 12), width=18, bg="#6b6b6b", fg="white", command=self.toggle_theme).pack(pady=6)
+        self.low_power_var = tk.BooleanVar(value=self.quality.low_power)
+        tk.Checkbutton(btn_frame, text="🔋 Mode hemat daya (animasi ringan)", variable=self.low_power_var,
+                       command=lambda: self.quality.set_low_power(self.low_power_var.get()),
+                       fg=self._fg(), bg=self._bg(), selectcolor=self._bg(), activebackground=self._bg()).pack(pady=6)
 
         # highscore
-        hs_name, hs_score = self._load_highscore()
-        tk.Label(f, text=f"Highscore: {hs_name} — {hs_score}", fg="#ffd26b", bg=self._bg(), font=("Arial", 12)).pack(pady=(18,4))
+        self.lbl_highscore = tk.Label(f, text="", fg="#ffd26b", bg=self._bg(), font=("Arial", 12))
+        self.lbl_highscore.pack(pady=(18,4))
 
         # info
         tk.Label(f, text="(Letakkan gambar monster di folder yang sama, jika ingin menampilkan gambar)", fg="#9aa0a8", bg=self._bg(), font=("Arial", 10)).pack(pady=(6,12))
 
     def show_menu(self):
-        self._hide_all_frames()
+        self._hide_all_frames("menu")
+        hs_name, hs_score = best_score(self.leaderboard)
+        self.lbl_highscore.config(text=f"Highscore: {hs_name} — {hs_score}")
+        if self.saved is not None:
+            self.btn_resume.config(text=f"⏯ Lanjutkan: {self.saved['player_name']} (Level {self.saved['level']})")
+            self.btn_resume.pack(pady=6, before=self.btn_start)
+        else:
+            self.btn_resume.pack_forget()
         self.frame_menu.pack(fill="both", expand=True)
 
     # ---------------- game UI ----------------
@@ -263,17 +269,23 @@ class MathAdventureApp:
         left.pack(side="left", padx=8, pady=6)
 
         # canvas for monster + animations
-        self.canvas = tk.Canvas(left, width=420, height=360, bg="#1b1b25", highlightthickness=0)
+        self.canvas = CountingCanvas(left, width=420, height=360, bg="#1b1b25", highlightthickness=0)
         self.canvas.pack()
+        # shake / knockback / flash move canvas items, never the window
+        self.camera = Camera(self.canvas, self.sched)
+        self._build_scene()
+        self.perf_overlay = PerfOverlay(self.canvas, self.lag, self.sched, self.root)
         # hp bars under canvas
         hp_frame = tk.Frame(left, bg=self._bg())
         hp_frame.pack(pady=6)
         tk.Label(hp_frame, text="HP Kamu:", fg="#9af78b", bg=self._bg()).pack(anchor="w")
-        self.player_hp_canvas = tk.Canvas(hp_frame, width=340, height=18, bg="#333", highlightthickness=0)
+        self.player_hp_canvas = CountingCanvas(hp_frame, width=340, height=18, bg="#333", highlightthickness=0)
         self.player_hp_canvas.pack(pady=4)
+        self.player_hp_bar = HpBar(self.player_hp_canvas, self.render_queue, 340, 18, "#6ef07a")
         tk.Label(hp_frame, text="HP Musuh:", fg="#ff8b8b", bg=self._bg()).pack(anchor="w")
-        self.enemy_hp_canvas = tk.Canvas(hp_frame, width=340, height=18, bg="#333", highlightthickness=0)
+        self.enemy_hp_canvas = CountingCanvas(hp_frame, width=340, height=18, bg="#333", highlightthickness=0)
         self.enemy_hp_canvas.pack(pady=4)
+        self.enemy_hp_bar = HpBar(self.enemy_hp_canvas, self.render_queue, 340, 18, "#ff8b8b")
 
         right = tk.Frame(mid, bg=self._bg())
         right.pack(side="left", padx=12, pady=6, fill="y")
@@ -284,6 +296,12 @@ class MathAdventureApp:
         self.entry_answer = tk.Entry(right, font=("Arial", 18), width=12, justify="center")
         self.entry_answer.pack(pady=6)
         self.entry_answer.bind("<Return>", lambda e: self.submit_answer())
+        self.entry_answer.bind("<Control-s>", lambda e: self.skip_question())
+        self.entry_answer.bind("<Escape>", lambda e: self.back_to_menu())
+        # toasts and inline confirms on the canvas (no modal dialogs in game)
+        self.notifier = Notifier(self.canvas, self.sched, restore_focus=self.entry_answer.focus_set)
+        self.root.bind("<F2>", self._show_render_stats)
+        self.root.bind("<F3>", self.perf_overlay.toggle)
 
         btn_row = tk.Frame(right, bg=self._bg())
         btn_row.pack(pady=8)
@@ -296,6 +314,8 @@ class MathAdventureApp:
 
         self.lbl_timer = tk.Label(right, text="Waktu: -", fg="#66d9ef", bg=self._bg(), font=("Arial", 16))
         self.lbl_timer.pack(pady=8)
+        tk.Label(right, text="Enter: jawab · Ctrl+S: skip · Esc: menu", fg="#9aa0a8", bg=self._bg(),
+                 font=("Arial", 9)).pack()
 
         ctrl = tk.Frame(right, bg=self._bg())
         ctrl.pack(pady=10)
@@ -303,91 +323,162 @@ class MathAdventureApp:
         tk.Button(ctrl, text="← Menu", command=self.back_to_menu, bg="#6b6b6b", fg="white").pack(side="left", padx=6)
 
     def show_game(self):
-        self._hide_all_frames()
+        self._hide_all_frames("game")
+        self._ensure_game_frame()
         self.frame_game.pack(fill="both", expand=True)
 
     # ---------------- over UI ----------------
     def _build_over(self):
         f = self.frame_over
         tk.Label(f, text="GAME OVER", font=("Arial", 34, "bold"), fg="#ff6b6b", bg=self._bg()).pack(pady=30)
-        self.lbl_final = tk.Label(f, text="Skor: 0", font=("Arial", 16), fg=self._fg(), bg=self._bg())
+        self.lbl_final = tk.Label(f, text="Skor: 0", font=("Arial", 16), fg=self._fg(), bg=self._bg(), justify="center")
         self.lbl_final.pack(pady=6)
-        tk.Button(f, text="Main Lagi", font=("Arial", 14), bg="#4e8cff", fg="white", command=self.restart_game).pack(pady=6)
+        tk.Button(f, text="Main Lagi", font=("Arial", 14), bg="#4e8cff", fg="white", command=self._reset_game_state).pack(pady=6)
         tk.Button(f, text="Kembali ke Menu", font=("Arial", 14), bg="#6b6b6b", fg="white", command=self.show_menu).pack(pady=6)
 
     # ---------------- flow control ----------------
-    def _hide_all_frames(self):
-        for fr in (self.frame_menu, self.frame_game, self.frame_over):
+    def _hide_all_frames(self, screen):
+        # leaving a run in progress: keep it (with the time left) for resume
+        if self.sched.screen == "game" and not self.session.over:
+            self._save_snapshot()
+        for fr in self._frames():
             fr.pack_forget()
-        self._cancel_timer()
-        self._cancel_animation()
-        self._cancel_projectile()
+        # jobs belong to the screen that scheduled them and die with it
+        self._cancel_all()
+        self.sched.screen = screen
 
     def start_game(self):
-        name = self.entry_name.get().strip()
-        if not name:
-            messagebox.showwarning("Nama kosong", "Masukkan nama pemain dulu.")
-            return
-        self.player_name = name
-        self.learning_mode = False
-        self.difficulty = self.diff_var.get() if hasattr(self, "diff_var") else "Normal"
-        self._reset_game_state()
-        self.show_game()
+        self._start(learning_mode=False)
 
     def start_learning_mode(self):
+        self._start(learning_mode=True)
+
+    def _start(self, learning_mode):
         name = self.entry_name.get().strip()
         if not name:
-            messagebox.showwarning("Nama kosong", "Masukkan nama pemain dulu.")
+            self.lbl_menu_msg.config(text="Masukkan nama pemain dulu.")
+            self.entry_name.focus_set()
             return
-        self.player_name = name
-        self.learning_mode = True
+        self.lbl_menu_msg.config(text="")
         self.difficulty = self.diff_var.get() if hasattr(self, "diff_var") else "Normal"
-        self._reset_game_state()
-        self.show_game()
+        self.session.start(name, self.difficulty, learning_mode, seed=new_seed(self.fixed_seed),
+                           mode=self.mode_var.get())
+        self.session_id = new_session_id()
+        self.prepare_level()
 
     def _reset_game_state(self):
-        self.level = 1
-        self.player_hp = self.max_player_hp
-        self.enemy_hp = 3 + (self.level - 1) * 2
-        self.score = 0
-        self.combo = 0
+        s = self.session
+        s.start(s.player_name, s.difficulty, s.learning_mode, seed=new_seed(self.fixed_seed), mode=s.mode)
+        self.session_id = new_session_id()
+        self.prepare_level()
+
+    def resume_game(self):
+        snap = self.saved
+        if snap is None:
+            return
+        self.session_id = snapshot.restore(self.session, snap)
+        self.difficulty = self.session.difficulty
+        self.show_game()
         self._spawn_monster()
-        self._next_question()
-        self._update_ui_all()
+        state = self.session.state
+        if state == QUESTION:
+            # same question, with the time that was left
+            self._show_question(snap["remaining"])
+        elif state == CLEARED:
+            self._on_enemy_defeated()
+        else:
+            self._next_question()
+
+    def _save_snapshot(self):
+        s = self.session
+        remaining = self.deadline.remaining() if s.state == QUESTION else None
+        self.saved = snapshot.capture(s, remaining, self.session_id)
+        self.saver.save(snapshot.pack(self.saved))
+
+    def on_close(self):
+        if self.sched.screen == "game" and not self.session.over:
+            self._save_snapshot()
+        self.root.destroy()
 
     def restart_game(self):
-        if messagebox.askyesno("Restart", "Mulai ulang permainan?"):
-            self._reset_game_state()
-            self.show_game()
+        self.notifier.confirm("Mulai ulang permainan?", self._reset_game_state)
 
     def back_to_menu(self):
-        if messagebox.askyesno("Kembali", "Kembali ke menu? Progress akan hilang."):
-            self._hide_all_frames()
-            self.show_menu()
+        self.notifier.confirm("Kembali ke menu? Permainan disimpan dan bisa dilanjutkan.", self.show_menu)
 
     # ---------------- monster / spawn / animations ----------------
+    def _build_scene(self):
+        # scene items are created once; spawning a monster only reconfigures them
+        c = self.canvas
+        self.scene_ground = c.create_rectangle(0, 300, 420, 360, fill="#0f0f13", outline="#0f0f13", tags=("world",))
+        self.scene_image = c.create_image(210, 150, state="hidden", tags=("world", "monster"))
+        # placeholder circle when there is no sprite
+        self.scene_oval = c.create_oval(110, 30, 310, 230, fill="#3344aa", outline="", state="hidden",
+                                        tags=("world", "monster"))
+        self.canvas_skill_text = c.create_text(210, 270, text="", fill="#d9d9d9", font=("Arial", 10),
+                                               tags=("world",))
+        self.blink_overlay = c.create_rectangle(110, 30, 310, 230, state="hidden", tags=("world", "monster"))
+        # projectiles are pooled: hidden after use and reused by the next shot
+        self.projectiles = ItemPool(c, lambda: c.create_oval(0, 0, 0, 0, fill="#ffdd55", outline="",
+                                                             state="hidden", tags=("world",)))
+        self.monster_id = self.scene_oval
+        self.monster_x = 210
+
     def _spawn_monster(self):
-        self.canvas.delete("all")
-        self.canvas.create_rectangle(0, 300, 420, 360, fill="#0f0f13", outline="#0f0f13")
-        img = self.monster_imgs.get(self.level)
+        c = self.canvas
+        self.camera.reset()
+        self._cancel_animation()
+        self.sched.cancel_tag("blink")
+        s = self.session
+        spec = s.spec
+        # generated levels reuse the five monster images
+        img = self.sprites.get(spec.sprite)
+        # keep a reference: the LRU may drop it while it is on screen
+        self.monster_img = img
+        self.sprites.prefetch(s.rules.levels.spec(s.level + 1).sprite)
+        # back to the resting layout (bob offsets included)
+        c.coords(self.scene_ground, 0, 300, 420, 360)
+        c.coords(self.scene_image, 210, 150)
+        c.coords(self.scene_oval, 110, 30, 310, 230)
+        c.coords(self.blink_overlay, 110, 30, 310, 230)
+        c.coords(self.canvas_skill_text, 210, 270)
         if img:
-            # center image
-            self.monster_id = self.canvas.create_image(210, 150, image=img)
-            self.monster_x = 210
+            c.itemconfigure(self.scene_image, image=img, state="normal")
+            c.itemconfigure(self.scene_oval, state="hidden")
+            self.monster_id = self.scene_image
         else:
-            # draw placeholder circle
-            self.monster_id = self.canvas.create_oval(110, 30, 310, 230, fill="#3344aa", outline="")
-            self.monster_x = 210
+            c.itemconfigure(self.scene_image, image="", state="hidden")
+            c.itemconfigure(self.scene_oval, state="normal")
+            self.monster_id = self.scene_oval
+        self.monster_x = 210
         # show skill text
-        skill = MONSTER_SKILLS.get(self.level, {}).get("skill", "")
-        self.canvas_skill_text = self.canvas.create_text(210, 270, text=skill, fill="#d9d9d9", font=("Arial", 10))
+        c.itemconfigure(self.canvas_skill_text, text=spec.skill)
+        c.itemconfigure(self.blink_overlay, state="hidden")
+        self._style_blink_overlay()
         # start bobbing animation
-        self._cancel_animation()
-        self._animate_monster_bob()
+        self.bob_dx = 6
+        self.sched.every(self.fx["bob_ms"], self._animate_monster_bob, tag="bob")
+        self.perf_overlay.attach()
+
+    def _style_blink_overlay(self):
+        # stippled white wash, or just a white frame when stipple is too costly
+        if self.fx["stipple"]:
+            self.canvas.itemconfigure(self.blink_overlay, fill="#ffffff", stipple="gray50", outline="")
+        else:
+            self.canvas.itemconfigure(self.blink_overlay, fill="", stipple="", outline="#ffffff", width=4)
+
+    def _apply_quality(self, level):
+        self.fx = QUALITY[level]
+        if self.frame_game is None:
+            return
+        self._style_blink_overlay()
+        if self.sched.active("bob"):
+            self._cancel_animation()
+            self.sched.every(self.fx["bob_ms"], self._animate_monster_bob, tag="bob")
 
     def _animate_monster_bob(self):
-        # simple left-right bobbing using after
-        dx = 6
+        # simple left-right bobbing; direction persists between frames
+        dx = self.bob_dx
         try:
             self.canvas.move(self.monster_id, dx, 0)
             self.monster_x += dx
@@ -395,48 +486,36 @@ class MathAdventureApp:
                 # reverse direction beyond threshold
                 self.canvas.move(self.monster_id, -2*dx, 0)
                 self.monster_x -= 2*dx
-                dx = -dx
+                self.bob_dx = -dx
         except Exception:
             pass
-        # schedule next bob (store id)
-        self.anim_job = self.canvas.after(160, self._animate_monster_bob)
 
     def _cancel_animation(self):
-        if hasattr(self, "anim_job") and self.anim_job:
-            try:
-                self.canvas.after_cancel(self.anim_job)
-            except Exception:
-                pass
-            self.anim_job = None
+        self.sched.cancel_tag("bob")
 
     def _blink_monster(self, times=4):
         # change opacity/flash by drawing overlay rectangle quickly
-        def do_blink(i=0):
-            if i >= times:
-                return
-            # flash overlay
-            overlay = self.canvas.create_rectangle(110, 30, 310, 230, fill="#ffffff", stipple="gray50", outline="")
-            self.canvas.after(80, lambda: self.canvas.delete(overlay))
-            self.canvas.after(120, lambda: do_blink(i+1))
-        do_blink()
+        overlay = self.blink_overlay
+
+        def hide():
+            self.canvas.itemconfigure(overlay, state="hidden")
+
+        def flash():
+            self.canvas.tag_raise(overlay)
+            self.canvas.itemconfigure(overlay, state="normal")
+            # on_end: a cancelled blink never leaves the overlay showing
+            self.sched.after(80, hide, tag="blink", on_end=hide)
+        self.sched.cancel_tag("blink")
+        for i in range(times):
+            self.sched.after(i * 120, flash, tag="blink")
 
     def _shake_screen(self):
-        # small window shake (no time.sleep)
-        orig = self.root.geometry()
-        offsets = ["+10+0", "-10+0", "+6+0", "-6+0", "+0+0"]
-        base = orig.split("+")[0]  # window size part
-        def do_shake(i=0):
-            if i >= len(offsets):
-                self.root.geometry(orig)
-                return
-            # apply offset by moving window slightly relative (works on some platforms)
-            try:
-                self.root.update()
-                self.root.geometry(orig.split("+")[0] + offsets[i])
-            except Exception:
-                pass
-            self.root.after(40, lambda: do_shake(i+1))
-        do_shake()
+        # in-canvas shake: a few coords updates, no window move or root.update()
+        self.camera.shake(self.fx["shake_px"], 200, step_ms=self.fx["tween_step_ms"])
+
+    def _hit_player(self, delay_ms=0):
+        # red flash when the player loses HP
+        self.camera.flash("#ff4444", 140, stipple=self.fx["stipple"], delay_ms=delay_ms)
 
     # ---------------- projectile attack animation ----------------
     def _launch_projectile(self, from_player=True):
@@ -445,317 +524,328 @@ class MathAdventureApp:
         start_y = 200 if from_player else 150
         target_x = 210 if from_player else 40
         target_y = 150 if from_player else 200
-        proj = self.canvas.create_oval(start_x-8, start_y-8, start_x+8, start_y+8, fill="#ffdd55", outline="")
-        steps = 20
-        dx = (target_x - start_x) / steps
-        dy = (target_y - start_y) / steps
-
-        def step(i=0):
-            if i >= steps:
-                try:
-                    self.canvas.delete(proj)
-                except Exception:
-                    pass
-                return
-            try:
-                self.canvas.move(proj, dx, dy)
-            except Exception:
-                pass
-            self.projectile_job = self.canvas.after(25, lambda: step(i+1))
-        step()
+        proj = self.projectiles.acquire()
+        self.canvas.coords(proj, start_x-8, start_y-8, start_x+8, start_y+8)
+        self.canvas.itemconfigure(proj, state="normal")
+
+        def step(t):
+            # position follows elapsed time, so a slow frame doesn't slow the shot
+            x = start_x + (target_x - start_x) * t
+            y = start_y + (target_y - start_y) * t
+            self.canvas.coords(proj, x-8, y-8, x+8, y+8)
+        # every projectile has its own handle; all are cancelable by tag
+        self.sched.tween(500, step, tag="projectile", on_end=lambda: self.projectiles.release(proj),
+                         step_ms=self.fx["tween_step_ms"])
 
     def _cancel_projectile(self):
-        if hasattr(self, "projectile_job") and self.projectile_job:
-            try:
-                self.canvas.after_cancel(self.projectile_job)
-            except Exception:
-                pass
-            self.projectile_job = None
+        self.sched.cancel_tag("projectile")
 
     # ---------------- question & timer ----------------
     def _next_question(self):
-        self.current_question, self.current_answer = ai_generate_question(self.level)
-        # display question
-        self.lbl_question.config(text=f"{self.current_question} = ?")
+        self._cancel_timer()
+        self.notifier.cancel("skip")
+        # session draws the question and applies Golem slow / boss timer
+        self._show_question(self.session.new_question())
+
+    def _show_question(self, limit):
+        self.deadline = Deadline(limit, clock=self.sched.clock)
+        self.lbl_question.config(text=f"{self.session.current_question} = ?")
         self.entry_answer.delete(0, tk.END)
         self.lbl_feedback.config(text="")
-        # set timer from difficulty, adjusted by monster skill maybe
-        base_time = DIFFICULTY_TIMER.get(self.difficulty, 10)
-        # If monster skill is Slow (level 4), reduce player time on first hit? implement as small effect: level 4 reduces time by 2 for this question
-        if self.level == 4 and random.random() < 0.25:
-            # 25% chance to apply slow on next question (flavor)
-            base_time = max(3, base_time - 2)
-        self.time_left = base_time
-        self._start_timer()
+        self.lbl_timer.config(text=f"Waktu: {limit:.1f}s")
+        self._draw_hp_bars()
+        # the clock starts once the question has actually been drawn
+        self._timer_idle = self.root.after_idle(self._start_timer)
 
     def _start_timer(self):
-        self._cancel_timer()
-        self.lbl_timer.config(text=f"Waktu: {self.time_left}s")
-        self._timer_tick()
+        self._timer_idle = None
+        self.deadline.start()
+        # exact timeout at the deadline; the 100 ms task only refreshes the label
+        self.sched.after(self.deadline.limit * 1000, self._on_deadline, tag="timer", name="timer")
+        self.sched.every(100, self._timer_tick, tag="timer", name="timer")
+        self._save_snapshot()
 
     def _timer_tick(self):
-        self.lbl_timer.config(text=f"Waktu: {self.time_left}s")
-        if self.time_left <= 0:
-            self._on_timeout()
+        text = f"Waktu: {self.deadline.remaining():.1f}s"
+        if self.lbl_timer.cget("text") != text:
+            self.lbl_timer.config(text=text)
+
+    def _on_deadline(self):
+        if not self.deadline.expired():
+            # woke up early (clock granularity): wait for the rest
+            self.sched.after(self.deadline.remaining() * 1000, self._on_deadline, tag="timer", name="timer")
             return
-        self.time_left -= 1
-        self.timer_job = self.root.after(1000, self._timer_tick)
+        self._cancel_timer()
+        self.lbl_timer.config(text="Waktu: 0.0s")
+        self._on_timeout()
 
     def _cancel_timer(self):
-        if hasattr(self, "timer_job") and self.timer_job:
-            try:
-                self.root.after_cancel(self.timer_job)
-            except Exception:
-                pass
-            self.timer_job = None
+        if self._timer_idle is not None:
+            self.root.after_cancel(self._timer_idle)
+            self._timer_idle = None
+        self.sched.cancel_tag("timer")
+        self.last_latency_ms = self.deadline.stop() * 1000.0
 
     def _on_timeout(self):
         # time out: penalize player (unless learning mode)
+        s = self.session
+        question, answer = s.current_question, s.current_answer
+        self.notifier.cancel("skip")
+        result = s.timeout()
+        self._log_turn(result, question, answer, "")
         self.lbl_feedback.config(text="⏳ Waktu habis! Kamu terkena serangan.", fg="#ffb86b")
-        if not self.learning_mode:
-            self.player_hp -= 1
         # small shake
         self._shake_screen()
+        if result.hp_lost:
+            self._hit_player()
         self._draw_hp_bars()
-        if self.player_hp <= 0 and not self.learning_mode:
+        if result.state == LOST:
             self._end_game(False)
             return
         # next question
-        self.root.after(600, self._next_question)
+        self.sched.after(600, self._next_question, tag="flow")
 
     # ---------------- submit / skip ----------------
     def submit_answer(self):
         txt = self.entry_answer.get().strip()
-        if txt == "":
+        # ignore Enter between questions (feedback delay, level transition)
+        if txt == "" or self.session.state != QUESTION:
             return
         # cancel timer while checking
         self._cancel_timer()
-        try:
-            # accept integer or float answers
-            user_val = float(txt) if "." in txt else int(txt)
-        except Exception:
-            user_val = None
-
-        correct = False
-        if user_val is not None:
-            if isinstance(self.current_answer, float):
-                correct = abs(user_val - self.current_answer) < 0.01
-            else:
-                try:
-                    correct = int(user_val) == int(self.current_answer)
-                except Exception:
-                    correct = False
-
-        if correct:
-            # correct answer: compute damage based on combo
-            self.combo += 1
-            dmg = 1 + (self.combo // 3)  # every 3 combo +1 damage
-            self.lbl_feedback.config(text=f"💥 Benar! Damage {dmg} (Combo {self.combo})", fg="#7efc6a")
+        self.notifier.cancel("skip")
+        # accept 12, -3, 3.5 or 7/2; compared exactly (no float tolerance)
+        s = self.session
+        question, answer = s.current_question, s.current_answer
+        result = s.answer(parse_answer(txt))
+        self._log_turn(result, question, answer, txt)
+
+        if result.correct:
+            self.lbl_feedback.config(text=f"💥 Benar! Damage {result.damage} (Combo {s.combo})", fg="#7efc6a")
             # show projectile
             self._launch_projectile(from_player=True)
-            # apply damage (consider enemy skill: Fluffy shield at level 3)
-            blocked = False
-            if self.level == 3 and random.random() < 0.30:
-                # fluffy shield blocks 1 damage
-                blocked = True
-            if not blocked:
-                self.enemy_hp -= dmg
-            else:
+            if result.blocked:
                 self.lbl_feedback.config(text="🛡️ Musuh memblokir serangan!", fg="#ffd26b")
-                # still award small score but no HP damage
-                self.score += 2
-
-            # Goblin counterattack skill
-            if self.level == 2 and random.random() < 0.20:
-                # goblin counterattacks immediately
+            else:
+                # monster recoils when the shot lands
+                self.camera.knockback("monster", 8 + 4 * result.damage, delay_ms=400,
+                                      step_ms=self.fx["tween_step_ms"])
+            if result.countered:
                 self.lbl_feedback.config(text="💥 Kamu kena serangan balik oleh Goblin!", fg="#ff9a7a")
                 self._launch_projectile(from_player=False)
-                if not self.learning_mode:
-                    self.player_hp -= 1
-
-            # Golem (level 4) may reduce your next time - simulated earlier by random effect
-            # increase score
-            self.score += 10 * self.level
+                if result.hp_lost:
+                    self._hit_player(delay_ms=400)
             self._blink_monster()
             self._draw_hp_bars()
             # check enemy death
-            if self.enemy_hp <= 0:
-                self.root.after(350, self._on_enemy_defeated)
+            if result.state == CLEARED:
+                self.sched.after(350, self._on_enemy_defeated, tag="flow")
+            elif result.state == LOST:
+                self._end_game(False)
             else:
-                self.root.after(450, self._next_question)
+                self.sched.after(450, self._next_question, tag="flow")
 
         else:
             # wrong
-            self.combo = 0
-            self.lbl_feedback.config(text=f"❌ Salah! Jawaban benar: {self.current_answer}", fg="#ff6b6b")
-            # penalty
-            if not self.learning_mode:
-                self.player_hp -= 1
+            self.lbl_feedback.config(text=f"❌ Salah! Jawaban benar: {format_answer(answer)}", fg="#ff6b6b")
             # shake & counter projectile
             self._shake_screen()
+            if result.hp_lost:
+                self._hit_player()
             self._draw_hp_bars()
-            if self.player_hp <= 0 and not self.learning_mode:
+            if result.state == LOST:
                 self._end_game(False)
                 return
-            self.root.after(500, self._next_question)
+            self.sched.after(500, self._next_question, tag="flow")
 
     def skip_question(self):
-        if not messagebox.askyesno("Lewati", "Lewati soal ini? Kamu kehilangan 1 HP."):
+        # the timer keeps running while the player decides
+        self.notifier.confirm("Lewati soal ini? Kamu kehilangan 1 HP.", self._do_skip, key="skip")
+
+    def _do_skip(self):
+        if self.session.state != QUESTION:
             return
-        if not self.learning_mode:
-            self.player_hp -= 1
+        self._cancel_timer()
+        s = self.session
+        question, answer = s.current_question, s.current_answer
+        result = s.skip()
+        self._log_turn(result, question, answer, "")
         self.lbl_feedback.config(text="Kamu melewatkan soal (−1 HP).", fg="#ffc36b")
         self._draw_hp_bars()
-        if self.player_hp <= 0 and not self.learning_mode:
+        if result.state == LOST:
             self._end_game(False)
             return
-        self.root.after(400, self._next_question)
+        self.sched.after(400, self._next_question, tag="flow")
+
+    def _log_turn(self, result, question, answer, player_input):
+        s = self.session
+        self.telemetry.emit(turn_event(s, result, question, answer, player_input,
+                                       self.last_latency_ms, self.session_id, "tk"))
+        # every turn is a state change worth saving (game over clears the save)
+        if not s.over:
+            self._save_snapshot()
 
     # ---------------- enemy defeated / level up ----------------
     def _on_enemy_defeated(self):
-        # award bonus
-        bonus = 20 * self.level
-        self.score += bonus
-        messagebox.showinfo("Level Cleared", f"Kamu mengalahkan monster level {self.level}!\nBonus skor: {bonus}")
-        # next level or win
-        self.level += 1
-        self.combo = 0
-        if self.level > MAX_LEVEL:
+        s = self.session
+        cleared = s.level
+        # award bonus, next level or win
+        bonus = s.advance_level()
+        if s.over:
             self._end_game(True)
             return
-        # reset player HP optionally (here we reset to max for new level)
-        self.player_hp = self.max_player_hp
-        self.enemy_hp = 3 + (self.level - 1) * 2
+        self._save_snapshot()
+        # the next monster appears under the toast; its first question follows
+        self.notifier.toast(f"Kamu mengalahkan monster level {cleared}! Bonus skor: {bonus}", 1400, "#7efc6a")
         self._spawn_monster()
         self._draw_hp_bars()
-        self._next_question()
+        self.sched.after(1200, self._next_question, tag="flow")
 
     # ---------------- drawing HP bars & UI ----------------
     def _draw_hp_bars(self):
-        # player HP
-        self.player_hp_canvas.delete("all")
-        w = 340
-        ratio = max(0, self.player_hp) / self.max_player_hp
-        self.player_hp_canvas.create_rectangle(0, 0, w, 18, fill="#222", outline="#222")
-        self.player_hp_canvas.create_rectangle(0, 0, int(w * ratio), 18, fill="#6ef07a", outline="")
-        self.player_hp_canvas.create_text(w//2, 9, text=f"{self.player_hp}/{self.max_player_hp}", fill="#000", font=("Arial", 10))
-
-        # enemy HP
-        self.enemy_hp_canvas.delete("all")
-        enemy_max = 3 + (self.level - 1) * 2
-        ratio_e = max(0, self.enemy_hp) / enemy_max
-        self.enemy_hp_canvas.create_rectangle(0, 0, w, 18, fill="#222", outline="#222")
-        self.enemy_hp_canvas.create_rectangle(0, 0, int(w * ratio_e), 18, fill="#ff8b8b", outline="")
-        self.enemy_hp_canvas.create_text(w//2, 9, text=f"{self.enemy_hp}/{enemy_max}", fill="#000", font=("Arial", 10))
+        s = self.session
+        # retained bars: only redrawn (once per frame) when a value changed
+        self.player_hp_bar.set(s.player_hp, s.max_player_hp)
+        self.enemy_hp_bar.set(s.enemy_hp, s.enemy_max_hp)
 
         # update labels
-        self.lbl_player.config(text=f"Player: {self.player_name}")
-        self.lbl_level.config(text=f"Level: {self.level}")
-        self.lbl_score.config(text=f"Score: {self.score}")
+        self.lbl_player.config(text=f"Player: {s.player_name}")
+        self.lbl_level.config(text=f"Level: {s.level}")
+        self.lbl_score.config(text=f"Score: {s.score}")
+
+    def render_stats(self):
+        """Canvas items created (total, last minute) on the game canvases."""
+        canvases = (self.canvas, self.player_hp_canvas, self.enemy_hp_canvas)
+        return (sum(c.created for c in canvases), sum(c.created_per_minute() for c in canvases))
+
+    def _show_render_stats(self, event=None):
+        total, per_min = self.render_stats()
+        self.lbl_feedback.config(text=f"Canvas items: {total} total, {per_min}/min", fg="#9aa0a8")
+
+    def _dump_perf_log(self):
+        try:
+            self.lag.dump(self.perf_log)
+        except OSError:
+            pass
+        self.root.after(60000, self._dump_perf_log)
 
     # ---------------- end game ----------------
     def _end_game(self, won):
-        self._cancel_timer()
-        self._cancel_animation()
-        self._cancel_projectile()
-        # show final and save highscore if beaten
-        hs_name, hs_score = self._load_highscore()
-        if self.score > hs_score:
-            # write name|score
-            try:
-                with open(HIGHSCORE_FILE, "w") as f:
-                    f.write(f"{self.player_name}|{self.score}")
-            except Exception:
-                pass
-            new_hs = True
-        else:
-            new_hs = False
+        self._cancel_all()
+        s = self.session
+        self.saved = None
+        self.saver.clear()
+        # recording + leaderboard; new_hs = best score for this difficulty and mode
+        new_hs = finish_game(s, won, self.leaderboard, self.telemetry, self.session_id)
 
         if won:
-            msg = f"🏆 Kamu menaklukkan FINAL BOSS!\nSkor: {self.score}"
+            msg = f"🏆 Kamu menaklukkan FINAL BOSS!\nSkor: {s.score}"
         else:
-            msg = f"💀 Kamu kalah.\nSkor: {self.score}"
+            msg = f"💀 Kamu kalah.\nSkor: {s.score}"
 
         if new_hs:
-            msg += "\n\n🎉 NEW HIGHSCORE!"
+            msg += f"\n\n🎉 NEW HIGHSCORE! ({s.difficulty})"
 
-        messagebox.showinfo("Game Over", msg)
-        # show over screen with final score
-        self.lbl_final.config(text=f"Skor: {self.score}")
-        self._hide_all_frames()
+        # show over screen with the result
+        self._ensure_over_frame()
+        self.lbl_final.config(text=msg)
+        self._hide_all_frames("over")
         self.frame_over.pack(fill="both", expand=True)
 
-    # ---------------- highscore ----------------
-    def _load_highscore(self):
-        if not os.path.exists(HIGHSCORE_FILE):
-            return ("-", 0)
-        try:
-            with open(HIGHSCORE_FILE, "r") as f:
-                t = f.read().strip()
-                if "|" in t:
-                    name, sc = t.split("|", 1)
-                    return (name, int(sc))
-                else:
-                    return ("-", int(t))
-        except Exception:
-            return ("-", 0)
-
-    # ---------------- utility: update UI / next steps ----------------
-    def _update_ui_all(self):
-        self._draw_hp_bars()
-        self.show_game()
-
-    # ---------------- start next level and question orchestration ----------------
-    def _next_question(self):
-        self._next_question_internal()
-
-    def _next_question_internal(self):
-        self._cancel_timer()
-        # ensure enemy hp set
-        self.enemy_hp = max(1, self.enemy_hp)
-        self._draw_hp_bars()
-        self._next_question_observe()
-
-    def _next_question_observe(self):
-        # generate new question and start timer
-        self.current_question, self.current_answer = ai_generate_question(self.level)
-        self.lbl_question.config(text=f"{self.current_question} = ?")
-        self.entry_answer.delete(0, tk.END)
-        self.lbl_feedback.config(text="")
-        # set timer by difficulty (monster 5 boss reduces time)
-        base_time = DIFFICULTY_TIMER.get(self.difficulty, 10)
-        if self.level == 5:
-            base_time = max(3, base_time - 3)
-        self.time_left = base_time
-        self._start_timer()
-
-    # ---------------- helper to show game frame ----------------
-    def show_game(self):
-        self._hide_all_frames()
-        self.frame_game.pack(fill="both", expand=True)
-
     # ---------------- run spawn/next on reset / prepare ----------------
-    def _start_level(self):
-        self.player_hp = self.max_player_hp
-        self.enemy_hp = 3 + (self.level - 1) * 2
+    def prepare_level(self):
+        # show the frame first: switching frames cancels running jobs
+        self.show_game()
         self._spawn_monster()
         self._next_question()
-        self._update_ui_all()
-
-    # ---------------- helper to spawn & next question used externally ----------------
-    def prepare_level(self):
-        self._start_level()
 
     # ---------------- cancel helpers ----------------
     def _cancel_all(self):
+        # timer, bob, blink, shake, projectiles, notices and pending flow steps
         self._cancel_timer()
-        self._cancel_animation()
-        self._cancel_projectile()
+        self.sched.cancel_screen(self.sched.screen)
+        if self.frame_game is not None:
+            self.notifier.clear()
 
 # --------------------- RUN APP ---------------------
-if __name__ == "__main__":
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description="Math Adventure")
+    ap.add_argument("--profile-startup", nargs="?", const="text", choices=("text", "json"),
+                    help="print a time breakdown per launch phase, then exit")
+    ap.add_argument("--seed", type=int, help="play every run with this seed (reproducible questions and rolls)")
+    ap.add_argument("--perf-log", metavar="FILE",
+                    help="write event-loop lag histograms (JSON) to FILE every minute and on exit")
+    ap.add_argument("--seats", type=int, default=1,
+                    help="open this many game windows (one per student) in one process")
+    ap.add_argument("--export-worksheets", metavar="FILE",
+                    help="write drill worksheets to FILE ('-' = stdout) instead of starting the game")
+    worksheets.add_arguments(ap)
+    return ap.parse_args(argv)
+
+
+def open_seats(root, n, shared, seed=None):
+    """n game windows (Toplevels of root) sharing one SharedResources."""
+    apps = []
+    base, ext = os.path.splitext(SAVE_FILE)
+    for i in range(1, n + 1):
+        top = tk.Toplevel(root)
+        app = MathAdventureApp(top, seed=seed, shared=shared, save_file=f"{base}-seat{i}{ext}")
+        top.title(f"Math Adventure - Kursi {i}")
+        top.geometry(f"900x660+{40 * (i - 1)}+{30 * (i - 1)}")
+        apps.append(app)
+    return apps
+
+
+def run_seats(args):
+    root = tk.Tk()
+    root.withdraw()
+    # every seat may be on a different level: keep all five sprites
+    shared = SharedResources(root, max_photos=len(IMAGE_CANDIDATES))
+    apps = open_seats(root, args.seats, shared, seed=args.seed)
+    open_count = [len(apps)]
+
+    def seat_closed(event, top):
+        # <Destroy> also fires for every child widget of the window
+        if event.widget is top:
+            open_count[0] -= 1
+            if not open_count[0]:
+                root.quit()
+    for app in apps:
+        app.root.bind("<Destroy>", lambda e, top=app.root: seat_closed(e, top), add="+")
+    root.mainloop()
+    for app in apps:
+        app.saver.close()
+    shared.close()
+    root.destroy()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.export_worksheets:
+        return worksheets.run(args.export_worksheets, args)
+    if args.seats > 1:
+        return run_seats(args)
+    profiler = StartupProfiler(_START)
+    profiler.mark("imports")
     root = tk.Tk()
-    app = MathAdventureApp(root)
-    # pack main UI frames into root (frames themselves are shown/hidden)
-    app.frame_menu.pack(fill="both", expand=True)
+    profiler.mark("tk init")
+    app = MathAdventureApp(root, profiler, perf_log=args.perf_log, seed=args.seed)
+    if args.profile_startup:
+        # first paint: window mapped and all pending drawing done
+        root.wait_visibility(app.frame_menu)
+        root.update_idletasks()
+        profiler.mark("first paint")
+        app.sprites.wait(1)
+        profiler.note("sprite decode (level 1)", app.sprites.decode_ms.get(1, 0.0))
+        profiler.print_report(args.profile_startup)
+        root.destroy()
+        return
     root.mainloop()
+    app.shared.close()
+    app.saver.close()
+    if args.perf_log:
+        app.lag.dump(args.perf_log)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+notify.py
+Non-blocking notices drawn on the game canvas, instead of messagebox
+dialogs (which run a nested event loop and freeze the game flow):
+- toast(text): queued, shown one at a time for a while, then the next
+- confirm(text, on_yes, on_no): inline question answered with Y / Enter,
+  N / Escape or a click; the game keeps running while it is open
+Items are built once and only shown/hidden; the game scene is retained,
+so they live as long as the canvas.
+"""
+
+from collections import deque
+
+TAG = "notice"
+
+
+class Notifier:
+    def __init__(self, canvas, sched, restore_focus=None):
+        self.canvas = canvas
+        self.sched = sched
+        self.restore_focus = restore_focus
+        self.width = int(canvas.cget("width"))
+        self._queue = deque()     # pending toasts: (text, ms, color)
+        self._toast = None        # toast on screen
+        self._confirm = None      # (text, on_yes, on_no, key) while a confirm is open
+        self._items = None
+        for key in ("<KeyPress-y>", "<KeyPress-Y>", "<Return>"):
+            canvas.bind(key, lambda e: self.answer(True))
+        for key in ("<KeyPress-n>", "<KeyPress-N>", "<Escape>"):
+            canvas.bind(key, lambda e: self.answer(False))
+
+    # ---------------- items ----------------
+    def _build(self):
+        c, w = self.canvas, self.width
+        panel = c.create_rectangle(20, 10, w - 20, 54, fill="#15151c", outline="#ffd26b", width=2,
+                                   state="hidden", tags=(TAG,))
+        text = c.create_text(w // 2, 32, text="", fill="#ffd26b", font=("Arial", 12, "bold"),
+                             width=w - 60, justify="center", state="hidden", tags=(TAG,))
+        yes = c.create_text(w // 2 - 70, 0, text="[Y] Ya", fill="#7efc6a", font=("Arial", 12, "bold"),
+                            state="hidden", tags=(TAG,))
+        no = c.create_text(w // 2 + 70, 0, text="[N] Tidak", fill="#ff6b6b", font=("Arial", 12, "bold"),
+                           state="hidden", tags=(TAG,))
+        c.tag_bind(yes, "<Button-1>", lambda e: self.answer(True))
+        c.tag_bind(no, "<Button-1>", lambda e: self.answer(False))
+        self._items = (panel, text, yes, no)
+
+    def redraw(self):
+        """Re-create the items and show what is current (only needed if they were deleted)."""
+        self._items = None
+        self._show()
+
+    def _show(self):
+        if self._items is None:
+            self._build()
+        c = self.canvas
+        panel, text, yes, no = self._items
+        if self._confirm is not None:
+            msg, color, h = self._confirm[0], "#ffffff", 130
+            buttons = "normal"
+        elif self._toast is not None:
+            msg, color, h = self._toast[0], self._toast[2], 44
+            buttons = "hidden"
+        else:
+            for item in self._items:
+                c.itemconfigure(item, state="hidden")
+            return
+        top = 10 if buttons == "hidden" else 110
+        c.coords(panel, 20, top, self.width - 20, top + h)
+        c.coords(text, self.width // 2, top + (22 if buttons == "hidden" else 45))
+        c.itemconfigure(text, text=msg, fill=color)
+        c.coords(yes, self.width // 2 - 70, top + h - 25)
+        c.coords(no, self.width // 2 + 70, top + h - 25)
+        for item in (panel, text):
+            c.itemconfigure(item, state="normal")
+        for item in (yes, no):
+            c.itemconfigure(item, state=buttons)
+        c.tag_raise(TAG)
+
+    # ---------------- toasts ----------------
+    def toast(self, text, ms=1500, color="#ffd26b"):
+        self._queue.append((text, ms, color))
+        if self._toast is None and self._confirm is None:
+            self._next_toast()
+
+    def _next_toast(self):
+        self._toast = self._queue.popleft() if self._queue else None
+        self._show()
+        if self._toast is not None:
+            self.sched.after(self._toast[1], self._toast_done, tag=TAG)
+
+    def _toast_done(self):
+        if self._confirm is None:
+            self._next_toast()
+
+    # ---------------- confirms ----------------
+    @property
+    def asking(self):
+        return self._confirm is not None
+
+    def confirm(self, text, on_yes, on_no=None, key=None):
+        """Ask inline; replaces a confirm that is already open. key names it for cancel()."""
+        self.sched.cancel_tag(TAG)
+        if self._toast is not None:
+            # shown again (in full) once the confirm is closed
+            self._queue.appendleft(self._toast)
+            self._toast = None
+        self._confirm = (text, on_yes, on_no, key)
+        self._show()
+        self.canvas.focus_set()
+
+    def answer(self, yes):
+        if self._confirm is None:
+            return
+        _, on_yes, on_no, _ = self._confirm
+        self._close_confirm()
+        callback = on_yes if yes else on_no
+        if callback is not None:
+            callback()
+
+    def cancel(self, key=None):
+        """Close an open confirm (only one named key, if given) without answering."""
+        if self._confirm is not None and (key is None or self._confirm[3] == key):
+            self._close_confirm()
+
+    def _close_confirm(self):
+        self._confirm = None
+        if self.restore_focus is not None:
+            self.restore_focus()
+        self._next_toast()
+
+    def clear(self):
+        """Drop everything (leaving the screen)."""
+        self.sched.cancel_tag(TAG)
+        self._queue.clear()
+        self._toast = None
+        self._confirm = None
+        self._show()
@@ -0,0 +1,24 @@
+"""
+paths.py
+Where Math Adventure keeps its files, for the Tk game, tui.py and the
+tools. Each can be moved with an environment variable:
+- MATH_ADVENTURE_DB: leaderboard database (leaderboard.db)
+- MATH_ADVENTURE_DB_WAL=0: rollback journal instead of WAL, for a
+  database on a network share (lab folder)
+- MATH_ADVENTURE_TELEMETRY: per-answer event log (telemetry/events.jsonl)
+- MATH_ADVENTURE_SAVE: the unfinished run (savegame.bin)
+"""
+
+import os
+
+from leaderboard import Leaderboard
+
+HIGHSCORE_FILE = "highscore.txt"   # legacy single-line file, imported once
+LEADERBOARD_DB = os.environ.get("MATH_ADVENTURE_DB", "leaderboard.db")
+LEADERBOARD_WAL = os.environ.get("MATH_ADVENTURE_DB_WAL", "1") != "0"
+TELEMETRY_LOG = os.environ.get("MATH_ADVENTURE_TELEMETRY", os.path.join("telemetry", "events.jsonl"))
+SAVE_FILE = os.environ.get("MATH_ADVENTURE_SAVE", "savegame.bin")
+
+
+def open_leaderboard():
+    return Leaderboard(LEADERBOARD_DB, wal=LEADERBOARD_WAL, legacy_file=HIGHSCORE_FILE)
@@ -0,0 +1,276 @@
+"""
+perf.py
+Performance instrumentation for Math Adventure.
+- StartupProfiler: wall-clock breakdown of launch phases
+  (--profile-startup)
+- LagMonitor: per-job after() jitter and callback duration histograms
+  (F3 overlay in game, --perf-log FILE to dump them)
+- QualityGovernor: steps animation quality down when frames miss their
+  budget, and back up once there is headroom again
+"""
+
+import json
+import os
+import sys
+import time
+from collections import deque
+
+
+class StartupProfiler:
+    """mark(name) closes the phase that started at the previous mark."""
+
+    def __init__(self, t0=None):
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self._last = self.t0
+        self.phases = []
+        self.background = {}
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, (now - self._last) * 1000.0))
+        self._last = now
+
+    def note(self, name, ms):
+        """Work that ran off the critical path (e.g. sprite decode)."""
+        self.background[name] = ms
+
+    def total_ms(self):
+        return (self._last - self.t0) * 1000.0
+
+    def report(self):
+        return {
+            "phases_ms": {name: round(ms, 2) for name, ms in self.phases},
+            "background_ms": {name: round(ms, 2) for name, ms in self.background.items()},
+            "time_to_interactive_ms": round(self.total_ms(), 2),
+        }
+
+    def print_report(self, fmt="text", file=None):
+        file = file or sys.stdout
+        if fmt == "json":
+            print(json.dumps(self.report()), file=file)
+            return
+        print("Startup profile", file=file)
+        for name, ms in self.phases:
+            print(f"  {name:18s} {ms:8.1f} ms", file=file)
+        print(f"  {'time to interactive':18s} {self.total_ms():8.1f} ms", file=file)
+        for name, ms in self.background.items():
+            print(f"  (background) {name:s}: {ms:.1f} ms", file=file)
+
+
+# ---------------- event-loop lag monitor ----------------
+class Histogram:
+    """Fixed-size histogram of millisecond values (power-of-two buckets)."""
+
+    BOUNDS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048)
+
+    __slots__ = ("counts", "n", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.n = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms):
+        i = 0
+        for bound in self.BOUNDS:
+            if ms < bound:
+                break
+            i += 1
+        self.counts[i] += 1
+        self.n += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th value (capped at max)."""
+        if not self.n:
+            return 0.0
+        target = q * self.n
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return min(float(self.BOUNDS[i]), self.max) if i < len(self.BOUNDS) else self.max
+        return self.max
+
+    def to_dict(self):
+        return {
+            "n": self.n,
+            "mean": round(self.total / self.n, 3) if self.n else 0.0,
+            "p50": self.percentile(0.5),
+            "p99": self.percentile(0.99),
+            "max": round(self.max, 3),
+            "buckets_ms": list(self.BOUNDS),
+            "counts": list(self.counts),
+        }
+
+
+class LagMonitor:
+    """
+    Per-job jitter (how late a callback ran) and duration histograms.
+    The FrameScheduler reports every task it runs; the optional probe is
+    a plain root.after() heartbeat that catches stalls outside it
+    (modal dialogs, root.update(), image decoding on the Tk thread).
+    """
+
+    PROBE_MS = 100
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.jitter = {}
+        self.duration = {}
+        self._probe_job = None
+        self._probe_due = None
+        self._root = None
+        self.frame_listeners = []   # fn(jitter_s, cost_s) for every scheduler frame
+
+    def _hist(self, table, name):
+        h = table.get(name)
+        if h is None:
+            h = table[name] = Histogram()
+        return h
+
+    def record(self, name, jitter_s, duration_s):
+        self._hist(self.jitter, name).add(max(0.0, jitter_s) * 1000.0)
+        self._hist(self.duration, name).add(duration_s * 1000.0)
+        if name == "frame":
+            for fn in self.frame_listeners:
+                fn(jitter_s, duration_s)
+
+    # heartbeat outside the scheduler
+    def start_probe(self, root):
+        if self._probe_job is None:
+            self._root = root
+            self._probe_due = self.clock() + self.PROBE_MS / 1000.0
+            self._probe_job = root.after(self.PROBE_MS, self._probe)
+
+    def stop_probe(self):
+        if self._probe_job is not None:
+            self._root.after_cancel(self._probe_job)
+            self._probe_job = None
+
+    def _probe(self):
+        now = self.clock()
+        self.record("loop", now - self._probe_due, 0.0)
+        self._probe_due = now + self.PROBE_MS / 1000.0
+        self._probe_job = self._root.after(self.PROBE_MS, self._probe)
+
+    def summary_lines(self):
+        lines = []
+        for name in sorted(self.jitter):
+            j, d = self.jitter[name], self.duration[name]
+            lines.append(f"{name:10s} late p99 {j.percentile(0.99):5.0f}ms max {j.max:5.0f}ms"
+                         f"  run p99 {d.percentile(0.99):4.0f}ms max {d.max:5.0f}ms")
+        return lines
+
+    def to_dict(self):
+        return {
+            "jitter_ms": {k: v.to_dict() for k, v in self.jitter.items()},
+            "duration_ms": {k: v.to_dict() for k, v in self.duration.items()},
+        }
+
+    def dump(self, path):
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.to_dict(), f, indent=1)
+        os.replace(tmp, path)
+
+
+class PerfOverlay:
+    """Toggleable text overlay (F3) on the game canvas."""
+
+    REFRESH_MS = 500
+
+    def __init__(self, canvas, monitor, sched, root):
+        self.canvas = canvas
+        self.monitor = monitor
+        self.sched = sched
+        self.root = root
+        self.visible = False
+        self.item = None
+
+    def toggle(self, event=None):
+        self.visible = not self.visible
+        if self.visible:
+            self.monitor.start_probe(self.root)
+        self.attach()
+
+    def attach(self):
+        """Show or hide the overlay and (re)arm its refresh task."""
+        self.sched.cancel_tag("perf-overlay")
+        if not self.visible:
+            if self.item is not None:
+                self.canvas.itemconfigure(self.item, state="hidden")
+            return
+        if self.item is None or not self.canvas.type(self.item):
+            self.item = self.canvas.create_text(6, 6, anchor="nw", text="", fill="#9aff9a",
+                                                font=("Courier", 8), tags=("perf-overlay",))
+        self.canvas.itemconfigure(self.item, state="normal")
+        self.refresh()
+        self.sched.every(self.REFRESH_MS, self.refresh, tag="perf-overlay")
+
+    def refresh(self):
+        if self.item is not None:
+            self.canvas.itemconfigure(self.item, text="\n".join(self.monitor.summary_lines()))
+            self.canvas.tag_raise(self.item)
+
+
+# ---------------- adaptive quality ----------------
+class QualityGovernor:
+    """
+    Quality levels: HIGH (full animations), MEDIUM, LOW.
+    A frame misses its budget when it started late or ran long by more
+    than budget_ms. If down_ratio of the last `window` frames missed, step
+    down one level; after up_after_s without a miss, step back up. Changes
+    are at least cooldown_s apart. low_power pins the level to LOW.
+    """
+
+    LOW, MEDIUM, HIGH = 0, 1, 2
+
+    def __init__(self, budget_ms=50.0, window=30, down_ratio=0.2, up_after_s=5.0,
+                 cooldown_s=2.0, clock=time.monotonic, on_change=None):
+        self.budget = budget_ms / 1000.0
+        self.window = window
+        self.down_ratio = down_ratio
+        self.up_after = up_after_s
+        self.cooldown = cooldown_s
+        self.clock = clock
+        self.on_change = on_change
+        self.auto_level = self.HIGH
+        self.low_power = False
+        self._recent = deque(maxlen=window)
+        self._last_miss = self._changed = clock()
+
+    @property
+    def level(self):
+        return self.LOW if self.low_power else self.auto_level
+
+    def frame(self, jitter_s, cost_s):
+        now = self.clock()
+        miss = jitter_s + cost_s > self.budget
+        self._recent.append(miss)
+        if miss:
+            self._last_miss = now
+        if now - self._changed < self.cooldown:
+            return
+        if (len(self._recent) == self.window and sum(self._recent) >= self.down_ratio * self.window
+                and self.auto_level > self.LOW):
+            self._set(self.auto_level - 1, now)
+        elif self.auto_level < self.HIGH and now - self._last_miss >= self.up_after:
+            self._set(self.auto_level + 1, now)
+
+    def _set(self, level, now):
+        before = self.level
+        self.auto_level = level
+        self._changed = now
+        self._recent.clear()
+        if self.level != before and self.on_change is not None:
+            self.on_change(self.level)
+
+    def set_low_power(self, on):
+        before = self.level
+        self.low_power = bool(on)
+        if self.level != before and self.on_change is not None:
+            self.on_change(self.level)
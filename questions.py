@@ -0,0 +1,404 @@
+"""
+questions.py
+Question generation for Math Adventure:
+- ai_generate_question(level): the original one-at-a-time generator
+- QuestionBank: batch generator with a prefetched buffer per level,
+  refilled by a background thread. Uses NumPy when available (one
+  vectorized pass per batch), otherwise falls back to plain Python.
+- RefillWorker: that background thread; several banks (one per seat,
+  each with its own seed) can share one
+Both keep the same level 1-5 distributions. Answers are exact: int, or
+fractions.Fraction when a division does not come out even.
+"""
+
+import importlib.util
+import random
+import threading
+from collections import deque
+from fractions import Fraction
+
+from arith import ArithError, compile_template, evaluate, normalize
+
+# NumPy is optional; the bank works without it, just slower. It is only
+# imported when the first batch is generated (it dominates startup time).
+np = None
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+
+
+def _load_numpy():
+    global np, NUMPY_AVAILABLE
+    if np is None and NUMPY_AVAILABLE:
+        try:
+            import numpy
+            np = numpy
+        except Exception:
+            NUMPY_AVAILABLE = False
+    return np
+
+# Highest level with its own question rules (later levels reuse it)
+QUESTION_TIERS = 5
+
+
+# AI-like question generator
+def ai_generate_question(level):
+    """
+    Local 'AI' generator: creates varied questions depending on level.
+    Returns (question_text, answer_value)
+    """
+    # Increase complexity with level
+    # Level 1-2: simple +/-
+    if level <= 2:
+        a = random.randint(1, 20 * level)
+        b = random.randint(1, 20 * level)
+        op = random.choice(["+", "-"])
+        q = f"{a} {op} {b}"
+        ans = evaluate(q)
+
+    # Level 3: mixed with multiplication and small parentheses
+    elif level == 3:
+        a = random.randint(2, 40)
+        b = random.randint(2, 30)
+        c = random.randint(1, 12)
+        op1 = random.choice(["+", "-", "*"])
+        op2 = random.choice(["+", "-", "*"])
+        q = f"({a} {op1} {b}) {op2} {c}"
+        ans = evaluate(q)
+
+    # Level 4: include division (clean) and modulo sometimes
+    elif level == 4:
+        op = random.choice(["+", "-", "*", "/"])
+        if op == "/":
+            # ensure integer division result
+            b = random.randint(2, 12)
+            result = random.randint(2, 12)
+            a = result * b
+            q = f"{a} / {b}"
+            ans = evaluate(q)
+        else:
+            a = random.randint(10, 120)
+            b = random.randint(2, 30)
+            q = f"{a} {op} {b}"
+            ans = evaluate(q)
+
+    # Level 5: boss complexity - nested operations, power, modulo, etc.
+    else:
+        pattern = random.choice([
+            lambda: f"({random.randint(20,150)} + {random.randint(5,80)}) * {random.randint(2,6)}",
+            lambda: f"{random.randint(4,18)}**2 - {random.randint(1,50)}",
+            lambda: f"({random.randint(30,200)} / {random.randint(2,20)}) + {random.randint(1,50)}",
+            lambda: f"({random.randint(20,120)} - {random.randint(1,60)}) * {random.randint(2,8)}",
+            lambda: f"({random.randint(50,200)} % {random.randint(2,20)}) + {random.randint(1,40)}"
+        ])
+        q = pattern()
+        try:
+            ans = evaluate(q)
+        except ArithError:
+            # fallback to simpler expression
+            a = random.randint(20, 200); b = random.randint(2, 50)
+            q = f"{a} + {b}"
+            ans = evaluate(q)
+
+    return q, ans
+
+
+# ---------------- batch generation ----------------
+# Every generated row is (template_index, a, b, c, answer); the question
+# text is only formatted when the row is handed out.
+OPS3 = ("+", "-", "*")
+
+TEMPLATES = {
+    # level 1-2: a op b
+    1: ["{0} + {1}", "{0} - {1}"],
+    # level 3: (a op1 b) op2 c, index = op1 * 3 + op2
+    3: [f"({{0}} {o1} {{1}}) {o2} {{2}}" for o1 in OPS3 for o2 in OPS3],
+    # level 4: a op b
+    4: ["{0} + {1}", "{0} - {1}", "{0} * {1}", "{0} / {1}"],
+    # level 5: boss patterns (same order as ai_generate_question)
+    5: [
+        "({0} + {1}) * {2}",
+        "{0}**2 - {1}",
+        "({0} / {1}) + {2}",
+        "({0} - {1}) * {2}",
+        "({0} % {1}) + {2}",
+    ],
+}
+
+
+def _tier(level):
+    """Map a game level to the question rules it uses."""
+    return max(1, min(level, QUESTION_TIERS))
+
+
+def _template_key(tier):
+    return 1 if tier <= 2 else tier
+
+
+def _compiled(key):
+    return [compile_template(t) for t in TEMPLATES[key]]
+
+
+def _rows_python(tier, n, rng):
+    """Plain Python batch: same distributions, answers from compiled templates."""
+    rows = []
+    randint = rng.randint
+    fns = _compiled(_template_key(tier))
+    if tier <= 2:
+        hi = 20 * tier
+        for _ in range(n):
+            a = randint(1, hi); b = randint(1, hi); k = randint(0, 1)
+            rows.append((k, a, b, 0, fns[k](a, b)))
+    elif tier == 3:
+        for _ in range(n):
+            a = randint(2, 40); b = randint(2, 30); c = randint(1, 12)
+            k = randint(0, 2) * 3 + randint(0, 2)
+            rows.append((k, a, b, c, fns[k](a, b, c)))
+    elif tier == 4:
+        for _ in range(n):
+            k = randint(0, 3)
+            if k == 3:
+                b = randint(2, 12); result = randint(2, 12)
+                rows.append((3, result * b, b, 0, result))
+            else:
+                a = randint(10, 120); b = randint(2, 30)
+                rows.append((k, a, b, 0, fns[k](a, b)))
+    else:
+        for _ in range(n):
+            k = randint(0, 4)
+            if k == 0:
+                a = randint(20, 150); b = randint(5, 80); c = randint(2, 6)
+            elif k == 1:
+                a = randint(4, 18); b = randint(1, 50); c = 0
+            elif k == 2:
+                a = randint(30, 200); b = randint(2, 20); c = randint(1, 50)
+            elif k == 3:
+                a = randint(20, 120); b = randint(1, 60); c = randint(2, 8)
+            else:
+                a = randint(50, 200); b = randint(2, 20); c = randint(1, 40)
+            rows.append((k, a, b, c, fns[k](a, b, c)))
+    return rows
+
+
+def _rows_numpy(tier, n, rng):
+    """
+    Vectorized batch: operands, operators and answers in one pass.
+    Answers are kept as numerator/denominator columns so "/" stays exact.
+    """
+    def ints(lo, hi):
+        # inclusive bounds, like random.randint
+        return rng.integers(lo, hi + 1, size=n)
+
+    if tier <= 2:
+        hi = 20 * tier
+        a = ints(1, hi); b = ints(1, hi); k = ints(0, 1)
+        c = np.zeros(n, dtype=np.int64)
+        num = np.where(k == 0, a + b, a - b)
+        den = np.ones(n, dtype=np.int64)
+    elif tier == 3:
+        a = ints(2, 40); b = ints(2, 30); c = ints(1, 12)
+        o1 = ints(0, 2); o2 = ints(0, 2)
+        left = np.choose(o1, [a + b, a - b, a * b])
+        num = np.choose(o2, [left + c, left - c, left * c])
+        den = np.ones(n, dtype=np.int64)
+        k = o1 * 3 + o2
+    elif tier == 4:
+        k = ints(0, 3)
+        div = k == 3
+        # division rows: a = result * b so the result stays clean
+        b_div = ints(2, 12); result = ints(2, 12)
+        a_op = ints(10, 120); b_op = ints(2, 30)
+        a = np.where(div, result * b_div, a_op)
+        b = np.where(div, b_div, b_op)
+        c = np.zeros(n, dtype=np.int64)
+        num = np.choose(k, [a + b, a - b, a * b, result])
+        den = np.ones(n, dtype=np.int64)
+    else:
+        k = ints(0, 4)
+        # draw every pattern's operands, then pick per row
+        lo_hi = [
+            ((20, 150), (5, 80), (2, 6)),
+            ((4, 18), (1, 50), (0, 0)),
+            ((30, 200), (2, 20), (1, 50)),
+            ((20, 120), (1, 60), (2, 8)),
+            ((50, 200), (2, 20), (1, 40)),
+        ]
+        cols = [[ints(*r) for r in spec] for spec in lo_hi]
+        a = np.choose(k, [col[0] for col in cols])
+        b = np.choose(k, [col[1] for col in cols])
+        c = np.choose(k, [col[2] for col in cols])
+        # pattern 2 is (a / b) + c == (a + c*b) / b
+        num = np.choose(k, [(a + b) * c, a * a - b, a + c * b, (a - b) * c, a % b + c])
+        den = np.where(k == 2, b, 1)
+    rows = zip(k.tolist(), a.tolist(), b.tolist(), c.tolist(), num.tolist(), den.tolist())
+    return [(k_, a_, b_, c_, n_ if d_ == 1 else normalize(Fraction(n_, d_)))
+            for k_, a_, b_, c_, n_, d_ in rows]
+
+
+def numpy_enabled(use_numpy=None):
+    """Resolve a use_numpy setting: None = use NumPy if it is installed."""
+    if use_numpy is None:
+        return NUMPY_AVAILABLE and _load_numpy() is not None
+    if use_numpy and _load_numpy() is None:
+        raise RuntimeError("NumPy is not available")
+    return bool(use_numpy)
+
+
+def generate_rows(level, n, rng, use_numpy=None):
+    """Generate n question rows for a level with the given RNG.
+
+    rng is a numpy Generator when NumPy is used, otherwise a
+    random.Random instance (see make_rng).
+    """
+    tier = _tier(level)
+    if numpy_enabled(use_numpy):
+        return _rows_numpy(tier, n, rng)
+    return _rows_python(tier, n, rng)
+
+
+def make_rng(seed, level, use_numpy=None):
+    """Per-level RNG so batches don't depend on refill order."""
+    if numpy_enabled(use_numpy):
+        if seed is None:
+            return np.random.default_rng()
+        return np.random.default_rng([seed, level])
+    if seed is None:
+        return random.Random()
+    return random.Random(f"{seed}-{level}")
+
+
+_TIER_TEMPLATES = {t: TEMPLATES[_template_key(t)] for t in range(1, QUESTION_TIERS + 1)}
+
+
+def format_row(level, row):
+    """Turn a generated row into (question_text, answer_value)."""
+    k, a, b, c, ans = row
+    return _TIER_TEMPLATES[_tier(level)][k].format(a, b, c), ans
+
+
+# ---------------- question bank ----------------
+class RefillWorker:
+    """Background thread generating batches for one or more QuestionBanks."""
+
+    def __init__(self):
+        self._wanted = deque()    # (bank, tier)
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="question-bank", daemon=True)
+        self._thread.start()
+
+    def request(self, bank, tier):
+        with self._cond:
+            if not any(b is bank and t == tier for b, t in self._wanted):
+                self._wanted.append((bank, tier))
+                self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._wanted and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                bank, tier = self._wanted[0]
+            bank._fill(tier)
+            with self._cond:
+                self._wanted.popleft()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class QuestionBank:
+    """
+    Prefetched questions per level.
+    next(level) pops from the buffer; when a buffer drops below low_water
+    the background thread generates another batch. If a buffer is empty
+    the batch is generated on the caller's thread instead of waiting.
+    With a seed, the questions drawn per level are reproducible for the
+    same seed, batch_size and generator (use_numpy). worker= shares a
+    RefillWorker with other banks instead of starting a thread.
+    """
+
+    def __init__(self, batch_size=512, low_water=128, seed=None, background=True, use_numpy=None,
+                 worker=None):
+        self.batch_size = batch_size
+        self.low_water = low_water
+        self.seed = seed
+        self.use_numpy = numpy_enabled(use_numpy)
+        self._generation = 0
+        self._buffers = {}
+        self._rngs = {}
+        self._gen_locks = {}
+        self._lock = threading.Lock()
+        self._worker = worker
+        self._own_worker = worker is None and background
+        if self._own_worker:
+            self._worker = RefillWorker()
+
+    def _level_state(self, tier):
+        # caller holds self._lock
+        if tier not in self._buffers:
+            self._buffers[tier] = deque()
+            self._rngs[tier] = make_rng(self.seed, tier, self.use_numpy)
+            self._gen_locks[tier] = threading.Lock()
+        return self._buffers[tier]
+
+    def _fill(self, tier):
+        with self._lock:
+            self._level_state(tier)
+            gen_lock = self._gen_locks[tier]
+        with gen_lock:
+            with self._lock:
+                generation = self._generation
+                rng = self._rngs[tier]
+            rows = generate_rows(tier, self.batch_size, rng, self.use_numpy)
+            with self._lock:
+                # a reseed() while generating makes this batch stale
+                if generation == self._generation:
+                    self._buffers[tier].extend(rows)
+
+    def _request(self, tier):
+        # caller holds self._lock (the worker never holds its lock while filling)
+        if self._worker is not None:
+            self._worker.request(self, tier)
+
+    def reseed(self, seed):
+        """Drop buffered questions and restart every level's RNG from seed."""
+        with self._lock:
+            self.seed = seed
+            self._generation += 1
+            for tier, buf in self._buffers.items():
+                buf.clear()
+                self._rngs[tier] = make_rng(seed, tier, self.use_numpy)
+                self._request(tier)
+
+    def prefetch(self, levels):
+        """Queue an initial batch for each level (no-op if already buffered)."""
+        with self._lock:
+            for lvl in levels:
+                tier = _tier(lvl)
+                if not self._level_state(tier):
+                    self._request(tier)
+
+    def next(self, level):
+        """Return (question_text, answer_value) for a level."""
+        tier = level if 0 < level <= QUESTION_TIERS else _tier(level)
+        while True:
+            # deque.popleft is atomic, so the hot path takes no lock
+            buf = self._buffers.get(tier)
+            if buf:
+                try:
+                    k, a, b, c, ans = buf.popleft()
+                except IndexError:
+                    continue  # another thread took the last row
+                if len(buf) < self.low_water and self._worker is not None:
+                    with self._lock:
+                        self._request(tier)
+                return _TIER_TEMPLATES[tier][k].format(a, b, c), ans
+            # empty buffer: generate here rather than block on the worker
+            self._fill(tier)
+
+    def close(self):
+        if self._own_worker:
+            self._worker.close()
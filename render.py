@@ -0,0 +1,205 @@
+"""
+render.py
+Retained-mode helpers for the game canvases:
+- CountingCanvas: tk.Canvas that counts items created (total and per minute)
+- RenderQueue: collects dirty widgets and flushes them once per frame
+- HpBar: HP bar built once, then only updated with coords/itemconfig
+- Camera: shake / knockback / flash by moving tagged canvas items
+- ItemPool: hidden canvas items reused by short-lived effects
+"""
+
+import math
+import time
+import tkinter as tk
+from collections import deque
+
+
+class CountingCanvas(tk.Canvas):
+    """Canvas that counts every create_* call, to prove item churn is gone."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.created = 0
+        self._recent = deque()   # creation timestamps inside the last minute
+
+    def _create(self, itemType, args, kw):
+        self.created += 1
+        now = time.monotonic()
+        self._recent.append(now)
+        while self._recent and now - self._recent[0] > 60.0:
+            self._recent.popleft()
+        return super()._create(itemType, args, kw)
+
+    def created_per_minute(self):
+        now = time.monotonic()
+        while self._recent and now - self._recent[0] > 60.0:
+            self._recent.popleft()
+        return len(self._recent)
+
+
+class RenderQueue:
+    """
+    Widgets call mark(widget) when their value changes; all marked
+    widgets are flushed together on the next frame, so several updates
+    in one frame cost one redraw.
+    """
+
+    def __init__(self, sched):
+        self.sched = sched
+        self._dirty = []
+        self._pending = False
+
+    def mark(self, widget):
+        if widget not in self._dirty:
+            self._dirty.append(widget)
+        if not self._pending:
+            self._pending = True
+            # on_end also runs if the frame work gets cancelled (screen switch)
+            self.sched.after(0, self.flush, tag="render", on_end=self.flush)
+
+    def flush(self):
+        self._pending = False
+        dirty, self._dirty = self._dirty, []
+        for widget in dirty:
+            widget.flush()
+
+
+class HpBar:
+    """Background, fill and label items are created once per canvas."""
+
+    def __init__(self, canvas, queue, width, height, color):
+        self.canvas = canvas
+        self.queue = queue
+        self.width = width
+        self.height = height
+        canvas.create_rectangle(0, 0, width, height, fill="#222", outline="#222")
+        self.fill_id = canvas.create_rectangle(0, 0, 0, height, fill=color, outline="")
+        self.text_id = canvas.create_text(width // 2, height // 2, text="", fill="#000", font=("Arial", 10))
+        self._shown = None
+        self._value = None
+
+    def set(self, value, maximum):
+        self._value = (value, maximum)
+        if self._value != self._shown:
+            self.queue.mark(self)
+
+    def flush(self):
+        if self._value == self._shown:
+            return
+        value, maximum = self._shown = self._value
+        ratio = max(0, value) / maximum if maximum else 0
+        self.canvas.coords(self.fill_id, 0, 0, int(self.width * ratio), self.height)
+        self.canvas.itemconfigure(self.text_id, text=f"{value}/{maximum}")
+
+
+class Camera:
+    """
+    Effects as offsets on canvas tags ("layers"): each running effect adds
+    an (x, y) offset to its layer, and the layer's items are moved by the
+    change in the summed offset. Nothing outside the canvas is touched.
+    Layers used by the game: "world" (the whole scene) and "monster".
+    """
+
+    def __init__(self, canvas, sched, tag="camera"):
+        self.canvas = canvas
+        self.sched = sched
+        self.tag = tag
+        self._applied = {}   # layer -> (x, y) the items are currently moved by
+        self._effects = {}   # key -> (layer, x, y)
+        self._flash = None
+
+    def _apply(self, layer):
+        x = y = 0.0
+        for lay, ex, ey in self._effects.values():
+            if lay == layer:
+                x += ex
+                y += ey
+        ax, ay = self._applied.get(layer, (0, 0))
+        dx, dy = round(x) - ax, round(y) - ay
+        if dx or dy:
+            self.canvas.move(layer, dx, dy)
+            self._applied[layer] = (ax + dx, ay + dy)
+
+    def _effect(self, layer, duration_ms, offset, step_ms=None, delay_ms=0):
+        key = object()
+
+        def step(t):
+            self._effects[key] = (layer,) + offset(t)
+            self._apply(layer)
+
+        def end():
+            if self._effects.pop(key, None) is not None:
+                self._apply(layer)
+
+        def begin():
+            self.sched.tween(duration_ms, step, tag=self.tag, on_end=end, step_ms=step_ms)
+        if delay_ms:
+            self.sched.after(delay_ms, begin, tag=self.tag)
+        else:
+            begin()
+
+    def shake(self, amplitude=10, duration_ms=200, layer="world", step_ms=None):
+        """Decaying left-right shake (4 swings)."""
+        self._effect(layer, duration_ms,
+                     lambda t: (amplitude * (1.0 - t) * math.sin(t * 8.0 * math.pi), 0.0), step_ms)
+
+    def knockback(self, layer, dx, dy=0, duration_ms=220, delay_ms=0, step_ms=None):
+        """Push a layer out by (dx, dy) and ease it back."""
+        self._effect(layer, duration_ms,
+                     lambda t: (dx * math.sin(t * math.pi), dy * math.sin(t * math.pi)), step_ms, delay_ms)
+
+    def flash(self, color="#ffffff", duration_ms=120, stipple=True, delay_ms=0):
+        """Briefly cover the canvas (stippled wash, or a thick border without stipple)."""
+        c = self.canvas
+        if self._flash is None or not c.type(self._flash):
+            w, h = int(c.cget("width")), int(c.cget("height"))
+            self._flash = c.create_rectangle(0, 0, w, h, state="hidden", tags=(f"{self.tag}-flash",))
+        item = self._flash
+
+        def hide():
+            c.itemconfigure(item, state="hidden")
+
+        def show():
+            if stipple:
+                c.itemconfigure(item, fill=color, stipple="gray25", outline="", state="normal")
+            else:
+                c.itemconfigure(item, fill="", stipple="", outline=color, width=8, state="normal")
+            c.tag_raise(item)
+            self.sched.after(duration_ms, hide, tag=self.tag, on_end=hide)
+        self.sched.after(delay_ms, show, tag=self.tag)
+
+    def reset(self):
+        """Stop all effects; cancelled effects move their items back."""
+        self.sched.cancel_tag(self.tag)
+        self._effects.clear()
+        self._applied.clear()
+
+
+class ItemPool:
+    """
+    Short-lived items (projectiles) are hidden and reused instead of
+    created and deleted, so item count and ids stay flat in long sessions.
+    factory() must create the item hidden; acquire() returns an item id
+    that the caller positions and shows.
+    """
+
+    def __init__(self, canvas, factory):
+        self.canvas = canvas
+        self.factory = factory
+        self._free = []
+        self.created = 0
+        self.in_use = 0
+
+    def acquire(self):
+        if self._free:
+            item = self._free.pop()
+        else:
+            item = self.factory()
+            self.created += 1
+        self.in_use += 1
+        return item
+
+    def release(self, item):
+        self.canvas.itemconfigure(item, state="hidden")
+        self._free.append(item)
+        self.in_use -= 1
@@ -0,0 +1,118 @@
+"""
+replay.py
+Headless replay of recorded game sessions.
+A recording (GameSession.recording()) holds the seed, the question bank
+settings and every answer / skip / timeout with its time. Replaying
+re-runs the same turns through GameSession as fast as the CPU allows
+and checks that score, HP, level and state come out the same.
+The game writes recordings into the telemetry log as
+{"type": "recording", ...} events, so a day of play is a regression and
+performance corpus:
+  python replay.py telemetry/events.jsonl [more.jsonl ...] [--json]
+Exit code 1 if any session diverges.
+"""
+
+import argparse
+import json
+import sys
+import time
+from fractions import Fraction
+
+from arith import normalize
+from game_core import CLEARED, GameSession, Rules
+from questions import QuestionBank, numpy_enabled
+
+
+def _value(entry):
+    # [ms, "a", "7/2"] -> Fraction; [ms, "a"] = unparsable input
+    return normalize(Fraction(entry[2])) if len(entry) > 2 else None
+
+
+def replay(rec, rules=None, banks=None):
+    """
+    Re-run one recording; returns the final state dict.
+    banks caches QuestionBanks by (batch, numpy) across calls.
+    """
+    batch, use_numpy = rec["bank"]["batch"], rec["bank"]["numpy"]
+    if not use_numpy:
+        # the pure-Python generator draws row by row: batch size doesn't matter
+        batch = 32
+    key = (batch, use_numpy)
+    bank = banks.get(key) if banks is not None else None
+    if bank is None:
+        bank = QuestionBank(batch_size=key[0], background=False, use_numpy=key[1])
+        if banks is not None:
+            banks[key] = bank
+    session = GameSession(rules=rules or Rules(), questions=bank)
+    session.start("replay", rec["difficulty"], rec["learning"], seed=rec["seed"],
+                  mode=rec.get("mode", "classic"))
+    session.new_question()
+    for entry in rec["inputs"]:
+        kind = entry[1]
+        if kind == "a":
+            result = session.answer(_value(entry))
+        elif kind == "s":
+            result = session.skip()
+        else:
+            result = session.timeout()
+        if result.state == CLEARED:
+            session.advance_level()
+        if session.over:
+            break
+        session.new_question()
+    return session.final_state()
+
+
+def load(paths):
+    """Recordings from JSONL files (telemetry logs or plain recording files)."""
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if event.get("type", "recording") == "recording" and "seed" in event:
+                    yield event
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Replay recorded sessions and verify the results")
+    ap.add_argument("files", nargs="+", help="JSONL files with recordings")
+    ap.add_argument("--json", action="store_true", help="print the summary as JSON")
+    ap.add_argument("-v", "--verbose", action="store_true", help="list every mismatch")
+    args = ap.parse_args(argv)
+
+    banks = {}
+    total = ok = skipped = turns = 0
+    mismatches = []
+    t0 = time.perf_counter()
+    for rec in load(args.files):
+        total += 1
+        if rec["bank"]["numpy"] and not numpy_enabled():
+            skipped += 1   # recorded with the NumPy generator
+            continue
+        got = replay(rec, banks=banks)
+        turns += len(rec["inputs"])
+        if got == rec["final"]:
+            ok += 1
+        else:
+            mismatches.append({"session": rec.get("session"), "expected": rec["final"], "got": got})
+    elapsed = time.perf_counter() - t0
+
+    summary = {"sessions": total, "ok": ok, "mismatched": len(mismatches), "skipped": skipped,
+               "turns": turns, "seconds": round(elapsed, 3),
+               "sessions_per_s": round((total - skipped) / elapsed, 1) if elapsed else 0.0}
+    if args.json:
+        print(json.dumps(dict(summary, mismatches=mismatches if args.verbose else [])))
+    else:
+        print(f"{total} sessions: {ok} ok, {len(mismatches)} mismatched, {skipped} skipped (no NumPy)")
+        print(f"{turns} turns in {elapsed:.2f}s ({summary['sessions_per_s']} sessions/s)")
+        if args.verbose:
+            for m in mismatches:
+                print(f"  {m['session']}: expected {m['expected']}, got {m['got']}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
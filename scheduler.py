@@ -0,0 +1,259 @@
+"""
+scheduler.py
+One frame clock for every animation and timer in the game.
+Instead of each effect chaining its own root.after() calls, effects
+register tasks here; the scheduler keeps a single Tk after() pending,
+runs every task that is due on each frame, and sleeps (no wakeups at
+all) when nothing is scheduled.
+- every(): repeating task (bob, timer tick)
+- after(): one-shot task (blink steps, shake steps, delayed flow)
+- tween(): progress-driven animation (projectiles)
+Tasks are cancelable by handle or by tag, and every task is registered
+with the screen that was current when it was added (cancel_screen() on
+the way out of a screen). An optional monitor (see perf.LagMonitor) is
+told how late and how long every task ran.
+Deadline is the drift-free countdown used for the question timer.
+"""
+
+import heapq
+import itertools
+import time
+import traceback
+
+
+class Task:
+    __slots__ = ("handle", "due", "interval", "fn", "tag", "name", "on_end", "cancelled", "screen")
+
+    def __init__(self, handle, due, interval, fn, tag, name, on_end, screen=None):
+        self.handle = handle
+        self.due = due
+        self.interval = interval   # seconds; None for one-shot
+        self.fn = fn
+        self.tag = tag
+        self.name = name
+        self.on_end = on_end       # called once when the task finishes or is cancelled
+        self.cancelled = False
+        self.screen = screen
+
+
+class FrameScheduler:
+    """
+    widget: any Tk widget (used only for after/after_cancel).
+    max_fps caps how many Tcl callbacks per second the scheduler itself
+    makes, however many tasks are active.
+    monitor: object with record(name, jitter_s, duration_s), or None.
+    """
+
+    def __init__(self, widget, max_fps=30, clock=time.monotonic, monitor=None):
+        self.widget = widget
+        self.clock = clock
+        self.monitor = monitor
+        self.frame_time = 1.0 / max_fps
+        self._heap = []
+        self._tasks = {}
+        self._tags = {}
+        self._screens = {}
+        self.screen = None         # owner of tasks added from now on
+        self._ids = itertools.count(1)
+        self._job = None
+        self._job_due = None
+        self._last_frame = 0.0
+        self.frames = 0
+
+    # ---------------- registering tasks ----------------
+    def _add(self, delay_ms, interval_ms, fn, tag, name, on_end):
+        handle = next(self._ids)
+        due = self.clock() + delay_ms / 1000.0
+        interval = interval_ms / 1000.0 if interval_ms is not None else None
+        task = Task(handle, due, interval, fn, tag, name or tag, on_end, self.screen)
+        self._tasks[handle] = task
+        if tag is not None:
+            self._tags.setdefault(tag, set()).add(handle)
+        if task.screen is not None:
+            self._screens.setdefault(task.screen, set()).add(handle)
+        heapq.heappush(self._heap, (due, handle))
+        self._wake(due)
+        return handle
+
+    def after(self, delay_ms, fn, tag=None, name=None, on_end=None):
+        """Run fn() once after delay_ms."""
+        return self._add(delay_ms, None, fn, tag, name, on_end)
+
+    def every(self, interval_ms, fn, tag=None, name=None, delay_ms=None, on_end=None):
+        """Run fn() every interval_ms until it returns False or is cancelled."""
+        first = interval_ms if delay_ms is None else delay_ms
+        return self._add(first, interval_ms, fn, tag, name, on_end)
+
+    def tween(self, duration_ms, fn, tag=None, name=None, on_end=None, step_ms=None):
+        """
+        Call fn(t) once per frame (or every step_ms) with t going from 0
+        to 1 over duration_ms (the last call always gets t == 1).
+        """
+        start = self.clock()
+        duration = max(duration_ms / 1000.0, 1e-9)
+
+        def step():
+            t = min(1.0, (self.clock() - start) / duration)
+            fn(t)
+            return t < 1.0
+        interval = step_ms if step_ms is not None else self.frame_time * 1000.0
+        return self._add(0, interval, step, tag, name, on_end)
+
+    # ---------------- cancelling ----------------
+    def _finish(self, task):
+        self._tasks.pop(task.handle, None)
+        if task.tag is not None:
+            handles = self._tags.get(task.tag)
+            if handles is not None:
+                handles.discard(task.handle)
+                if not handles:
+                    del self._tags[task.tag]
+        if task.screen is not None:
+            handles = self._screens.get(task.screen)
+            if handles is not None:
+                handles.discard(task.handle)
+                if not handles:
+                    del self._screens[task.screen]
+        if task.on_end is not None:
+            on_end, task.on_end = task.on_end, None
+            try:
+                on_end()
+            except Exception:
+                traceback.print_exc()
+
+    def cancel(self, handle):
+        task = self._tasks.get(handle)
+        if task is not None and not task.cancelled:
+            task.cancelled = True
+            self._finish(task)
+
+    def cancel_tag(self, tag):
+        for handle in list(self._tags.get(tag, ())):
+            self.cancel(handle)
+
+    def cancel_screen(self, screen):
+        """Cancel every task a screen registered (including ones added by on_end hooks)."""
+        while self._screens.get(screen):
+            for handle in list(self._screens[screen]):
+                self.cancel(handle)
+
+    def cancel_all(self):
+        while self._tasks:
+            for handle in list(self._tasks):
+                self.cancel(handle)
+        self._heap.clear()
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+
+    def active(self, tag=None, screen=None):
+        """Number of live tasks (optionally only those with a tag, or of a screen)."""
+        if screen is not None:
+            return len(self._screens.get(screen, ()))
+        if tag is None:
+            return len(self._tasks)
+        return len(self._tags.get(tag, ()))
+
+    # ---------------- the frame loop ----------------
+    def _wake(self, due):
+        # keep exactly one Tk callback pending, at the earliest due time
+        # but never sooner than one frame after the previous frame
+        due = max(due, self._last_frame + self.frame_time)
+        if self._job is not None:
+            if self._job_due <= due:
+                return
+            self.widget.after_cancel(self._job)
+        delay = max(0, int((due - self.clock()) * 1000))
+        self._job_due = due
+        self._job = self.widget.after(delay, self._frame)
+
+    def step(self):
+        """Run a frame now instead of waiting for Tk (compressed-time tests)."""
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+        self._job_due = self.clock()
+        self._frame()
+
+    def _frame(self):
+        due = self._job_due
+        self._job = None
+        now = self._last_frame = self.clock()
+        self.frames += 1
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            _, handle = heapq.heappop(heap)
+            task = self._tasks.get(handle)
+            if task is None or task.cancelled:
+                continue
+            self.run_task(task)
+            if task.cancelled:
+                continue
+            if task.interval is None:
+                self._finish(task)
+            else:
+                # fixed cadence; skip beats that were missed entirely
+                task.due += task.interval
+                if task.due <= now:
+                    task.due = now + task.interval
+                heapq.heappush(heap, (task.due, handle))
+        # drop cancelled entries sitting at the top
+        while heap and heap[0][1] not in self._tasks:
+            heapq.heappop(heap)
+        if self.monitor is not None:
+            # frame jitter and the cost of everything that ran in it
+            self.monitor.record("frame", now - due, self.clock() - now)
+        if heap:
+            self._wake(heap[0][0])
+
+    def run_task(self, task):
+        monitor = self.monitor
+        start = self.clock() if monitor is not None else 0.0
+        try:
+            keep = task.fn()
+        except Exception:
+            traceback.print_exc()
+            keep = False
+        if monitor is not None:
+            monitor.record(task.name or "task", start - task.due, self.clock() - start)
+        if keep is False and not task.cancelled:
+            task.cancelled = True
+            self._finish(task)
+
+
+class Deadline:
+    """
+    Monotonic countdown for one question. Remaining time is always
+    computed from the clock, so late or skipped ticks never add drift.
+    """
+
+    __slots__ = ("limit", "clock", "started", "stopped")
+
+    def __init__(self, limit_s, clock=time.monotonic):
+        self.limit = float(limit_s)
+        self.clock = clock
+        self.started = None
+        self.stopped = None
+
+    def start(self):
+        self.started = self.clock()
+        self.stopped = None
+
+    def elapsed(self):
+        """Seconds since start() (frozen once stop() was called)."""
+        if self.started is None:
+            return 0.0
+        end = self.stopped if self.stopped is not None else self.clock()
+        return end - self.started
+
+    def remaining(self):
+        return max(0.0, self.limit - self.elapsed())
+
+    def expired(self):
+        return self.started is not None and self.elapsed() >= self.limit
+
+    def stop(self):
+        """Freeze the clock; returns elapsed seconds (display-to-answer latency)."""
+        if self.started is not None and self.stopped is None:
+            self.stopped = self.clock()
+        return self.elapsed()
@@ -0,0 +1,301 @@
+"""
+server.py
+Many Math Adventure sessions in one process, for classroom play.
+One asyncio event loop runs every session; each session is a
+game_core.GameSession (same levels, monster skills, timers, combo and
+scoring as the Tk game) and its question deadline is a loop.call_later
+handle, not a thread.
+
+Protocol: one JSON object per line over TCP. A connection may run
+several sessions; every message names its session with "sid".
+  client -> server
+    {"op": "start", "sid": "s1", "name": "Budi", "difficulty": "Normal",
+     "learning": false, "mode": "classic", "seed": 42}
+    (mode: classic, tournament or endless)
+    {"op": "answer", "sid": "s1", "q": 3, "text": "12.5"}
+    {"op": "skip", "sid": "s1", "q": 3}
+    {"op": "quit", "sid": "s1"}
+  server -> client
+    {"ev": "question", "sid", "q", "level", "question", "time_limit", "slowed",
+     "player_hp", "enemy_hp", "score", "combo"}
+    {"ev": "result", "sid", "q", "kind", "correct", "damage", "blocked",
+     "countered", "hp_lost", "answer", "player_hp", "enemy_hp", "score"}
+    {"ev": "level", "sid", "level", "bonus"}
+    {"ev": "over", "sid", "won", "score", "level"}
+    {"ev": "error", "sid", "msg"}
+"q" numbers the questions of a session; an answer for an older question
+(e.g. one that crossed the timeout on the wire) gets an error, as does a
+field of the wrong type, an answer text over MAX_TEXT characters or a
+line over MAX_LINE bytes (the connection stays open).
+Run:  python server.py [--host 127.0.0.1] [--port 8765]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+from arith import format_answer, parse_answer
+from game_core import CLEARED, DIFFICULTY_TIMER, LOST, QUESTION, WON, GameSession
+from levels import MODES
+from questions import QuestionBank
+
+MAX_LINE = 4096
+MAX_TEXT = 64
+
+# allowed JSON types of the client fields (null means "not given")
+FIELD_TYPES = {"op": str, "sid": (str, int), "name": str, "difficulty": str, "mode": str,
+               "learning": bool, "seed": int, "q": int, "text": str}
+
+
+def check_message(msg):
+    """Error text for a malformed message, or None."""
+    for key, types in FIELD_TYPES.items():
+        value = msg.get(key)
+        if value is None:
+            continue
+        if not isinstance(value, types) or (isinstance(value, bool) and types is not bool):
+            return f"bad {key}"
+    if len(msg.get("text") or "") > MAX_TEXT:
+        return "answer too long"
+    return None
+
+
+async def read_line(reader):
+    """
+    Next line (b"" at end of stream), or None for a line over MAX_LINE,
+    which is skipped up to its newline so the connection stays usable.
+    """
+    too_long = False
+    while True:
+        try:
+            line = await reader.readuntil(b"\n")
+        except asyncio.IncompleteReadError as e:
+            line = e.partial      # closed, maybe mid-line
+        except asyncio.LimitOverrunError as e:
+            # drop what is buffered (already read, so this doesn't wait)
+            await reader.readexactly(e.consumed)
+            too_long = True
+            continue
+        return None if too_long and line else line
+
+
+class ServerSession:
+    __slots__ = ("sid", "conn", "game", "q", "timer")
+
+    def __init__(self, sid, conn, game):
+        self.sid = sid
+        self.conn = conn
+        self.game = game
+        self.q = 0
+        self.timer = None
+
+
+class GameServer:
+    """Owns the sessions; connections only parse and forward messages."""
+
+    def __init__(self, questions=None, max_sessions=20000):
+        # one bank for everyone: refills run on its background thread
+        self.questions = questions or QuestionBank(batch_size=4096, low_water=1024)
+        self.questions.prefetch(range(1, 6))
+        self.max_sessions = max_sessions
+        self.sessions = {}    # (conn id, sid) -> ServerSession
+        self.answers = 0
+        self.timeouts = 0
+        self.games = 0
+
+    # ---------------- session flow ----------------
+    def start(self, conn, msg):
+        sid = msg.get("sid")
+        key = (id(conn), sid)
+        if key in self.sessions:
+            self._drop(key)
+        if len(self.sessions) >= self.max_sessions:
+            conn.send({"ev": "error", "sid": sid, "msg": "server full"})
+            return
+        difficulty = msg.get("difficulty", "Normal")
+        if difficulty not in DIFFICULTY_TIMER:
+            conn.send({"ev": "error", "sid": sid, "msg": f"unknown difficulty {difficulty!r}"})
+            return
+        mode = msg.get("mode", "classic")
+        if mode not in MODES:
+            conn.send({"ev": "error", "sid": sid, "msg": f"unknown mode {mode!r}"})
+            return
+        game = GameSession(rng=random.Random(msg.get("seed")), questions=self.questions)
+        game.start((msg.get("name") or "")[:40], difficulty, bool(msg.get("learning", False)), mode=mode)
+        sess = self.sessions[key] = ServerSession(sid, conn, game)
+        self.games += 1
+        self._ask(sess)
+
+    def _ask(self, sess):
+        g = sess.game
+        limit = g.new_question()
+        sess.q += 1
+        sess.timer = asyncio.get_running_loop().call_later(limit, self._on_timeout, sess, sess.q)
+        sess.conn.send({"ev": "question", "sid": sess.sid, "q": sess.q, "level": g.level,
+                        "question": g.current_question, "time_limit": limit, "slowed": g.slowed,
+                        "player_hp": g.player_hp, "enemy_hp": g.enemy_hp, "score": g.score,
+                        "combo": g.combo})
+
+    def _turn(self, conn, msg, kind):
+        sid = msg.get("sid")
+        sess = self.sessions.get((id(conn), sid))
+        if sess is None:
+            conn.send({"ev": "error", "sid": sid, "msg": "no such session"})
+            return
+        if sess.game.state != QUESTION or msg.get("q", sess.q) != sess.q:
+            conn.send({"ev": "error", "sid": sid, "msg": "stale question"})
+            return
+        sess.timer.cancel()
+        g = sess.game
+        if kind == "answer":
+            result = g.answer(parse_answer(msg.get("text") or ""))
+        else:
+            result = g.skip()
+        self.answers += 1
+        self._resolve(sess, result)
+
+    def _on_timeout(self, sess, q):
+        if sess.q != q or sess.game.state != QUESTION:
+            return
+        self.timeouts += 1
+        self._resolve(sess, sess.game.timeout())
+
+    def _resolve(self, sess, result):
+        g = sess.game
+        sess.conn.send({"ev": "result", "sid": sess.sid, "q": sess.q, "kind": result.kind,
+                        "correct": result.correct, "damage": result.damage,
+                        "blocked": result.blocked, "countered": result.countered,
+                        "hp_lost": result.hp_lost, "answer": format_answer(g.current_answer),
+                        "player_hp": g.player_hp, "enemy_hp": g.enemy_hp, "score": g.score})
+        if result.state == CLEARED:
+            bonus = g.advance_level()
+            if g.state != WON:
+                sess.conn.send({"ev": "level", "sid": sess.sid, "level": g.level, "bonus": bonus})
+        if g.state in (LOST, WON):
+            sess.conn.send({"ev": "over", "sid": sess.sid, "won": g.state == WON,
+                            "score": g.score, "level": g.level_reached})
+            self._drop((id(sess.conn), sess.sid))
+            return
+        self._ask(sess)
+
+    def quit(self, conn, msg):
+        self._drop((id(conn), msg.get("sid")))
+
+    def _drop(self, key):
+        sess = self.sessions.pop(key, None)
+        if sess is not None and sess.timer is not None:
+            sess.timer.cancel()
+
+    def drop_connection(self, conn):
+        for key in [k for k in self.sessions if k[0] == id(conn)]:
+            self._drop(key)
+
+    # ---------------- network ----------------
+    async def handle(self, reader, writer):
+        conn = Connection(writer)
+        try:
+            while True:
+                try:
+                    line = await read_line(reader)
+                except ConnectionError:
+                    break
+                if line is None:
+                    conn.send({"ev": "error", "msg": "message too long"})
+                elif not line:
+                    break
+                else:
+                    self.dispatch(conn, line)
+                await conn.drain()
+        finally:
+            self.drop_connection(conn)
+            conn.close()
+
+    def dispatch(self, conn, line):
+        if len(line) > MAX_LINE:
+            conn.send({"ev": "error", "msg": "message too long"})
+            return
+        try:
+            msg = json.loads(line)
+            op = msg["op"]
+        except (ValueError, KeyError, TypeError, RecursionError):
+            # RecursionError: deeply nested brackets
+            conn.send({"ev": "error", "msg": "bad message"})
+            return
+        error = check_message(msg)
+        if error is not None:
+            sid = msg.get("sid")
+            conn.send({"ev": "error", "sid": sid if isinstance(sid, (str, int)) else None, "msg": error})
+            return
+        if op == "start":
+            self.start(conn, msg)
+        elif op == "answer":
+            self._turn(conn, msg, "answer")
+        elif op == "skip":
+            self._turn(conn, msg, "skip")
+        elif op == "quit":
+            self.quit(conn, msg)
+        else:
+            conn.send({"ev": "error", "sid": msg.get("sid"), "msg": f"unknown op {op!r}"})
+
+    async def report(self, interval):
+        last, t_last = 0, time.monotonic()
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            rate = (self.answers - last) / (now - t_last)
+            last, t_last = self.answers, now
+            print(f"sessions {len(self.sessions):6d}  answers/s {rate:8.1f}  "
+                  f"timeouts {self.timeouts}  games {self.games}", file=sys.stderr)
+
+
+class Connection:
+    __slots__ = ("writer", "closed")
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.closed = False
+
+    def send(self, msg):
+        if not self.closed:
+            self.writer.write(json.dumps(msg, separators=(",", ":")).encode("utf-8") + b"\n")
+
+    async def drain(self):
+        try:
+            await self.writer.drain()
+        except ConnectionError:
+            self.closed = True
+
+    def close(self):
+        self.closed = True
+        self.writer.close()
+
+
+async def serve(host, port, stats_interval=5.0, max_sessions=20000):
+    server = GameServer(max_sessions=max_sessions)
+    tcp = await asyncio.start_server(server.handle, host, port, limit=MAX_LINE)
+    print(f"Math Adventure server on {host}:{port}", file=sys.stderr)
+    if stats_interval:
+        asyncio.get_running_loop().create_task(server.report(stats_interval))
+    async with tcp:
+        await tcp.serve_forever()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Math Adventure multi-session server")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--max-sessions", type=int, default=20000)
+    ap.add_argument("--stats-interval", type=float, default=5.0,
+                    help="seconds between load lines on stderr (0 = off)")
+    args = ap.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.stats_interval, args.max_sessions))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""
+simulate.py
+Monte Carlo balancing simulator for Math Adventure.
+Plays synthetic players through game_core.GameSession and reports, per
+difficulty: win rate, score distribution and time-to-clear per level.
+
+Example:
+  python simulate.py -n 200000 --accuracy 0.85 --rt-median 4 --shield-chance 0.25
+
+Runs are reproducible: the same --seed and options give the same report,
+whatever the number of workers.
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from game_core import CLEARED, DIFFICULTY_TIMER, LOST, WON, GameSession, Rules
+from questions import QuestionBank
+
+SCORE_BUCKET = 25        # score histogram bucket width
+TIME_BUCKET = 1.0        # seconds per time-to-clear bucket
+MAX_TURNS = 400          # safety cap (learning mode can't be lost)
+
+
+class Player:
+    """Synthetic player: per-level accuracy and lognormal response time."""
+
+    __slots__ = ("accuracy", "accuracy_decay", "rt_mu", "rt_sigma")
+
+    def __init__(self, accuracy=0.85, accuracy_decay=0.03, rt_median=4.0, rt_sigma=0.5):
+        self.accuracy = accuracy
+        self.accuracy_decay = accuracy_decay
+        self.rt_mu = math.log(rt_median)
+        self.rt_sigma = rt_sigma
+
+    def p_correct(self, level):
+        return max(0.0, min(1.0, self.accuracy - self.accuracy_decay * (level - 1)))
+
+
+def _bump(hist, key):
+    hist[key] = hist.get(key, 0) + 1
+
+
+def run_chunk(job):
+    """Play `count` sessions; returns aggregated counters (picklable dict)."""
+    difficulty, chunk_seed, count, rule_overrides, player_args, learning = job
+    rng = random.Random(chunk_seed)
+    rules = Rules(**rule_overrides)
+    player = Player(**player_args)
+    session = GameSession(rules=rules, rng=rng,
+                          questions=QuestionBank(background=False, seed=rng.getrandbits(32)))
+    lognorm = rng.lognormvariate
+    stats = {
+        "games": 0, "wins": 0, "turns": 0, "timeouts": 0,
+        "score_hist": {}, "reached": {}, "cleared": {}, "clear_time_hist": {},
+        "clear_time_sum": {},
+    }
+    reached, cleared = stats["reached"], stats["cleared"]
+    clear_hist, clear_sum = stats["clear_time_hist"], stats["clear_time_sum"]
+
+    for _ in range(count):
+        session.start("sim", difficulty, learning)
+        level_time = 0.0
+        turns = 0
+        _bump(reached, 1)
+        while turns < MAX_TURNS:
+            limit = session.new_question()
+            turns += 1
+            rt = lognorm(player.rt_mu, player.rt_sigma)
+            if rt >= limit:
+                level_time += limit
+                stats["timeouts"] += 1
+                result = session.timeout()
+            else:
+                level_time += rt
+                ok = rng.random() < player.p_correct(session.level)
+                result = session.answer(session.current_answer if ok else None)
+            if result.state == CLEARED:
+                lvl = session.level
+                _bump(cleared, lvl)
+                _bump(clear_hist.setdefault(lvl, {}), int(level_time // TIME_BUCKET))
+                clear_sum[lvl] = clear_sum.get(lvl, 0.0) + level_time
+                level_time = 0.0
+                session.advance_level()
+                if session.state == WON:
+                    break
+                _bump(reached, session.level)
+            elif result.state == LOST:
+                break
+        stats["games"] += 1
+        stats["turns"] += turns
+        stats["wins"] += session.state == WON
+        _bump(stats["score_hist"], session.score // SCORE_BUCKET)
+    return difficulty, stats
+
+
+def merge(into, part):
+    for key in ("games", "wins", "turns", "timeouts"):
+        into[key] += part[key]
+    for key in ("score_hist", "reached", "cleared"):
+        for k, v in part[key].items():
+            into[key][k] = into[key].get(k, 0) + v
+    for lvl, hist in part["clear_time_hist"].items():
+        dst = into["clear_time_hist"].setdefault(lvl, {})
+        for k, v in hist.items():
+            dst[k] = dst.get(k, 0) + v
+    for lvl, total in part["clear_time_sum"].items():
+        into["clear_time_sum"][lvl] = into["clear_time_sum"].get(lvl, 0.0) + total
+
+
+def hist_percentile(hist, q, width):
+    """Approximate percentile from a bucketed histogram (bucket midpoint)."""
+    total = sum(hist.values())
+    if not total:
+        return 0.0
+    target = q * total
+    seen = 0
+    for bucket in sorted(hist):
+        seen += hist[bucket]
+        if seen >= target:
+            return (bucket + 0.5) * width
+    return (max(hist) + 0.5) * width
+
+
+def summarize(stats, max_level):
+    games = stats["games"] or 1
+    levels = {}
+    for lvl in range(1, max_level + 1):
+        n = stats["cleared"].get(lvl, 0)
+        hist = stats["clear_time_hist"].get(lvl, {})
+        levels[lvl] = {
+            "reached": stats["reached"].get(lvl, 0) / games,
+            "cleared": n / games,
+            "time_mean": stats["clear_time_sum"].get(lvl, 0.0) / n if n else None,
+            "time_p50": hist_percentile(hist, 0.5, TIME_BUCKET) if n else None,
+            "time_p90": hist_percentile(hist, 0.9, TIME_BUCKET) if n else None,
+        }
+    score = stats["score_hist"]
+    return {
+        "games": stats["games"],
+        "win_rate": stats["wins"] / games,
+        "turns_mean": stats["turns"] / games,
+        "timeout_rate": stats["timeouts"] / (stats["turns"] or 1),
+        "score_p10": hist_percentile(score, 0.1, SCORE_BUCKET),
+        "score_p50": hist_percentile(score, 0.5, SCORE_BUCKET),
+        "score_p90": hist_percentile(score, 0.9, SCORE_BUCKET),
+        "levels": levels,
+    }
+
+
+def print_report(report, elapsed):
+    for difficulty, r in report.items():
+        print(f"\n== {difficulty} ==  games {r['games']:,}  win rate {r['win_rate']:.1%}  "
+              f"turns/game {r['turns_mean']:.1f}  timeouts {r['timeout_rate']:.1%}")
+        print(f"   score p10/p50/p90: {r['score_p10']:.0f} / {r['score_p50']:.0f} / {r['score_p90']:.0f}")
+        print("   level  reached  cleared   time mean   p50    p90")
+        for lvl, lv in r["levels"].items():
+            t = (f"{lv['time_mean']:9.1f}s {lv['time_p50']:5.1f}s {lv['time_p90']:5.1f}s"
+                 if lv["time_mean"] is not None else "        -")
+            print(f"   {lvl:5d}  {lv['reached']:7.1%}  {lv['cleared']:7.1%}  {t}")
+    total = sum(r["games"] for r in report.values())
+    print(f"\n{total:,} sessions in {elapsed:.2f}s ({total / elapsed:,.0f}/s)")
+
+
+def parse_timers(text):
+    """'Easy=15,Hard=6' -> dict merged over DIFFICULTY_TIMER."""
+    timers = dict(DIFFICULTY_TIMER)
+    for part in filter(None, text.split(",")):
+        name, _, secs = part.partition("=")
+        timers[name.strip()] = int(secs)
+    return timers
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Math Adventure balancing simulator")
+    ap.add_argument("-n", "--sessions", type=int, default=100000, help="sessions per difficulty")
+    ap.add_argument("--difficulty", action="append", help="difficulty to run (repeatable; default all)")
+    ap.add_argument("--learning", action="store_true", help="simulate learning mode (no HP loss)")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--chunk", type=int, default=2000, help="sessions per worker task")
+    ap.add_argument("--json", metavar="FILE", help="also write the report as JSON")
+    # player model
+    ap.add_argument("--accuracy", type=float, default=0.85, help="chance of a correct answer at level 1")
+    ap.add_argument("--accuracy-decay", type=float, default=0.03, help="accuracy lost per level")
+    ap.add_argument("--rt-median", type=float, default=4.0, help="median response time (s)")
+    ap.add_argument("--rt-sigma", type=float, default=0.5, help="lognormal sigma of response time")
+    # rules under test
+    ap.add_argument("--timers", default="", help="timer overrides, e.g. Easy=15,Hard=6")
+    ap.add_argument("--combo-step", type=int, default=3)
+    ap.add_argument("--enemy-hp-base", type=int, default=3)
+    ap.add_argument("--enemy-hp-step", type=int, default=2)
+    ap.add_argument("--counter-chance", type=float, default=0.20)
+    ap.add_argument("--shield-chance", type=float, default=0.30)
+    ap.add_argument("--slow-chance", type=float, default=0.25)
+    args = ap.parse_args(argv)
+
+    overrides = {
+        "difficulty_timer": parse_timers(args.timers),
+        "combo_step": args.combo_step,
+        "enemy_hp_base": args.enemy_hp_base,
+        "enemy_hp_step": args.enemy_hp_step,
+        "counter_chance": args.counter_chance,
+        "shield_chance": args.shield_chance,
+        "slow_chance": args.slow_chance,
+    }
+    player = {
+        "accuracy": args.accuracy,
+        "accuracy_decay": args.accuracy_decay,
+        "rt_median": args.rt_median,
+        "rt_sigma": args.rt_sigma,
+    }
+    difficulties = args.difficulty or list(overrides["difficulty_timer"])
+
+    # fixed chunking + per-chunk seeds keep results independent of --workers
+    jobs = []
+    for d_idx, difficulty in enumerate(difficulties):
+        left, i = args.sessions, 0
+        while left > 0:
+            count = min(args.chunk, left)
+            jobs.append((difficulty, f"{args.seed}-{d_idx}-{i}", count, overrides, player, args.learning))
+            left -= count
+            i += 1
+
+    totals = {d: None for d in difficulties}
+    t0 = time.perf_counter()
+    if args.workers <= 1:
+        results = map(run_chunk, jobs)
+    else:
+        pool = ProcessPoolExecutor(max_workers=args.workers)
+        results = pool.map(run_chunk, jobs, chunksize=max(1, len(jobs) // (args.workers * 4)))
+    for difficulty, part in results:
+        if totals[difficulty] is None:
+            totals[difficulty] = part
+        else:
+            merge(totals[difficulty], part)
+    if args.workers > 1:
+        pool.shutdown()
+    elapsed = time.perf_counter() - t0
+
+    max_level = Rules(**overrides).max_level
+    report = {d: summarize(totals[d], max_level) for d in difficulties}
+    print_report(report, elapsed)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+snapshot.py
+Save / resume an unfinished game.
+- capture(session, ...) / restore(session, snap): GameSession <-> dict
+- pack(snap) / unpack(data): compact binary form (struct), versioned and
+  checked with a CRC; about 2.6 KB, most of it the RNG state
+- SnapshotWriter: writes on a background thread, atomically (temp file +
+  rename), and only the newest snapshot if several are queued
+- load(path): the saved snapshot, or None if there is none (or it is
+  damaged)
+A resumed run continues with the same level, HP, score, combo, question,
+remaining time and skill rolls. It is not replayable (replay.py): the
+question bank is not part of the snapshot.
+"""
+
+import os
+import random
+import struct
+import threading
+import time
+import zlib
+from fractions import Fraction
+
+from arith import normalize
+from game_core import CLEARED, LOST, QUESTION, RESOLVED, WON, new_session_id
+
+MAGIC = b"MAsv"
+VERSION = 1
+STATES = (QUESTION, RESOLVED, CLEARED, LOST, WON)
+
+_HEAD = struct.Struct("<4sHI")            # magic, version, body length
+_FIXED = struct.Struct("<IhiqIBBddd")     # level, player hp, enemy hp, score, combo,
+                                          # state, flags, time limit, remaining, saved at
+_RNG = struct.Struct("<B625IBd")          # Mersenne Twister state, gauss_next
+_STR = struct.Struct("<H")
+MAX_STR = 0xFFFF                          # longer strings (a pasted name) are cut
+_CRC = struct.Struct("<I")
+_STRINGS = ("player_name", "difficulty", "mode", "session_id", "question", "answer")
+
+_LEARNING = 1
+_SLOWED = 2
+
+
+class SnapshotError(ValueError):
+    """Raised for data that is not a snapshot this version can read."""
+
+
+# ---------------- session <-> dict ----------------
+def capture(session, remaining=None, session_id=""):
+    """Everything needed to continue the run; remaining = seconds left on the question."""
+    s = session
+    return {
+        "level": s.level, "player_hp": s.player_hp, "enemy_hp": s.enemy_hp,
+        "score": s.score, "combo": s.combo, "state": s.state,
+        "learning_mode": s.learning_mode, "slowed": s.slowed,
+        "time_limit": float(s.time_limit),
+        "remaining": float(s.time_limit if remaining is None else remaining),
+        "saved_at": time.time(),
+        "player_name": s.player_name, "difficulty": s.difficulty, "mode": s.mode,
+        "session_id": session_id, "question": s.current_question,
+        "answer": "" if s.current_answer is None else str(Fraction(s.current_answer)),
+        "rng": s.rng.getstate(),
+    }
+
+
+def restore(session, snap):
+    """
+    Put a captured run back into a GameSession (not recorded: seed is
+    dropped); returns the run's session id for telemetry.
+    """
+    s = session
+    s.start(snap["player_name"], snap["difficulty"], snap["learning_mode"], mode=snap["mode"])
+    s.seed = None
+    s.inputs = None
+    s.level = snap["level"]
+    s.spec = s.rules.levels.spec(s.level)
+    s.player_hp = snap["player_hp"]
+    s.enemy_hp = snap["enemy_hp"]
+    s.score = snap["score"]
+    s.combo = snap["combo"]
+    s.state = snap["state"]
+    s.slowed = snap["slowed"]
+    s.time_limit = snap["time_limit"]
+    s.current_question = snap["question"]
+    s.current_answer = normalize(Fraction(snap["answer"])) if snap["answer"] else None
+    rng = random.Random()
+    rng.setstate(snap["rng"])
+    s.rng = rng
+    return snap["session_id"] or new_session_id()
+
+
+# ---------------- binary format ----------------
+def pack(snap):
+    flags = (_LEARNING if snap["learning_mode"] else 0) | (_SLOWED if snap["slowed"] else 0)
+    parts = [_FIXED.pack(snap["level"], snap["player_hp"], snap["enemy_hp"], snap["score"],
+                         snap["combo"], STATES.index(snap["state"]), flags,
+                         snap["time_limit"], snap["remaining"], snap["saved_at"])]
+    for key in _STRINGS:
+        raw = snap[key].encode("utf-8")
+        if len(raw) > MAX_STR:
+            # cut on a character boundary
+            raw = raw[:MAX_STR].decode("utf-8", "ignore").encode("utf-8")
+        parts.append(_STR.pack(len(raw)))
+        parts.append(raw)
+    version, internal, gauss = snap["rng"]
+    parts.append(_RNG.pack(version, *internal, gauss is not None, gauss or 0.0))
+    body = b"".join(parts)
+    data = _HEAD.pack(MAGIC, VERSION, len(body)) + body
+    return data + _CRC.pack(zlib.crc32(data))
+
+
+def unpack(data):
+    if len(data) < _HEAD.size + _CRC.size:
+        raise SnapshotError("snapshot too short")
+    magic, version, size = _HEAD.unpack_from(data)
+    if magic != MAGIC:
+        raise SnapshotError("not a snapshot")
+    if version != VERSION:
+        raise SnapshotError(f"snapshot version {version} (this game reads {VERSION})")
+    end = _HEAD.size + size
+    if len(data) != end + _CRC.size or _CRC.unpack_from(data, end)[0] != zlib.crc32(data[:end]):
+        raise SnapshotError("snapshot damaged")
+    try:
+        (level, player_hp, enemy_hp, score, combo, state, flags,
+         time_limit, remaining, saved_at) = _FIXED.unpack_from(data, _HEAD.size)
+        snap = {"level": level, "player_hp": player_hp, "enemy_hp": enemy_hp, "score": score,
+                "combo": combo, "state": STATES[state], "learning_mode": bool(flags & _LEARNING),
+                "slowed": bool(flags & _SLOWED), "time_limit": time_limit,
+                "remaining": remaining, "saved_at": saved_at}
+        pos = _HEAD.size + _FIXED.size
+        for key in _STRINGS:
+            (n,) = _STR.unpack_from(data, pos)
+            pos += _STR.size
+            snap[key] = data[pos:pos + n].decode("utf-8")
+            pos += n
+        rng = _RNG.unpack_from(data, pos)
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise SnapshotError(f"snapshot damaged ({e})")
+    snap["rng"] = (rng[0], rng[1:626], rng[627] if rng[626] else None)
+    return snap
+
+
+def load(path):
+    try:
+        with open(path, "rb") as f:
+            return unpack(f.read())
+    except (OSError, SnapshotError):
+        return None
+
+
+# ---------------- background writer ----------------
+_DELETE = object()
+
+
+class SnapshotWriter:
+    """save()/clear() return at once; the file is written by a worker thread."""
+
+    def __init__(self, path):
+        self.path = path
+        self.written = 0
+        self.errors = 0
+        self._pending = None
+        self._stop = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="snapshot", daemon=True)
+        self._thread.start()
+
+    def save(self, data):
+        with self._cond:
+            self._pending = data      # replaces an older snapshot still waiting
+            self._cond.notify()
+
+    def clear(self):
+        self.save(_DELETE)
+
+    def close(self, timeout=2.0):
+        """Write what is pending, then stop the thread."""
+        with self._cond:
+            self._stop = True
+            self._cond.notify()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stop:
+                    self._cond.wait()
+                data, self._pending = self._pending, None
+                stop = self._stop
+            if data is not None:
+                try:
+                    self._write(data)
+                except Exception:
+                    # a failed save must not stop the writer
+                    self.errors += 1
+            if stop and data is None:
+                return
+
+    def _write(self, data):
+        if data is _DELETE:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            return
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self.written += 1
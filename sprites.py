@@ -0,0 +1,157 @@
+"""
+sprites.py
+Lazy monster sprite loading:
+- images are found, decoded and resized on a worker thread, ahead of
+  the level that needs them (prefetch)
+- resized copies are kept in an on-disk cache keyed by
+  path + mtime + size, so later launches skip the LANCZOS resize
+- only a few Tk PhotoImages are kept in memory (LRU)
+PIL is optional and only imported by the worker when first needed.
+"""
+
+import hashlib
+import os
+import threading
+import time
+import tkinter as tk
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "math_adventure", "sprites")
+
+_pil = None
+_pil_lock = threading.Lock()
+
+
+def load_pil():
+    """Import PIL on first use; returns (Image, ImageTk) or None."""
+    global _pil
+    with _pil_lock:
+        if _pil is None:
+            try:
+                from PIL import Image, ImageTk
+                _pil = (Image, ImageTk)
+            except Exception:
+                _pil = False
+        return _pil or None
+
+
+def find_image(candidates):
+    """First existing path from a candidate list, or None."""
+    for p in candidates:
+        if os.path.exists(p):
+            return p
+    return None
+
+
+def cache_key(path, size):
+    st = os.stat(path)
+    raw = f"{os.path.abspath(path)}|{st.st_mtime_ns}|{size[0]}x{size[1]}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class SpriteCache:
+    """
+    candidates: {level: [paths...]} like IMAGE_CANDIDATES.
+    get(level) must be called from the Tk thread; it returns a PhotoImage
+    or None (caller draws the fallback shape).
+    """
+
+    def __init__(self, root, candidates, size=(300, 280), cache_dir=DEFAULT_CACHE_DIR, max_photos=3):
+        self.root = root
+        self.candidates = candidates
+        self.size = size
+        self.cache_dir = cache_dir
+        self.max_photos = max_photos
+        self._photos = OrderedDict()
+        self._futures = {}
+        self.decode_ms = {}   # level -> worker time spent finding/decoding
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sprites")
+
+    # ---------------- worker side ----------------
+    def _decode(self, level):
+        """Runs on the worker: returns ("pil", Image), ("file", path) or None."""
+        t0 = time.perf_counter()
+        try:
+            return self._decode_level(level)
+        finally:
+            self.decode_ms[level] = (time.perf_counter() - t0) * 1000.0
+
+    def _decode_level(self, level):
+        path = find_image(self.candidates.get(level, []))
+        if path is None:
+            return None
+        pil = load_pil()
+        if pil is None:
+            # tkinter PhotoImage has to be built on the Tk thread
+            return ("file", path)
+        Image = pil[0]
+        try:
+            cached = None
+            if self.cache_dir:
+                cached = os.path.join(self.cache_dir, cache_key(path, self.size) + ".png")
+                if os.path.exists(cached):
+                    img = Image.open(cached)
+                    img.load()
+                    return ("pil", img)
+            img = Image.open(path).convert("RGBA")
+            img = img.resize(self.size, Image.LANCZOS)
+            if cached:
+                self._store(img, cached)
+            return ("pil", img)
+        except Exception:
+            return ("file", path)
+
+    def _store(self, img, target):
+        # write-then-rename so a half-written file is never picked up
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = f"{target}.{os.getpid()}.tmp"
+            img.save(tmp, "PNG")
+            os.replace(tmp, target)
+        except OSError:
+            pass
+
+    # ---------------- Tk side ----------------
+    def prefetch(self, level):
+        """Start decoding a level's sprite in the background."""
+        if level in self._photos or level in self._futures or level not in self.candidates:
+            return
+        self._futures[level] = self._pool.submit(self._decode, level)
+
+    def get(self, level):
+        if level in self._photos:
+            self._photos.move_to_end(level)
+            return self._photos[level]
+        self.prefetch(level)
+        future = self._futures.pop(level, None)
+        try:
+            decoded = future.result() if future else None
+        except Exception:
+            decoded = None
+        photo = self._to_photo(decoded)
+        self._photos[level] = photo
+        while len(self._photos) > self.max_photos:
+            self._photos.popitem(last=False)
+        return photo
+
+    def _to_photo(self, decoded):
+        if decoded is None:
+            return None
+        kind, value = decoded
+        try:
+            if kind == "pil":
+                return load_pil()[1].PhotoImage(value, master=self.root)
+            # tkinter PhotoImage will fail for formats not supported; still try
+            return tk.PhotoImage(file=value, master=self.root)
+        except Exception:
+            return None
+
+    def wait(self, level):
+        """Block until a prefetched level has been decoded (profiling only)."""
+        future = self._futures.get(level)
+        if future is not None:
+            future.exception()
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
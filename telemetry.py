@@ -0,0 +1,112 @@
+"""
+telemetry.py
+Per-answer event log written off the Tk thread.
+- emit() only puts the event on a bounded queue; when the queue is full
+  the event is dropped and counted instead of blocking the game
+- a background thread batches events into an append-only JSONL file
+- the file is rotated by size (events.jsonl -> events.jsonl.1 -> ...)
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+
+_STOP = object()
+
+
+class TelemetryWriter:
+    def __init__(self, path, max_queue=10000, batch_size=256, flush_interval=0.5,
+                 max_bytes=5 * 1024 * 1024, backups=5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.dropped = 0
+        self.written = 0
+        self._reported_drops = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._file = None
+        self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self._thread.start()
+
+    # ---------------- producer side (Tk thread) ----------------
+    def emit(self, event):
+        """Queue one event (a JSON-serializable dict); never blocks."""
+        event.setdefault("ts", time.time())
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout=2.0):
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    # ---------------- writer thread ----------------
+    def _run(self):
+        batch = []
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = None
+            stop = item is _STOP
+            if item is not None and not stop:
+                batch.append(item)
+                # drain whatever else is ready, up to one batch
+                while len(batch) < self.batch_size:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stop = True
+                        break
+                    batch.append(item)
+            if self.dropped != self._reported_drops:
+                batch.append({"type": "telemetry", "ts": time.time(), "dropped": self.dropped})
+                self._reported_drops = self.dropped
+            if batch:
+                self._write(batch)
+                batch = []
+            if stop:
+                if self._file:
+                    self._file.close()
+                return
+
+    def _open(self):
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _write(self, batch):
+        try:
+            if self._file is None:
+                self._open()
+            data = "".join(json.dumps(e, default=str, separators=(",", ":")) + "\n" for e in batch)
+            self._file.write(data)
+            self._file.flush()
+            self.written += len(batch)
+            if self._file.tell() >= self.max_bytes:
+                self._rotate()
+        except OSError:
+            self.dropped += len(batch)
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
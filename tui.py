@@ -0,0 +1,710 @@
+"""
+tui.py
+Math Adventure in a terminal (curses), for headless thin clients and
+SSH-only machines. Same GameSession rules as the Tk game:
+- menu: name, difficulty, mode (classic / tournament / endless), learning mode
+- monster skills per level (levels.py), countdown timer, combo damage
+- text-art monsters and HP bars
+- incremental updates: a field is only rewritten when its text changed,
+  and curses sends only the changed cells to the terminal
+- leaderboard, telemetry and save file are the Tk game's (same
+  MATH_ADVENTURE_* variables), so a run can be resumed in either front end
+No Tk, Pillow or NumPy is imported.
+Keys in game: type the answer + Enter, s = lewati, r = ulang, Esc = menu.
+Run:  python tui.py [--seed N] [--profile-startup [text|json]]
+"""
+
+import time
+_START = time.perf_counter()
+
+import argparse
+import json
+import locale
+import os
+import sys
+
+try:
+    import curses
+except ImportError:     # Windows without the windows-curses package
+    sys.exit("tui.py needs curses (on Windows: pip install windows-curses)")
+
+from arith import format_answer, parse_answer
+from game_core import (CLEARED, DIFFICULTY_TIMER, LOST, QUESTION, GameSession, best_score,
+                       board_mode, finish_game, new_seed, new_session_id, turn_event)
+from levels import MODES
+from paths import SAVE_FILE, TELEMETRY_LOG, open_leaderboard
+from perf import StartupProfiler
+from questions import QuestionBank
+from scheduler import Deadline
+import snapshot
+from telemetry import TelemetryWriter
+
+MIN_W, MIN_H = 64, 22
+BAR_W = 20
+ANSWER_CHARS = "0123456789-./"
+ESC = "\x1b"
+
+# Text-art monsters, indexed like the sprites (LevelSpec.sprite)
+MONSTER_ART = {
+    1: (r"               ",
+        r"    .-'''-.    ",
+        r"   /  o o  \   ",
+        r"  |    ~    |  ",
+        r"   \_______/   ",
+        r"               "),
+    2: (r"   /\_____/\   ",
+        r"  (  >   <  )  ",
+        r"   \  ---  /   ",
+        r"  --|=====|--  ",
+        r"    /     \    ",
+        r"   ^^     ^^   "),
+    3: (r"   .~~~~~~~~.  ",
+        r"  (  ^    ^  ) ",
+        r" (    (__)    )",
+        r"  (  ~~~~~~  ) ",
+        r"   '~~~~~~~~'  ",
+        r"               "),
+    4: (r"  [#########]  ",
+        r"  [# O   O #]  ",
+        r"  [#  ___  #]  ",
+        r"__[#########]__",
+        r"  [###] [###]  ",
+        r"  [###] [###]  "),
+    5: (r" /\   ____   /\ ",
+        r"/  \_/    \_/  \ ",
+        r"\   | @  @ |   / ",
+        r" \  |  /\  |  /  ",
+        r"    \ VVVV /     ",
+        r"     \____/      "),
+}
+PLAYER_ART = (r"  O  ",
+              r" /|\ ",
+              r" / \ ")
+
+# color pairs (plain attributes on terminals without color)
+RED, GREEN, YELLOW, CYAN, GREY = range(1, 6)
+
+
+def rss_kb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss   # peak, KB on Linux
+
+
+def hp_bar(value, maximum, width=BAR_W):
+    filled = max(0, min(width, round(width * value / maximum))) if maximum > 0 else 0
+    return "[" + "#" * filled + "-" * (width - filled) + "]"
+
+
+# ---------------- retained text fields ----------------
+class View:
+    """
+    Named text fields on a curses window. put() writes a field only when
+    its position, text or attribute changed (blanking what the old text
+    covered); flush() pushes the changes in one doupdate().
+    """
+
+    def __init__(self, win):
+        self.win = win
+        self.fields = {}
+        self.writes = 0
+        self.dirty = True
+
+    def reset(self):
+        """Forget every field (screen switch, terminal resize)."""
+        self.fields.clear()
+        self.win.erase()
+        self.dirty = True
+
+    def _write(self, y, x, text, attr):
+        h, w = self.win.getmaxyx()
+        if not (0 <= y < h and 0 <= x < w):
+            return
+        try:
+            self.win.addnstr(y, x, text, w - x, attr)
+        except curses.error:
+            pass    # writing the bottom-right cell moves the cursor off screen
+
+    def put(self, key, y, x, text, attr=0):
+        old = self.fields.get(key)
+        if old == (y, x, text, attr):
+            return
+        pad = 0
+        if old is not None:
+            if (old[0], old[1]) != (y, x):
+                self._write(old[0], old[1], " " * len(old[2]), 0)
+            else:
+                pad = max(0, len(old[2]) - len(text))
+        self._write(y, x, text + " " * pad, attr)
+        self.fields[key] = (y, x, text, attr)
+        self.writes += 1
+        self.dirty = True
+
+    def flush(self):
+        if self.dirty:
+            self.win.noutrefresh()
+            curses.doupdate()
+            self.dirty = False
+
+
+# ---------------- app ----------------
+class TerminalApp:
+    def __init__(self, win, seed=None, save_file=SAVE_FILE, profiler=None):
+        self.win = win
+        self.view = View(win)
+        self.profiler = profiler or StartupProfiler()
+        self.fixed_seed = seed
+        self._init_colors()
+        try:
+            curses.curs_set(0)
+        except curses.error:
+            pass
+
+        # small batches generated on this thread: no refill thread, no NumPy
+        self.session = GameSession(questions=QuestionBank(batch_size=64, background=False, use_numpy=False))
+        self.session_id = ""
+        self.leaderboard = open_leaderboard()
+        self.profiler.mark("leaderboard")
+        self.telemetry = TelemetryWriter(TELEMETRY_LOG)
+        self.saver = snapshot.SnapshotWriter(save_file)
+        self.saved = snapshot.load(save_file)
+
+        self.screen = None
+        self.running = True
+        self.small = False
+        # menu
+        self.name = ""
+        self.difficulty = "Normal"
+        self.mode = "classic"
+        self.learning = False
+        self.field = 0
+        self.menu_msg = ""
+        # game
+        self.deadline = Deadline(0)
+        self.last_latency_ms = 0.0
+        self.typed = ""
+        self.feedback = ("", 0)
+        self.confirm = None     # (prompt, fn) waiting for y / n
+        self.flow = None        # (due, fn): next step after feedback or a level clear
+        self.flash = {}         # "monster" / "player" -> (until, knockback columns)
+        self.shot = None        # (start, end, from_player)
+        self.over_lines = ()
+        self.show_menu()
+
+    def _init_colors(self):
+        self.colors = {}
+        if not curses.has_colors():
+            return
+        curses.start_color()
+        try:
+            curses.use_default_colors()
+            bg = -1
+        except curses.error:
+            bg = curses.COLOR_BLACK
+        for pair, fg in ((RED, curses.COLOR_RED), (GREEN, curses.COLOR_GREEN),
+                         (YELLOW, curses.COLOR_YELLOW), (CYAN, curses.COLOR_CYAN),
+                         (GREY, curses.COLOR_WHITE)):
+            curses.init_pair(pair, fg, bg)
+            self.colors[pair] = curses.color_pair(pair)
+
+    def color(self, pair, extra=0):
+        return self.colors.get(pair, 0) | extra
+
+    def _switch(self, screen):
+        # leaving an unfinished game keeps it resumable
+        if self.screen == "game" and screen != "game" and not self.session.over:
+            self._cancel_all()
+            self._save_snapshot()
+        self.screen = screen
+        self.view.reset()
+
+    # ---------------- main loop ----------------
+    def run(self):
+        while self.running:
+            self.tick()
+            self.draw()
+            self.view.flush()
+            if self.screen == "game" and self.session.state == QUESTION and self.deadline.started is None:
+                # the clock starts once the question is on screen
+                self._start_timer()
+            self.win.timeout(self._wait_ms())
+            try:
+                key = self.win.get_wch()
+            except curses.error:
+                continue        # timeout: no key
+            self.on_key(key)
+
+    def _wait_ms(self):
+        if self.screen != "game":
+            return -1           # nothing moves: sleep until a key
+        now = time.monotonic()
+        ms = 33 if self._animating(now) else 100
+        dues = [self.flow[0]] if self.flow else []
+        if self.session.state == QUESTION and self.deadline.started is not None:
+            dues.append(self.deadline.started + self.deadline.limit)
+        for due in dues:
+            ms = min(ms, max(1, int((due - now) * 1000) + 1))
+        return ms
+
+    def _animating(self, now):
+        return (self.shot is not None and now < self.shot[1]) or any(
+            until > now for until, _ in self.flash.values())
+
+    def tick(self):
+        if self.screen != "game":
+            return
+        now = time.monotonic()
+        if self.flow is not None and now >= self.flow[0]:
+            fn = self.flow[1]
+            self.flow = None
+            fn()
+        if self.session.state == QUESTION and self.deadline.expired():
+            self._on_timeout()
+
+    def after(self, ms, fn):
+        self.flow = (time.monotonic() + ms / 1000.0, fn)
+
+    # ---------------- keys ----------------
+    def on_key(self, key):
+        if key == curses.KEY_RESIZE:
+            self.view.reset()
+            return
+        if key in ("\r", "\n", curses.KEY_ENTER):
+            key = "\n"
+        elif key in ("\x7f", "\b", curses.KEY_BACKSPACE):
+            key = "\b"
+        if self.screen == "menu":
+            self.key_menu(key)
+        elif self.screen == "game":
+            self.key_game(key)
+        else:
+            self.key_over(key)
+
+    def _menu_items(self):
+        items = ["name", "difficulty", "mode", "learning", "start"]
+        if self.saved is not None:
+            items.append("resume")
+        return items
+
+    def key_menu(self, key):
+        items = self._menu_items()
+        item = items[self.field]
+        if item == "name" and isinstance(key, str) and key.isprintable():
+            if len(self.name) < 20:
+                self.name += key
+        elif item == "name" and key == "\b":
+            self.name = self.name[:-1]
+        elif key in (curses.KEY_UP, curses.KEY_BTAB):
+            self.field = (self.field - 1) % len(items)
+        elif key in (curses.KEY_DOWN, "\t"):
+            self.field = (self.field + 1) % len(items)
+        elif key in (curses.KEY_LEFT, curses.KEY_RIGHT, " "):
+            step = -1 if key == curses.KEY_LEFT else 1
+            if item == "difficulty":
+                names = list(DIFFICULTY_TIMER)
+                self.difficulty = names[(names.index(self.difficulty) + step) % len(names)]
+            elif item == "mode":
+                self.mode = MODES[(MODES.index(self.mode) + step) % len(MODES)]
+            elif item == "learning":
+                self.learning = not self.learning
+        elif key == "\n":
+            if item == "resume":
+                self.resume_game()
+            else:
+                self.start_game()
+        elif key == ESC:
+            self.running = False
+
+    def key_game(self, key):
+        if self.confirm is not None:
+            prompt, fn = self.confirm
+            self.confirm = None
+            if key in ("y", "Y"):
+                fn()
+            return
+        if key == "\n":
+            self.submit_answer()
+        elif key == "\b":
+            self.typed = self.typed[:-1]
+        elif isinstance(key, str) and key in ANSWER_CHARS:
+            if len(self.typed) < 12:
+                self.typed += key
+        elif key in ("s", "S", "\t"):
+            # the timer keeps running while the player decides
+            if self.session.state == QUESTION:
+                self.confirm = ("Lewati soal ini? Kamu kehilangan 1 HP. (y/n)", self._do_skip)
+        elif key in ("r", "R"):
+            self.confirm = ("Mulai ulang permainan? (y/n)", self._reset_game_state)
+        elif key in (ESC, "q", "Q"):
+            self.confirm = ("Kembali ke menu? (y/n)", self.show_menu)
+
+    def key_over(self, key):
+        if key == "\n":
+            self._reset_game_state()
+        elif key in ("m", "M"):
+            self.show_menu()
+        elif key in (ESC, "q", "Q"):
+            self.running = False
+
+    # ---------------- menu ----------------
+    def show_menu(self):
+        self._switch("menu")
+        self.field = min(self.field, len(self._menu_items()) - 1)
+
+    def start_game(self):
+        name = self.name.strip()
+        if not name:
+            self.menu_msg = "Masukkan nama pemain dulu."
+            self.field = 0
+            return
+        self.menu_msg = ""
+        self.session.start(name, self.difficulty, self.learning, seed=new_seed(self.fixed_seed), mode=self.mode)
+        self.session_id = new_session_id()
+        self.prepare_level()
+
+    def _reset_game_state(self):
+        s = self.session
+        s.start(s.player_name, s.difficulty, s.learning_mode, seed=new_seed(self.fixed_seed), mode=s.mode)
+        self.session_id = new_session_id()
+        self.prepare_level()
+
+    def resume_game(self):
+        snap = self.saved
+        if snap is None:
+            return
+        self.session_id = snapshot.restore(self.session, snap)
+        self._switch("game")
+        state = self.session.state
+        if state == QUESTION:
+            # same question, with the time that was left
+            self._show_question(snap["remaining"])
+        elif state == CLEARED:
+            self._on_enemy_defeated()
+        else:
+            self._next_question()
+
+    def prepare_level(self):
+        self._switch("game")
+        self._cancel_all()
+        self.flash.clear()
+        self.shot = None
+        self._next_question()
+
+    # ---------------- questions / timer ----------------
+    def _next_question(self):
+        self._cancel_timer()
+        self.confirm = None
+        # session draws the question and applies Golem slow / boss timer
+        self._show_question(self.session.new_question())
+
+    def _show_question(self, limit):
+        # started by the main loop once the question has been drawn
+        self.deadline = Deadline(limit)
+        self.typed = ""
+        self.feedback = ("", 0)
+
+    def _start_timer(self):
+        self.deadline.start()
+        self._save_snapshot()
+
+    def _cancel_timer(self):
+        self.last_latency_ms = self.deadline.stop() * 1000.0
+
+    def _cancel_all(self):
+        self._cancel_timer()
+        self.flow = None
+        self.confirm = None
+
+    def _save_snapshot(self):
+        s = self.session
+        remaining = self.deadline.remaining() if s.state == QUESTION else None
+        self.saved = snapshot.capture(s, remaining, self.session_id)
+        self.saver.save(snapshot.pack(self.saved))
+
+    # ---------------- turns ----------------
+    def _on_timeout(self):
+        # time out: penalize player (unless learning mode)
+        self._cancel_timer()
+        self.confirm = None
+        s = self.session
+        question, answer = s.current_question, s.current_answer
+        result = s.timeout()
+        self._log_turn(result, question, answer, "")
+        self.feedback = ("Waktu habis! Kamu terkena serangan.", self.color(YELLOW))
+        if result.hp_lost:
+            self._hit("player")
+        if result.state == LOST:
+            self._end_game(False)
+            return
+        self.after(600, self._next_question)
+
+    def submit_answer(self):
+        txt = self.typed.strip()
+        # ignore Enter between questions (feedback delay, level transition)
+        if txt == "" or self.session.state != QUESTION:
+            return
+        self._cancel_timer()
+        # accept 12, -3, 3.5 or 7/2; compared exactly (no float tolerance)
+        s = self.session
+        question, answer = s.current_question, s.current_answer
+        result = s.answer(parse_answer(txt))
+        self._log_turn(result, question, answer, txt)
+
+        if result.correct:
+            self.feedback = (f"Benar! Damage {result.damage} (Combo {s.combo})", self.color(GREEN, curses.A_BOLD))
+            self._shoot(from_player=True)
+            if result.blocked:
+                self.feedback = ("Musuh memblokir serangan!", self.color(YELLOW))
+            else:
+                # monster recoils when the shot lands
+                self._hit("monster", knockback=1 + result.damage)
+            if result.countered:
+                self.feedback = ("Kamu kena serangan balik oleh Goblin!", self.color(RED))
+                if result.hp_lost:
+                    self._hit("player")
+            if result.state == CLEARED:
+                self.after(350, self._on_enemy_defeated)
+            elif result.state == LOST:
+                self._end_game(False)
+            else:
+                self.after(450, self._next_question)
+        else:
+            self.feedback = (f"Salah! Jawaban benar: {format_answer(answer)}", self.color(RED, curses.A_BOLD))
+            if result.hp_lost:
+                self._hit("player")
+            if result.state == LOST:
+                self._end_game(False)
+                return
+            self.after(500, self._next_question)
+
+    def _do_skip(self):
+        if self.session.state != QUESTION:
+            return
+        self._cancel_timer()
+        s = self.session
+        question, answer = s.current_question, s.current_answer
+        result = s.skip()
+        self._log_turn(result, question, answer, "")
+        self.feedback = ("Kamu melewatkan soal (-1 HP).", self.color(YELLOW))
+        if result.state == LOST:
+            self._end_game(False)
+            return
+        self.after(400, self._next_question)
+
+    def _log_turn(self, result, question, answer, player_input):
+        s = self.session
+        self.telemetry.emit(turn_event(s, result, question, answer, player_input,
+                                       self.last_latency_ms, self.session_id, "tui"))
+        # every turn is a state change worth saving (game over clears the save)
+        if not s.over:
+            self._save_snapshot()
+
+    def _on_enemy_defeated(self):
+        s = self.session
+        cleared = s.level
+        bonus = s.advance_level()
+        if s.over:
+            self._end_game(True)
+            return
+        self._save_snapshot()
+        self.flash.clear()
+        self.feedback = (f"Kamu mengalahkan monster level {cleared}! Bonus skor: {bonus}",
+                         self.color(GREEN, curses.A_BOLD))
+        self.after(1200, self._next_question)
+
+    # ---------------- effects ----------------
+    def _hit(self, who, knockback=0):
+        self.flash[who] = (time.monotonic() + 0.35, knockback)
+
+    def _shoot(self, from_player):
+        now = time.monotonic()
+        self.shot = (now, now + 0.3, from_player)
+
+    # ---------------- end game ----------------
+    def _end_game(self, won):
+        self._cancel_all()
+        s = self.session
+        self.saved = None
+        self.saver.clear()
+        new_hs = finish_game(s, won, self.leaderboard, self.telemetry, self.session_id)
+        lines = ["Kamu menaklukkan FINAL BOSS!" if won else "Kamu kalah.",
+                 f"Skor: {s.score}   Level: {s.level_reached}"]
+        if new_hs:
+            lines += ["", f"NEW HIGHSCORE! ({s.difficulty})"]
+        self.over_lines = tuple(lines)
+        self._switch("over")
+
+    def close(self):
+        if self.screen == "game" and not self.session.over:
+            self._save_snapshot()
+        self.saver.close()
+        self.telemetry.close()
+        self.leaderboard.close()
+
+    # ---------------- drawing ----------------
+    def draw(self):
+        h, w = self.win.getmaxyx()
+        if h < MIN_H or w < MIN_W:
+            if not self.small:
+                self.small = True
+                self.view.reset()
+            self.view.put("small", 0, 0, f"Perbesar terminal (minimal {MIN_W}x{MIN_H}).")
+            return
+        if self.small:
+            self.small = False
+            self.view.reset()
+        if self.screen == "menu":
+            self.draw_menu(w, h)
+        elif self.screen == "game":
+            self.draw_game(w, h)
+        else:
+            self.draw_over(w, h)
+
+    def _center(self, key, y, w, text, attr=0):
+        self.view.put(key, y, max(0, (w - len(text)) // 2), text, attr)
+
+    def draw_menu(self, w, h):
+        v = self.view
+        self._center("title", 2, w, "=== MATH ADVENTURE ===", self.color(CYAN, curses.A_BOLD))
+        self._center("subtitle", 3, w, "Belajar sambil bermain - jawab cepat, kalahkan monster!", self.color(GREY))
+        x = max(2, (w - 48) // 2)
+        items = self._menu_items()
+        for i, item in enumerate(items):
+            selected = i == self.field
+            if item == "name":
+                text = f"Nama       : {self.name}{'_' if selected else ''}"
+            elif item == "difficulty":
+                text = f"Difficulty : < {self.difficulty} > ({DIFFICULTY_TIMER[self.difficulty]} detik/soal)"
+            elif item == "mode":
+                text = f"Mode       : < {self.mode} >"
+            elif item == "learning":
+                text = f"Learning   : [{'x' if self.learning else ' '}] tanpa kehilangan HP"
+            elif item == "start":
+                text = "[ Mulai ]"
+            else:
+                text = f"[ Lanjutkan: {self.saved['player_name']} (Level {self.saved['level']}) ]"
+            v.put(("item", i), 6 + i + (i >= 4), x, text, curses.A_REVERSE if selected else 0)
+        v.put("msg", 13, x, self.menu_msg, self.color(RED))
+        hs_name, hs_score = best_score(self.leaderboard)
+        v.put("highscore", 15, x, f"Highscore: {hs_name} - {hs_score}", self.color(YELLOW))
+        mode = board_mode(self.mode, self.learning)
+        top = self.leaderboard.top(self.difficulty, mode)[:3]
+        board = "  ".join(f"{i + 1}. {n} {sc}" for i, (n, sc) in enumerate(top)) or "-"
+        v.put("board", 16, x, f"Top {self.difficulty}/{mode}: {board}"[:w - x - 1], self.color(GREY))
+        v.put("help", h - 2, x, "Atas/Bawah pilih  Kiri/Kanan ubah  Enter mulai  Esc keluar", self.color(GREY))
+
+    def draw_game(self, w, h):
+        v, s = self.view, self.session
+        now = time.monotonic()
+        spec = s.spec
+        last = "-" if s.last_level is None else s.last_level
+        v.put("title", 0, 1, "MATH ADVENTURE", self.color(CYAN, curses.A_BOLD))
+        stats = f"Pemain: {s.player_name}   Level: {s.level_reached}/{last}   Skor: {s.score}"
+        v.put("stats", 0, max(17, w - len(stats) - 2), stats)
+        info = f"{s.difficulty} - {s.mode}" + (" - learning mode" if s.learning_mode else "")
+        v.put("info", 1, 1, info, self.color(GREY))
+        v.put("rule1", 2, 0, "-" * (w - 1), self.color(GREY))
+
+        # monster
+        mx = w // 2 + 4
+        v.put("monster", 3, mx, f"{spec.name} (Level {spec.level})", self.color(RED, curses.A_BOLD))
+        v.put("skill", 4, mx, spec.skill[:w - mx - 1], self.color(GREY))
+        until, knock = self.flash.get("monster", (0, 0))
+        hit = now < until
+        for i, line in enumerate(MONSTER_ART[spec.sprite]):
+            v.put(("art", i), 5 + i, mx + (knock if hit else 0), line,
+                  self.color(RED, curses.A_REVERSE if hit else curses.A_BOLD))
+        # player
+        until, _ = self.flash.get("player", (0, 0))
+        for i, line in enumerate(PLAYER_ART):
+            v.put(("player", i), 8 + i, 8, line, self.color(RED if now < until else GREEN, curses.A_BOLD))
+        # projectile
+        text, x = "", 14
+        if self.shot is not None and now < self.shot[1]:
+            start, end, from_player = self.shot
+            t = (now - start) / (end - start)
+            x0, x1 = (14, mx - 2) if from_player else (mx - 2, 14)
+            text, x = ("o>" if from_player else "<o"), int(x0 + (x1 - x0) * t)
+        v.put("shot", 9, x, text, self.color(YELLOW, curses.A_BOLD))
+
+        # HP bars and combo
+        v.put("enemy_hp", 12, 2, f"Musuh  {hp_bar(s.enemy_hp, s.enemy_max_hp)} {max(0, s.enemy_hp)}/{s.enemy_max_hp}",
+              self.color(RED))
+        v.put("player_hp", 13, 2, f"Kamu   {hp_bar(s.player_hp, s.max_player_hp)} {s.player_hp}/{s.max_player_hp}",
+              self.color(GREEN))
+        bonus = s.combo // s.rules.combo_step
+        combo = (f"Combo x{s.combo}" + (f" (+{bonus} damage)" if bonus else "")) if s.combo else ""
+        v.put("combo", 13, 40, combo, self.color(YELLOW, curses.A_BOLD))
+        v.put("rule2", 14, 0, "-" * (w - 1), self.color(GREY))
+
+        # timer, question, answer
+        d = self.deadline
+        remaining = d.remaining()   # frozen once answered
+        low = remaining <= 3 and s.state == QUESTION
+        filled = int(round(BAR_W * remaining / d.limit)) if d.limit else 0
+        v.put("timer", 15, 2, f"Waktu: {remaining:4.1f}s [{'=' * filled}{' ' * (BAR_W - filled)}]"
+              + ("  (slow!)" if s.slowed else ""), self.color(RED if low else CYAN))
+        v.put("question", 17, 2, f"Soal : {s.current_question} = ?", curses.A_BOLD)
+        caret = "_" if s.state == QUESTION else ""
+        v.put("answer", 18, 2, f"Jawab: {self.typed}{caret}")
+        text, attr = self.feedback
+        if self.confirm is not None:
+            text, attr = self.confirm[0], self.color(YELLOW, curses.A_BOLD)
+        v.put("feedback", 19, 2, text[:w - 3], attr)
+        v.put("help", h - 1, 2, "Enter jawab  s lewati  r ulang  Esc menu", self.color(GREY))
+
+    def draw_over(self, w, h):
+        top = max(2, h // 2 - 4)
+        for i, line in enumerate(self.over_lines):
+            self._center(("over", i), top + i, w, line, self.color(YELLOW, curses.A_BOLD))
+        self._center("help", top + len(self.over_lines) + 2, w,
+                     "Enter main lagi   m menu   Esc keluar", self.color(GREY))
+
+
+# --------------------- RUN ---------------------
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description="Math Adventure (terminal)")
+    ap.add_argument("--seed", type=int, help="play every run with this seed (reproducible questions and rolls)")
+    ap.add_argument("--profile-startup", nargs="?", const="text", choices=("text", "json"),
+                    help="print a time breakdown up to the first drawn menu and the memory used, then exit")
+    return ap.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    locale.setlocale(locale.LC_ALL, "")
+    os.environ.setdefault("ESCDELAY", "25")     # Esc without the default 1s wait
+    profiler = StartupProfiler(_START)
+    profiler.mark("imports")
+
+    def run(win):
+        profiler.mark("curses init")
+        app = TerminalApp(win, seed=args.seed, profiler=profiler)
+        try:
+            if args.profile_startup:
+                app.draw()
+                app.view.flush()
+                profiler.mark("first paint")
+                return
+            app.run()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            app.close()
+
+    curses.wrapper(run)
+    if args.profile_startup == "json":
+        print(json.dumps(dict(profiler.report(), rss_kb=rss_kb())))
+    elif args.profile_startup:
+        profiler.print_report()
+        print(f"  {'memory (RSS)':18s} {rss_kb() / 1024:8.1f} MB")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+"""
+worksheets.py
+Printable / importable drill sheets from the game's question generator.
+- a sheet holds a fixed mix of levels (--mix 1=5,2=5,3=5,4=3,5=2)
+- sheets are generated in chunks by worker processes and written in
+  order as chunks finish; only a few chunks are in flight, so memory
+  stays flat however many sheets are requested
+- no question repeats inside a sheet (--no-dedupe to allow it); a level
+  can't ask for more questions per sheet than it has distinct questions
+- answers inline (--with-answers) and/or in a separate answer key file
+Output is the same for the same --worksheet-seed whatever the number of workers.
+Run:  python worksheets.py sheets.csv --sheets 1000
+  or: python "math advanture.py" --export-worksheets sheets.txt --format text
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import sys
+import time
+from collections import deque
+
+from arith import format_answer
+from questions import QUESTION_TIERS, _TIER_TEMPLATES, _tier, generate_rows, make_rng
+
+FORMATS = ("csv", "jsonl", "text")
+DEFAULT_MIX = "1=4,2=4,3=4,4=4,5=4"
+
+
+def question_space(level):
+    """Number of distinct questions a level can produce (see questions._rows_python)."""
+    tier = _tier(level)
+    if tier <= 2:
+        hi = 20 * tier
+        return 2 * hi * hi
+    if tier == 3:
+        return 9 * 39 * 29 * 12
+    if tier == 4:
+        return 3 * 111 * 29 + 11 * 11
+    return 131 * 76 * 5 + 15 * 50 + 171 * 19 * 50 + 101 * 60 * 7 + 151 * 19 * 40
+
+
+def parse_mix(text):
+    """'1=5,3=10' -> [(1, 5), (3, 10)] (questions per sheet, by level)."""
+    mix = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        level, _, count = part.partition("=")
+        try:
+            level, count = int(level), int(count)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"bad mix entry {part!r} (want LEVEL=COUNT)")
+        if level < 1 or count < 0:
+            raise argparse.ArgumentTypeError(f"bad mix entry {part!r}")
+        if count:
+            mix.append((level, count))
+    if not mix:
+        raise argparse.ArgumentTypeError("mix is empty")
+    return sorted(mix)
+
+
+# ---------------- worker side ----------------
+def _draw(level, count, n_sheets, rng, dedupe):
+    """count rows per sheet for n_sheets sheets (no repeats inside a sheet)."""
+    sheets = []
+    pool = deque()
+    for _ in range(n_sheets):
+        seen = set()
+        rows = []
+        while len(rows) < count:
+            if not pool:
+                pool.extend(generate_rows(level, max(64, count * n_sheets // 4), rng))
+            row = pool.popleft()
+            if dedupe:
+                key = row[:4]
+                if key in seen:
+                    continue
+                seen.add(key)
+            rows.append(row)
+        sheets.append(rows)
+    return sheets
+
+
+def _render(fmt, sheet_no, items, with_answers):
+    """items: [(number, level, question, answer_text)] -> text block."""
+    if fmt == "csv":
+        buf = io.StringIO()
+        w = csv.writer(buf, lineterminator="\n")
+        for n, level, q, a in items:
+            w.writerow([sheet_no, n, level, q, a] if with_answers else [sheet_no, n, level, q])
+        return buf.getvalue()
+    if fmt == "jsonl":
+        out = []
+        for n, level, q, a in items:
+            row = {"sheet": sheet_no, "n": n, "level": level, "question": q}
+            if with_answers:
+                row["answer"] = a
+            out.append(json.dumps(row, ensure_ascii=False) + "\n")
+        return "".join(out)
+    lines = [f"Lembar {sheet_no}"]
+    for n, level, q, a in items:
+        lines.append(f"{n:3d}. {q} = {a}" if with_answers else f"{n:3d}. {q} = ______")
+    return "\n".join(lines) + "\n\n"
+
+
+def _render_key(fmt, sheet_no, items):
+    if fmt == "text":
+        answers = "   ".join(f"{n}) {a}" for n, _, _, a in items)
+        return f"Kunci Jawaban Lembar {sheet_no}\n{answers}\n\n"
+    if fmt == "csv":
+        buf = io.StringIO()
+        w = csv.writer(buf, lineterminator="\n")
+        for n, _, _, a in items:
+            w.writerow([sheet_no, n, a])
+        return buf.getvalue()
+    return "".join(json.dumps({"sheet": sheet_no, "n": n, "answer": a}) + "\n" for n, _, _, a in items)
+
+
+def make_chunk(job):
+    """Generate sheets [first, first + n_sheets); returns (sheet text, key text)."""
+    first, n_sheets, mix, chunk_seed, fmt, with_answers, want_key, dedupe = job
+    seed = random.Random(chunk_seed).getrandbits(63)
+    per_level = []
+    for level, count in mix:
+        tier = _tier(level)
+        per_level.append((level, tier, _draw(level, count, n_sheets, make_rng(seed, level), dedupe)))
+    body, key = [], []
+    for i in range(n_sheets):
+        items = []
+        for level, tier, sheets in per_level:
+            templates = _TIER_TEMPLATES[tier]
+            for k, a, b, c, ans in sheets[i]:
+                items.append((len(items) + 1, level, templates[k].format(a, b, c), format_answer(ans)))
+        body.append(_render(fmt, first + i, items, with_answers))
+        if want_key:
+            key.append(_render_key(fmt, first + i, items))
+    return "".join(body), "".join(key)
+
+
+# ---------------- writer side ----------------
+def _header(fmt, with_answers, key=False):
+    if fmt != "csv":
+        return ""
+    if key:
+        return "sheet,n,answer\n"
+    return "sheet,n,level,question,answer\n" if with_answers else "sheet,n,level,question\n"
+
+
+def export(path, sheets, mix, fmt="csv", seed=1, workers=None, chunk=200,
+           with_answers=False, answer_key=None, dedupe=True):
+    """Write the sheets; returns the number of questions written."""
+    if dedupe:
+        for level, count in mix:
+            if count > question_space(level):
+                raise ValueError(f"level {level} has only {question_space(level)} distinct questions, "
+                                 f"{count} per sheet requested")
+    jobs = ((first, min(chunk, sheets - first + 1), mix, f"{seed}-{first}", fmt,
+             with_answers, answer_key is not None, dedupe)
+            for first in range(1, sheets + 1, chunk))
+    workers = workers or os.cpu_count() or 1
+    out = sys.stdout if path == "-" else open(path, "w", encoding="utf-8", newline="")
+    key_out = open(answer_key, "w", encoding="utf-8", newline="") if answer_key else None
+    try:
+        out.write(_header(fmt, with_answers))
+        if key_out:
+            key_out.write(_header(fmt, True, key=True))
+        if workers <= 1:
+            for body, key in map(make_chunk, jobs):
+                out.write(body)
+                if key_out:
+                    key_out.write(key)
+        else:
+            # imported here: the game imports this module for its CLI options
+            from concurrent.futures import ProcessPoolExecutor
+            # a bounded window of chunks in flight, written in order
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for job in jobs:
+                    pending.append(pool.submit(make_chunk, job))
+                    if len(pending) >= workers * 2:
+                        _write_done(pending.popleft(), out, key_out)
+                while pending:
+                    _write_done(pending.popleft(), out, key_out)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if key_out:
+            key_out.close()
+    return sheets * sum(count for _, count in mix)
+
+
+def _write_done(future, out, key_out):
+    body, key = future.result()
+    out.write(body)
+    if key_out:
+        key_out.write(key)
+
+
+def add_arguments(ap):
+    """Worksheet options (shared with the game's --export-worksheets)."""
+    g = ap.add_argument_group("worksheet export")
+    g.add_argument("--format", choices=FORMATS, help="output format (default: from the file extension, else csv)")
+    g.add_argument("--sheets", type=int, default=100, help="number of sheets")
+    g.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                   help=f"questions per sheet by level (default {DEFAULT_MIX}; levels above "
+                        f"{QUESTION_TIERS} use level {QUESTION_TIERS} rules)")
+    g.add_argument("--with-answers", action="store_true", help="put the answers next to the questions")
+    g.add_argument("--answer-key", metavar="FILE", help="also write a separate answer key")
+    g.add_argument("--no-dedupe", action="store_true", help="allow repeated questions within a sheet")
+    g.add_argument("--worksheet-seed", type=int, default=1)
+    g.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    g.add_argument("--chunk", type=int, default=200, help="sheets per worker task")
+
+
+def run(path, args):
+    fmt = args.format
+    if fmt is None:
+        ext = os.path.splitext(path)[1].lstrip(".").lower()
+        fmt = {"txt": "text", "jsonl": "jsonl", "json": "jsonl"}.get(ext, "csv")
+    t0 = time.perf_counter()
+    try:
+        n = export(path, args.sheets, args.mix, fmt, args.worksheet_seed, args.workers, args.chunk,
+                   args.with_answers, args.answer_key, not args.no_dedupe)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    elapsed = time.perf_counter() - t0
+    print(f"{n:,} questions on {args.sheets:,} sheets in {elapsed:.2f}s ({n / elapsed:,.0f} q/s)",
+          file=sys.stderr)
+    return 0
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Export Math Adventure worksheets")
+    ap.add_argument("output", help="output file ('-' for stdout)")
+    add_arguments(ap)
+    args = ap.parse_args(argv)
+    return run(args.output, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())